@@ -1,27 +1,35 @@
 from __future__ import annotations
 
+import atexit
 import base64
-import copy
+import functools
 import hashlib
 import html
 import json
 import os
 import re
 import secrets
-import shutil
 import smtplib
 import threading
 import time
 import urllib.parse
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from email.message import EmailMessage
 from email.parser import BytesParser
 from email.policy import default
 from http import HTTPStatus
+from http.client import HTTPMessage
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from io import BytesIO
+from operator import itemgetter
 from pathlib import Path
+from tempfile import NamedTemporaryFile
+from types import MappingProxyType
+from typing import IO
 from zipfile import ZIP_DEFLATED, ZipFile
 
 try:
@@ -39,6 +47,23 @@ try:
 except Exception:  # pragma: no cover - compatibility fallback
     psycopg2 = None
 
+try:
+    import waitress
+except Exception:  # pragma: no cover - optional WSGI server
+    waitress = None
+
+try:
+    import uvicorn
+    from asgiref.wsgi import WsgiToAsgi
+except Exception:  # pragma: no cover - optional ASGI server
+    uvicorn = None
+    WsgiToAsgi = None
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional fast JSON codec
+    orjson = None
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = Path(os.environ.get("AURA_DATA_DIR", str(BASE_DIR / "data")))
 UPLOAD_DIR = Path(os.environ.get("AURA_UPLOAD_DIR", str(BASE_DIR / "uploads")))
@@ -50,6 +75,7 @@ EVENTS_PATH = DATA_DIR / "events.json"
 VIDEOS_PATH = DATA_DIR / "videos.json"
 APPLICATIONS_PATH = DATA_DIR / "applications.json"
 SUBMISSIONS_PATH = DATA_DIR / "submissions.json"
+SUBMISSION_COMMENTS_PATH = DATA_DIR / "submission_comments.json"
 CHATS_PATH = DATA_DIR / "chats.json"
 SESSIONS_PATH = DATA_DIR / "sessions.json"
 SETTINGS_PATH = DATA_DIR / "settings.json"
@@ -57,8 +83,11 @@ CONTENT_PATH = DATA_DIR / "content.json"
 PASSWORD_RESETS_PATH = DATA_DIR / "password_resets.json"
 APPLICATION_REVIEW_TOKENS_PATH = DATA_DIR / "application_review_tokens.json"
 VISITS_PATH = DATA_DIR / "visits.json"
+# Listas que solo crecen por el final: en local cada alta se anade a <fichero>.log y se compacta al pasar el umbral.
+APPEND_LOG_PATHS = {CHATS_PATH}
+APPEND_LOG_COMPACT_BYTES = 1024 * 1024
 
-DATA_LOCK = threading.Lock()
+DATA_LOCK = threading.RLock()
 VISIT_STATS_LOCK = threading.Lock()
 ADMIN_SESSION_COOKIE = "aura_admin_session"
 USER_SESSION_COOKIE = "aura_user_session"
@@ -68,11 +97,19 @@ USER_HOME_GRACE_TTL = 5 * 60
 RESET_TOKEN_TTL = 60 * 60
 APPLICATION_REVIEW_TOKEN_TTL = 7 * 24 * 60 * 60
 VISIT_COOKIE_TTL = 365 * 24 * 60 * 60
+SMTP_IDLE_TTL = 60
 VISIT_HISTORY_DAYS = 180
 MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+UPLOAD_PART_PREFIX = ".upload_"
+MULTIPART_CHUNK_BYTES = 64 * 1024
+MULTIPART_HEADER_LIMIT = 16 * 1024
+# Tope del cuerpo completo: formularios normales y multipart (hasta dos ficheros, como el de contenido).
+MAX_FORM_BYTES = 2 * 1024 * 1024
+MAX_MULTIPART_BYTES = 2 * MAX_UPLOAD_BYTES + MAX_FORM_BYTES
 
-ALLOWED_VIDEO_EXT = {".mp4", ".webm", ".ogg", ".mov"}
-ALLOWED_IMAGE_EXT = {".jpg", ".jpeg", ".png", ".webp"}
+ALLOWED_VIDEO_EXT = frozenset({".mp4", ".webm", ".ogg", ".mov"})
+ALLOWED_IMAGE_EXT = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+ALLOWED_MEDIA_EXT = ALLOWED_VIDEO_EXT | ALLOWED_IMAGE_EXT
 
 
 def normalize_database_url(raw_value: str) -> str:
@@ -130,12 +167,53 @@ DAY_LABELS = ["Lunes", "Martes", "Miercoles", "Jueves", "Viernes", "Sabado", "Do
 DB_LAST_ERROR = ""
 SMTP_LAST_ERROR = ""
 JSON_CACHE_LOCK = threading.Lock()
-JSON_CACHE: dict[str, tuple[float, object]] = {}
+JSON_CACHE: dict[str, tuple[float, tuple[int, int] | None, int, object]] = {}
+JSON_CACHE_VERSION = 0
+JSON_PATH_LOCKS_LOCK = threading.Lock()
+JSON_PATH_LOCKS: dict[str, threading.RLock] = {}
+CONTENT_CACHE_LOCK = threading.Lock()
+CONTENT_CACHE: tuple[int, dict] | None = None
+APPLICATIONS_CACHE_LOCK = threading.Lock()
+APPLICATIONS_CACHE: tuple[int, list[dict], tuple[dict[str, int], dict[str, int]], dict[str, dict]] | None = None
+SUBMISSIONS_CACHE_LOCK = threading.Lock()
+SUBMISSIONS_CACHE: tuple[tuple[int, int], list[dict], dict[str, dict]] | None = None
+CHATS_BY_USER_CACHE_LOCK = threading.Lock()
+CHATS_BY_USER_CACHE: tuple[int, dict[str, list[dict]]] | None = None
+FRAGMENT_CACHE_LOCK = threading.Lock()
+FRAGMENT_CACHE: dict[str, tuple[int, str]] = {}
 STORAGE_STATUS_CACHE_LOCK = threading.Lock()
 STORAGE_STATUS_CACHE: tuple[float, dict] | None = None
 BACKGROUND_TASKS_LOCK = threading.Lock()
+ADMIN_CREDENTIALS_LOCK = threading.Lock()
+ADMIN_CREDENTIALS_CACHE: dict[str, object] = {}
 BACKGROUND_TASKS: set[threading.Thread] = set()
+# PBKDF2 libera el GIL: se limita a un calculo por CPU para que un pico de logins no sature la maquina.
+PASSWORD_HASH_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1)
+ID_ENTROPY_LOCK = threading.Lock()
+ID_ENTROPY_BUFFER = b""
+ID_ENTROPY_OFFSET = 0
+SMTP_POOL_LOCK = threading.Lock()
+# Clave sin la contraseña: (host, puerto, ssl, tls, usuario). La contraseña se compara aparte por su hash.
+SMTP_POOL: dict[tuple, tuple[smtplib.SMTP, float, bytes]] = {}
+# Contadores de visitas aun no guardados; un temporizador los vuelca juntos (bajo VISIT_STATS_LOCK).
+VISIT_STATS_PENDING: dict | None = None
+VISIT_FLUSH_DELAY_SECONDS = 2.0
 EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+TEMPLATE_TOKEN_RE = re.compile(
+    r"(<!-- FALLBACK_(\w+)_START -->).*?<!-- FALLBACK_\2_END -->"
+    r"|<!-- \{\{(\w+)\}\} -->|<!--\{\{(\w+)\}\}-->|\{\{(\w+)\}\}",
+    re.DOTALL,
+)
+TEMPLATE_STREAM_CHUNK_BYTES = 64 * 1024
+TEMPLATE_LITERAL = 0
+TEMPLATE_PLACEHOLDER = 1
+TEMPLATE_FALLBACK = 2
+COMPILED_TEMPLATES_LOCK = threading.Lock()
+COMPILED_TEMPLATES: dict[Path, tuple[tuple[int, int] | None, tuple, frozenset[str], tuple]] = {}
+# Usuarios, tags y estados se repiten mucho entre tarjetas: memoizar el escape.
+# Solo cadenas cortas; el texto libre (descripciones, mensajes) va directo a html.escape.
+ESCAPE_CACHE_MAX_LENGTH = 64
+escape_html_cached = functools.lru_cache(maxsize=4096)(html.escape)
 try:
     JSON_CACHE_TTL_SECONDS = max(float(os.environ.get("AURA_CACHE_TTL_SECONDS", "15")), 0.0)
 except ValueError:
@@ -147,6 +225,10 @@ try:
     )
 except ValueError:
     STORAGE_STATUS_CACHE_TTL_SECONDS = 30.0
+try:
+    HTTP_POOL_TIMEOUT_SECONDS = max(float(os.environ.get("AURA_HTTP_TIMEOUT_SECONDS", "30")), 0.0)
+except ValueError:
+    HTTP_POOL_TIMEOUT_SECONDS = 30.0
 
 
 def current_site_datetime() -> datetime:
@@ -161,15 +243,36 @@ def site_datetime_from_timestamp(timestamp: int | float) -> datetime:
     return datetime.fromtimestamp(timestamp, tz=SITE_TIMEZONE)
 
 
+def escape_html(value: str) -> str:
+    # Un campo largo (p. ej. enviado en /apply) no entra en la cache ni desplaza a los cortos.
+    if len(value) > ESCAPE_CACHE_MAX_LENGTH:
+        return html.escape(value)
+    return escape_html_cached(value)
+
+
 @dataclass
 class UploadedFile:
     filename: str
-    file: BytesIO
+    file: IO[bytes]
+    oversized: bool = False
 
 
 class StoragePersistenceError(RuntimeError):
     """Raised when strict persistence mode blocks local JSON fallback."""
 
+
+class SkipJsonSave(Exception):
+    """Raised inside mutate_json to leave the block without saving."""
+
+
+def freeze_json_data(data):
+    # Valores por defecto de solo lectura: se comparten por referencia sin copiarlos.
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze_json_data(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(freeze_json_data(value) for value in data)
+    return data
+
 PLACEHOLDER_SVG = """
 <svg viewBox=\"0 0 320 220\" role=\"img\" aria-label=\"Video placeholder\">
   <rect width=\"320\" height=\"220\" fill=\"#0b1f17\" rx=\"20\"/>
@@ -177,6 +280,8 @@ PLACEHOLDER_SVG = """
   <rect x=\"20\" y=\"20\" width=\"280\" height=\"180\" fill=\"none\" stroke=\"#48eaa9\" stroke-width=\"2\" opacity=\"0.6\"/>
 </svg>
 """.strip()
+IMAGE_MEDIA_TEMPLATE = '<img src="%s" alt="%s" loading="lazy" decoding="async">'
+VIDEO_MEDIA_TEMPLATE = '<video data-src="%s" autoplay loop muted playsinline preload="none"></video>'
 
 DEFAULT_EVENTS = [
     {
@@ -262,7 +367,7 @@ DEFAULT_VIDEOS = [
     },
 ]
 
-DEFAULT_TRAINING_PLAN = {
+DEFAULT_TRAINING_PLAN = freeze_json_data({
     "title": "Plan 4 semanas - primera dominada",
     "weeks": [
         {
@@ -314,12 +419,12 @@ DEFAULT_TRAINING_PLAN = {
             ],
         },
     ],
-}
+})
 
 SPONSOR_PULLUP_URL = "https://pullup-dip.com/?ref=pullup-dip.com%3Fref%3Drafamdea&utm_source=influenzer"
 SPONSOR_ZUMUB_URL = "https://www.zumub.com/ES/"
 
-DEFAULT_CONTENT = {
+DEFAULT_CONTENT = freeze_json_data({
     "hero": {
         "eyebrow": "Entrenamiento gratuito · 4 semanas",
         "title": "AURA CALISTENIA",
@@ -392,7 +497,7 @@ DEFAULT_CONTENT = {
             "url": SPONSOR_ZUMUB_URL,
         },
     ],
-}
+})
 
 DEFAULT_VISIT_STATS = {
     "total_views": 0,
@@ -402,20 +507,47 @@ DEFAULT_VISIT_STATS = {
 }
 
 
+def random_hex_id(nbytes: int) -> str:
+    # IDs no secretos (eventos, videos, chats, ficheros): se recortan de un bloque de os.urandom.
+    global ID_ENTROPY_BUFFER, ID_ENTROPY_OFFSET
+    with ID_ENTROPY_LOCK:
+        if ID_ENTROPY_OFFSET + nbytes > len(ID_ENTROPY_BUFFER):
+            ID_ENTROPY_BUFFER = os.urandom(4096)
+            ID_ENTROPY_OFFSET = 0
+        start = ID_ENTROPY_OFFSET
+        ID_ENTROPY_OFFSET += nbytes
+        return ID_ENTROPY_BUFFER[start : start + nbytes].hex()
+
+
+def derive_password_hash(password: str, salt: bytes) -> bytes:
+    with PASSWORD_HASH_SLOTS:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
+
+
 def hash_password(password: str, salt: bytes | None = None) -> tuple[str, str]:
     if salt is None:
         salt = secrets.token_bytes(16)
-    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
+    hashed = derive_password_hash(password, salt)
     return base64.b64encode(salt).decode("ascii"), base64.b64encode(hashed).decode("ascii")
 
 
-def verify_password(password: str, salt_b64: str, hash_b64: str) -> bool:
+@functools.lru_cache(maxsize=1024)
+def decode_password_field(value: str) -> bytes | None:
     try:
-        salt = base64.b64decode(salt_b64)
-        expected = base64.b64decode(hash_b64)
+        return base64.b64decode(value)
     except (ValueError, TypeError):
+        return None
+
+
+def verify_password(password: str, salt: str | bytes, expected: str | bytes) -> bool:
+    # Acepta bytes ya decodificados; las cadenas base64 se decodifican una vez y se memorizan.
+    if not isinstance(salt, bytes):
+        salt = decode_password_field(str(salt))
+    if not isinstance(expected, bytes):
+        expected = decode_password_field(str(expected))
+    if salt is None or expected is None:
         return False
-    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
+    hashed = derive_password_hash(password, salt)
     return secrets.compare_digest(hashed, expected)
 
 
@@ -460,35 +592,74 @@ def run_background_task(func, *args, **kwargs) -> None:
 
 
 def clone_json_data(data):
-    return copy.deepcopy(data)
+    # Copia recursiva de datos JSON; los valores congelados se devuelven como dict/list mutables.
+    if isinstance(data, (dict, MappingProxyType)):
+        return {key: clone_json_data(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [clone_json_data(value) for value in data]
+    return data
 
 
+@functools.lru_cache(maxsize=64)
 def cache_key_for_path(path: Path) -> str:
     return str(path.resolve())
 
 
-def cache_get_json(path: Path):
+def file_signature(stat_result: os.stat_result) -> tuple[int, int]:
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def append_log_path(path: Path) -> Path:
+    return path.with_name(path.name + ".log")
+
+
+def json_file_signature(path: Path) -> tuple[int, ...]:
+    # Si el fichero tiene log de altas, su firma forma parte de la del JSON.
+    signature = file_signature(os.stat(path))
+    if path in APPEND_LOG_PATHS:
+        try:
+            return signature + file_signature(os.stat(append_log_path(path)))
+        except FileNotFoundError:
+            pass
+    return signature
+
+
+def cache_get_entry(path: Path) -> tuple[int, object] | None:
+    # Entradas locales: validas mientras no cambie mtime/tamano del fichero. Sin firma (NEON): TTL.
     if JSON_CACHE_TTL_SECONDS <= 0:
         return None
     key = cache_key_for_path(path)
-    now = time.monotonic()
     with JSON_CACHE_LOCK:
         cached = JSON_CACHE.get(key)
-        if not cached:
-            return None
-        stored_at, stored_value = cached
-        if now - stored_at > JSON_CACHE_TTL_SECONDS:
-            JSON_CACHE.pop(key, None)
-            return None
-    return clone_json_data(stored_value)
+    if not cached:
+        return None
+    stored_at, signature, version, stored_value = cached
+    if signature is not None:
+        try:
+            current = json_file_signature(path)
+        except OSError:
+            current = None
+        expired = current != signature
+    else:
+        expired = time.monotonic() - stored_at > JSON_CACHE_TTL_SECONDS
+    if expired:
+        with JSON_CACHE_LOCK:
+            if JSON_CACHE.get(key) is cached:
+                JSON_CACHE.pop(key, None)
+        return None
+    return version, stored_value
 
 
-def cache_set_json(path: Path, data) -> None:
+def cache_set_json(path: Path, data, signature: tuple[int, int] | None = None, copy: bool = True) -> int | None:
+    global JSON_CACHE_VERSION
     if JSON_CACHE_TTL_SECONDS <= 0:
-        return
+        return None
     key = cache_key_for_path(path)
+    value = clone_json_data(data) if copy else data
     with JSON_CACHE_LOCK:
-        JSON_CACHE[key] = (time.monotonic(), clone_json_data(data))
+        JSON_CACHE_VERSION += 1
+        JSON_CACHE[key] = (time.monotonic(), signature, JSON_CACHE_VERSION, value)
+        return JSON_CACHE_VERSION
 
 
 def is_valid_email(value: str) -> bool:
@@ -620,7 +791,7 @@ def db_load_json(path: Path, default):
 
 def db_save_json(path: Path, data) -> None:
     key = db_key_for_path(path)
-    payload = json.dumps(data, ensure_ascii=True)
+    payload = json.dumps(data, ensure_ascii=True, default=encode_json_default)
     with db_connect() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -636,7 +807,7 @@ def db_save_json(path: Path, data) -> None:
 
 def db_seed_json(path: Path, data) -> None:
     key = db_key_for_path(path)
-    payload = json.dumps(data, ensure_ascii=True)
+    payload = json.dumps(data, ensure_ascii=True, default=encode_json_default)
     with db_connect() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -650,10 +821,65 @@ def db_seed_json(path: Path, data) -> None:
             )
 
 
+def encode_json_default(value):
+    # Los datos congelados (plan por defecto compartido) se guardan como objetos JSON normales.
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json_file(data) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=encode_json_default, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    return json.dumps(data, indent=2, ensure_ascii=True, default=encode_json_default).encode("ascii")
+
+
+def decode_json_file(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def encode_json_line(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=encode_json_default, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data, ensure_ascii=True, default=encode_json_default).encode("ascii") + b"\n"
+
+
+def read_append_log(path: Path) -> tuple[list, tuple[int, int] | None]:
+    try:
+        with append_log_path(path).open("rb") as handle:
+            raw = handle.read()
+            signature = file_signature(os.fstat(handle.fileno()))
+    except FileNotFoundError:
+        return [], None
+    records = []
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(decode_json_file(line))
+        except ValueError:
+            # Linea a medio escribir (corte durante el append): se descarta.
+            continue
+    return records, signature
+
+
 def save_json_local(path: Path, data) -> None:
+    # Escritura atomica: se escribe un temporal y se sustituye el fichero de un solo paso.
+    # La cache se actualiza bajo el mismo lock que la escritura para que su firma sea la del fichero.
+    payload = encode_json_file(data)
+    tmp_path = path.with_name(path.name + ".tmp")
     with DATA_LOCK:
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, ensure_ascii=True)
+        with tmp_path.open("wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, path)
+        if path in APPEND_LOG_PATHS:
+            append_log_path(path).unlink(missing_ok=True)
+        cache_set_json(path, data, signature=json_file_signature(path))
 
 
 def seed_json_key(path: Path, default) -> None:
@@ -683,32 +909,41 @@ def seed_json_key(path: Path, default) -> None:
     if path.exists():
         return
     save_json_local(path, default)
-    cache_set_json(path, default)
 
 
-def load_json(path: Path, default):
-    cached = cache_get_json(path)
-    if cached is not None:
-        return cached
+def load_json_entry(path: Path, default) -> tuple[int | None, object]:
+    # Devuelve (version, valor compartido de la cache). El valor no debe modificarse.
+    entry = cache_get_entry(path)
+    if entry is not None:
+        return entry
     if db_enabled():
         try:
             loaded = db_load_json(path, default)
-            cache_set_json(path, loaded)
-            return clone_json_data(loaded)
+            return cache_set_json(path, loaded, copy=False), loaded
         except Exception as exc:
             remember_db_error(exc)
     if not path.exists():
-        cache_set_json(path, default)
-        return clone_json_data(default)
+        value = clone_json_data(default)
+        return cache_set_json(path, value, copy=False), value
     with DATA_LOCK:
         try:
-            with path.open("r", encoding="utf-8") as handle:
-                loaded = json.load(handle)
-                cache_set_json(path, loaded)
-                return clone_json_data(loaded)
+            with path.open("rb") as handle:
+                loaded = decode_json_file(handle.read())
+                signature = file_signature(os.fstat(handle.fileno()))
         except json.JSONDecodeError:
-            cache_set_json(path, default)
-            return clone_json_data(default)
+            value = clone_json_data(default)
+            return cache_set_json(path, value, copy=False), value
+        if path in APPEND_LOG_PATHS:
+            records, log_signature = read_append_log(path)
+            if isinstance(loaded, list):
+                loaded.extend(records)
+            if log_signature is not None:
+                signature += log_signature
+        return cache_set_json(path, loaded, signature=signature, copy=False), loaded
+
+
+def load_json(path: Path, default):
+    return clone_json_data(load_json_entry(path, default)[1])
 
 
 def save_json(path: Path, data) -> None:
@@ -729,7 +964,56 @@ def save_json(path: Path, data) -> None:
             "AURA_REQUIRE_DB está activo, pero no hay DATABASE_URL/NEON_DATABASE_URL configurada."
         )
     save_json_local(path, data)
-    cache_set_json(path, data)
+
+
+def append_json_record(path: Path, record: dict) -> None:
+    # En local solo se escribe la linea nueva; con NEON se guarda la lista completa.
+    records = load_json_entry(path, [])[1]
+    if db_enabled() or REQUIRE_DB_STORAGE or path not in APPEND_LOG_PATHS or not isinstance(records, list):
+        records = clone_json_data(records) if isinstance(records, list) else []
+        records.append(record)
+        save_json(path, records)
+        return
+    line = encode_json_line(record)
+    with DATA_LOCK:
+        entry = cache_get_entry(path)
+        with append_log_path(path).open("ab") as handle:
+            handle.write(line)
+            log_size = handle.tell()
+        if entry is not None and isinstance(entry[1], list):
+            cache_set_json(path, [*entry[1], record], signature=json_file_signature(path), copy=False)
+        if log_size >= APPEND_LOG_COMPACT_BYTES:
+            compact_append_log(path)
+
+
+def compact_append_log(path: Path) -> None:
+    # Vuelca el log de altas en el JSON completo y lo elimina.
+    with DATA_LOCK:
+        if append_log_path(path).exists():
+            save_json_local(path, load_json_entry(path, [])[1])
+
+
+def json_path_lock(path: Path) -> threading.RLock:
+    # Un lock por fichero: dos mutaciones del mismo JSON no se pisan; las de ficheros distintos no se esperan.
+    key = cache_key_for_path(path)
+    with JSON_PATH_LOCKS_LOCK:
+        lock = JSON_PATH_LOCKS.get(key)
+        if lock is None:
+            lock = JSON_PATH_LOCKS[key] = threading.RLock()
+    return lock
+
+
+@contextmanager
+def mutate_json(path: Path, default, loader=None):
+    # Carga una vez, permite varios cambios y guarda una sola vez al salir sin errores.
+    # Si el bloque no cambia nada lanza SkipJsonSave y el fichero no se reescribe.
+    with json_path_lock(path):
+        data = loader() if loader is not None else load_json(path, default)
+        try:
+            yield data
+        except SkipJsonSave:
+            return
+        save_json(path, data)
 
 
 def parse_bool_env(value: str | None, default_value: bool) -> bool:
@@ -943,29 +1227,59 @@ def ensure_data_files() -> None:
                     f"No se pudo conectar con NEON usando {DATABASE_URL_SOURCE or 'DATABASE_URL'}."
                 ) from exc
     UPLOAD_DIR.mkdir(exist_ok=True)
+    # Temporales de subidas que quedaron a medias (proceso cortado durante una peticion).
+    for stale in UPLOAD_DIR.glob(f"{UPLOAD_PART_PREFIX}*.part"):
+        stale.unlink(missing_ok=True)
 
     seed_json_key(EVENTS_PATH, DEFAULT_EVENTS)
     seed_json_key(VIDEOS_PATH, DEFAULT_VIDEOS)
     seed_json_key(APPLICATIONS_PATH, [])
     seed_json_key(SUBMISSIONS_PATH, [])
+    seed_json_key(SUBMISSION_COMMENTS_PATH, {})
     seed_json_key(CHATS_PATH, [])
+    if not db_enabled():
+        compact_append_log(CHATS_PATH)
     seed_json_key(SESSIONS_PATH, {})
 
     enforce_admin_credentials()
 
-    seed_json_key(CONTENT_PATH, DEFAULT_CONTENT)
+    seed_json_key(CONTENT_PATH, copy_default_content())
     seed_json_key(PASSWORD_RESETS_PATH, {})
     seed_json_key(APPLICATION_REVIEW_TOKENS_PATH, {})
     seed_json_key(VISITS_PATH, DEFAULT_VISIT_STATS)
 
 
+def default_admin_credentials() -> dict:
+    with ADMIN_CREDENTIALS_LOCK:
+        expected_admin = ADMIN_CREDENTIALS_CACHE.get("expected")
+        if expected_admin is None:
+            salt, pw_hash = hash_password(DEFAULT_ADMIN_PASSWORD)
+            expected_admin = {
+                "username": DEFAULT_ADMIN_USERNAME,
+                "salt": salt,
+                "hash": pw_hash,
+            }
+            ADMIN_CREDENTIALS_CACHE["expected"] = expected_admin
+    return dict(expected_admin)
+
+
+def admin_credentials_are_default(admin_user: str, admin_salt: str, admin_hash: str) -> bool:
+    # PBKDF2 solo se repite si cambian las credenciales guardadas.
+    key = (admin_user, admin_salt, admin_hash)
+    with ADMIN_CREDENTIALS_LOCK:
+        if ADMIN_CREDENTIALS_CACHE.get("verified") == key:
+            return True
+    if admin_user != DEFAULT_ADMIN_USERNAME:
+        return False
+    if not verify_password(DEFAULT_ADMIN_PASSWORD, admin_salt, admin_hash):
+        return False
+    with ADMIN_CREDENTIALS_LOCK:
+        ADMIN_CREDENTIALS_CACHE["verified"] = key
+    return True
+
+
 def enforce_admin_credentials() -> dict:
-    salt, pw_hash = hash_password(DEFAULT_ADMIN_PASSWORD)
-    expected_admin = {
-        "username": DEFAULT_ADMIN_USERNAME,
-        "salt": salt,
-        "hash": pw_hash,
-    }
+    expected_admin = default_admin_credentials()
     seed_json_key(SETTINGS_PATH, {"admin": expected_admin})
     settings = load_json(SETTINGS_PATH, {"admin": expected_admin})
     if not isinstance(settings, dict):
@@ -976,10 +1290,7 @@ def enforce_admin_credentials() -> dict:
         admin_user = str(current_admin.get("username", "")).strip()
         admin_salt = str(current_admin.get("salt", "")).strip()
         admin_hash = str(current_admin.get("hash", "")).strip()
-        if (
-            admin_user == DEFAULT_ADMIN_USERNAME
-            and verify_password(DEFAULT_ADMIN_PASSWORD, admin_salt, admin_hash)
-        ):
+        if admin_credentials_are_default(admin_user, admin_salt, admin_hash):
             needs_update = False
     if needs_update:
         settings["admin"] = expected_admin
@@ -987,12 +1298,13 @@ def enforce_admin_credentials() -> dict:
     return settings
 
 
-def copy_default_plan() -> dict:
-    return json.loads(json.dumps(DEFAULT_TRAINING_PLAN))
+def copy_default_plan() -> MappingProxyType:
+    # Plan compartido de solo lectura: los handlers que editan el plan crean uno nuevo con normalize_plan.
+    return DEFAULT_TRAINING_PLAN
 
 
 def copy_default_content() -> dict:
-    return json.loads(json.dumps(DEFAULT_CONTENT))
+    return clone_json_data(DEFAULT_CONTENT)
 
 
 def copy_default_visit_stats() -> dict:
@@ -1000,15 +1312,16 @@ def copy_default_visit_stats() -> dict:
 
 
 def normalize_content(content: dict | None) -> dict:
-    default = copy_default_content()
+    # Las secciones sin cambios apuntan a DEFAULT_CONTENT (solo lectura); las editadas se copian.
+    normalized = dict(DEFAULT_CONTENT)
     if not isinstance(content, dict):
-        return default
+        return normalized
 
     hero = content.get("hero")
     if isinstance(hero, dict):
-        for key in ("eyebrow", "title", "subtitle"):
-            if hero.get(key):
-                default["hero"][key] = str(hero.get(key))
+        overrides = {key: str(hero.get(key)) for key in ("eyebrow", "title", "subtitle") if hero.get(key)}
+        if overrides:
+            normalized["hero"] = {**DEFAULT_CONTENT["hero"], **overrides}
 
     stats = content.get("stats")
     if isinstance(stats, list):
@@ -1021,35 +1334,43 @@ def normalize_content(content: dict | None) -> dict:
             if value or label:
                 cleaned_stats.append({"value": value, "label": label})
         if cleaned_stats:
-            default["stats"] = cleaned_stats
+            normalized["stats"] = cleaned_stats
 
     bio = content.get("bio")
     if isinstance(bio, dict):
-        for key in ("eyebrow", "name", "signature", "image", "image_caption"):
-            if bio.get(key):
-                default["bio"][key] = str(bio.get(key))
+        overrides = {
+            key: str(bio.get(key))
+            for key in ("eyebrow", "name", "signature", "image", "image_caption")
+            if bio.get(key)
+        }
         paragraphs = bio.get("paragraphs")
         if isinstance(paragraphs, list):
             cleaned = [str(p).strip() for p in paragraphs if str(p).strip()]
             if cleaned:
-                default["bio"]["paragraphs"] = cleaned
+                overrides["paragraphs"] = cleaned
+        if overrides:
+            normalized["bio"] = {**DEFAULT_CONTENT["bio"], **overrides}
 
     program = content.get("program")
     if isinstance(program, dict):
-        for key in ("title", "lead", "highlight_title", "highlight_text", "image", "image_caption"):
-            if program.get(key):
-                default["program"][key] = str(program.get(key))
+        overrides = {
+            key: str(program.get(key))
+            for key in ("title", "lead", "highlight_title", "highlight_text", "image", "image_caption")
+            if program.get(key)
+        }
         bullets = program.get("bullets")
         if isinstance(bullets, list):
             cleaned = [str(b).strip() for b in bullets if str(b).strip()]
             if cleaned:
-                default["program"]["bullets"] = cleaned
+                overrides["bullets"] = cleaned
+        if overrides:
+            normalized["program"] = {**DEFAULT_CONTENT["program"], **overrides}
 
     contact = content.get("contact")
     if isinstance(contact, dict):
-        for key in ("email", "phone", "city", "instagram"):
-            if contact.get(key):
-                default["contact"][key] = str(contact.get(key))
+        overrides = {key: str(contact.get(key)) for key in ("email", "phone", "city", "instagram") if contact.get(key)}
+        if overrides:
+            normalized["contact"] = {**DEFAULT_CONTENT["contact"], **overrides}
 
     sponsors = content.get("sponsors")
     if isinstance(sponsors, list):
@@ -1083,13 +1404,42 @@ def normalize_content(content: dict | None) -> dict:
             if has_pullup and not has_zumub:
                 cleaned.append({"name": "ZUMUB", "logo": "LOGOS/zumub.png", "url": SPONSOR_ZUMUB_URL})
         if cleaned:
-            default["sponsors"] = cleaned
+            normalized["sponsors"] = cleaned
+
+    return normalized
 
-    return default
+
+def load_content_entry() -> tuple[int | None, dict]:
+    # Resultado normalizado compartido por version de cache: tratarlo como solo lectura.
+    global CONTENT_CACHE
+    version, raw_content = load_json_entry(CONTENT_PATH, DEFAULT_CONTENT)
+    if version is None:
+        return None, normalize_content(raw_content)
+    with CONTENT_CACHE_LOCK:
+        if CONTENT_CACHE is not None and CONTENT_CACHE[0] == version:
+            return CONTENT_CACHE
+    content = normalize_content(raw_content)
+    with CONTENT_CACHE_LOCK:
+        CONTENT_CACHE = (version, content)
+    return version, content
 
 
 def load_content() -> dict:
-    return normalize_content(load_json(CONTENT_PATH, DEFAULT_CONTENT))
+    return load_content_entry()[1]
+
+
+def render_cached_fragment(name: str, version: int | None, render, *args) -> str:
+    # Fragmentos HTML derivados de un JSON: se reutilizan mientras no cambie su version de cache.
+    if version is None:
+        return render(*args)
+    with FRAGMENT_CACHE_LOCK:
+        cached = FRAGMENT_CACHE.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    rendered = render(*args)
+    with FRAGMENT_CACHE_LOCK:
+        FRAGMENT_CACHE[name] = (version, rendered)
+    return rendered
 
 
 def normalize_visit_stats(stats: dict | None) -> dict:
@@ -1138,10 +1488,40 @@ def normalize_visit_stats(stats: dict | None) -> dict:
 
 
 def load_visit_stats() -> dict:
+    pending = VISIT_STATS_PENDING
+    if pending is not None:
+        return normalize_visit_stats(pending)
     return normalize_visit_stats(load_json(VISITS_PATH, DEFAULT_VISIT_STATS))
 
 
+def schedule_visit_flush() -> None:
+    timer = threading.Timer(VISIT_FLUSH_DELAY_SECONDS, flush_visit_stats)
+    timer.daemon = True
+    timer.start()
+
+
+def flush_visit_stats() -> None:
+    global VISIT_STATS_PENDING
+    with VISIT_STATS_LOCK:
+        pending = VISIT_STATS_PENDING
+        if pending is None:
+            return
+        try:
+            save_json(VISITS_PATH, pending)
+        except Exception as exc:
+            # Los contadores siguen en memoria y se reintenta en el siguiente ciclo.
+            print(f"Error guardando visitas: {exc}")
+            retry = True
+        else:
+            VISIT_STATS_PENDING = None
+            retry = False
+    if retry:
+        schedule_visit_flush()
+
+
 def increment_visit_stats(unique_visit: bool) -> dict:
+    # La visita se cuenta en memoria; visits.json se reescribe como mucho una vez cada VISIT_FLUSH_DELAY_SECONDS.
+    global VISIT_STATS_PENDING
     with VISIT_STATS_LOCK:
         stats = load_visit_stats()
         now_ts = int(time.time())
@@ -1154,8 +1534,14 @@ def increment_visit_stats(unique_visit: bool) -> dict:
         if unique_visit:
             stats["unique_visitors"] = int(stats.get("unique_visitors", 0)) + 1
         stats["last_visit_at"] = now_ts
-        save_json(VISITS_PATH, normalize_visit_stats(stats))
-        return stats
+        schedule_flush = VISIT_STATS_PENDING is None
+        VISIT_STATS_PENDING = normalize_visit_stats(stats)
+    if schedule_flush:
+        schedule_visit_flush()
+    return stats
+
+
+atexit.register(flush_visit_stats)
 
 
 def format_admin_number(value: int) -> str:
@@ -1291,32 +1677,25 @@ def normalize_plan_day(day) -> dict:
 
 
 def normalize_plan(plan: dict | None) -> dict:
-    default = copy_default_plan()
     if not isinstance(plan, dict):
         plan = {}
     weeks = plan.get("weeks")
     if not isinstance(weeks, list):
         weeks = []
-    default_weeks = default.get("weeks")
-    if not isinstance(default_weeks, list):
-        default_weeks = []
+    default_weeks = DEFAULT_TRAINING_PLAN["weeks"]
     normalized = {
-        "title": plan.get("title") or default.get("title", "Plan 4 semanas"),
+        "title": plan.get("title") or DEFAULT_TRAINING_PLAN["title"],
         "weeks": [],
     }
     for index in range(4):
         source_week = weeks[index] if index < len(weeks) and isinstance(weeks[index], dict) else {}
-        default_week = (
-            default_weeks[index] if index < len(default_weeks) and isinstance(default_weeks[index], dict) else {}
-        )
+        default_week = default_weeks[index] if index < len(default_weeks) else {}
         title = source_week.get("title") or default_week.get("title", f"Semana {index + 1}")
         summary = str(source_week.get("summary", "")).strip()
         days = source_week.get("days")
         if not isinstance(days, list):
             days = []
-        default_days = default_week.get("days")
-        if not isinstance(default_days, list):
-            default_days = []
+        default_days = default_week.get("days", ())
         normalized_days = []
         for day_index in range(7):
             day_source = days[day_index] if day_index < len(days) else None
@@ -1351,13 +1730,100 @@ def ensure_application_fields(applications: list[dict]) -> list[dict]:
     return applications
 
 
+def index_application_accounts(applications: list[dict]) -> tuple[dict[str, int], dict[str, int]]:
+    # Posicion de la primera solicitud por usuario y por email (en minusculas).
+    usernames: dict[str, int] = {}
+    emails: dict[str, int] = {}
+    for index, app in enumerate(applications):
+        usernames.setdefault(app.get("username", "").lower(), index)
+        emails.setdefault(app.get("email", "").lower(), index)
+    return usernames, emails
+
+
+def load_applications_snapshot() -> tuple[list[dict], tuple[dict[str, int], dict[str, int]], dict[str, dict]]:
+    # Normalizar los planes es lo caro: se hace una vez por version de cache.
+    # Lista e indices se comparten entre llamadas: tratarlos como solo lectura.
+    global APPLICATIONS_CACHE
+    version, raw_applications = load_json_entry(APPLICATIONS_PATH, [])
+    if version is not None:
+        with APPLICATIONS_CACHE_LOCK:
+            cached = APPLICATIONS_CACHE
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2], cached[3]
+    # ensure_application_fields puede guardar: se relee y normaliza con el lock del fichero.
+    with json_path_lock(APPLICATIONS_PATH):
+        version, raw_applications = load_json_entry(APPLICATIONS_PATH, [])
+        applications = ensure_application_fields(clone_json_data(raw_applications))
+    accounts = index_application_accounts(applications)
+    by_username = index_applications_by_username(applications)
+    if version is not None:
+        with APPLICATIONS_CACHE_LOCK:
+            APPLICATIONS_CACHE = (version, applications, accounts, by_username)
+    return applications, accounts, by_username
+
+
+def load_applications_entry() -> tuple[list[dict], tuple[dict[str, int], dict[str, int]]]:
+    # Copia mutable de la lista para los handlers que la modifican y guardan.
+    applications, accounts, _ = load_applications_snapshot()
+    return clone_json_data(applications), accounts
+
+
+def lookup_application(username: str) -> dict | None:
+    # Misma busqueda que find_application, sin copiar la lista. El resultado es de solo lectura.
+    return load_applications_snapshot()[2].get(username.strip().lower())
+
+
 def load_applications() -> list[dict]:
-    return ensure_application_fields(load_json(APPLICATIONS_PATH, []))
+    return load_applications_entry()[0]
 
 
-def load_submissions() -> list[dict]:
-    data = load_json(SUBMISSIONS_PATH, [])
-    return data if isinstance(data, list) else []
+def load_submission_comments() -> dict[str, list[dict]]:
+    # Comentarios nuevos por id de envio. Los antiguos siguen dentro de submissions.json.
+    data = load_json(SUBMISSION_COMMENTS_PATH, {})
+    return data if isinstance(data, dict) else {}
+
+
+def normalize_submissions(records: list, stored_comments: dict | None = None) -> list[dict]:
+    # Tras esta pasada todo envio tiene "id", "file" y "comments": renders y handlers los leen sin .get().
+    # "comments" une los antiguos del envio con los de SUBMISSION_COMMENTS_PATH.
+    stored_comments = stored_comments if isinstance(stored_comments, dict) else {}
+    submissions = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        sub = clone_json_data(record)
+        sub.setdefault("id", "")
+        sub.setdefault("file", "")
+        if not isinstance(sub.get("comments"), list):
+            sub["comments"] = []
+        extra = stored_comments.get(sub["id"]) if sub["id"] else None
+        if isinstance(extra, list):
+            sub["comments"].extend(clone_json_data(extra))
+        submissions.append(sub)
+    return submissions
+
+
+def load_submissions_snapshot() -> tuple[list[dict], dict[str, dict]]:
+    # Normalizado e indexado una vez por version de cache de los dos ficheros. Lista e indice son de solo lectura.
+    global SUBMISSIONS_CACHE
+    submissions_version, raw_submissions = load_json_entry(SUBMISSIONS_PATH, [])
+    comments_version, stored_comments = load_json_entry(SUBMISSION_COMMENTS_PATH, {})
+    version = None
+    if submissions_version is not None and comments_version is not None:
+        version = (submissions_version, comments_version)
+        with SUBMISSIONS_CACHE_LOCK:
+            cached = SUBMISSIONS_CACHE
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+    submissions = normalize_submissions(
+        raw_submissions if isinstance(raw_submissions, list) else [],
+        stored_comments,
+    )
+    by_id = index_submissions_by_id(submissions)
+    if version is not None:
+        with SUBMISSIONS_CACHE_LOCK:
+            SUBMISSIONS_CACHE = (version, submissions, by_id)
+    return submissions, by_id
 
 
 def clean_sessions(sessions: dict) -> dict:
@@ -1551,22 +2017,29 @@ def delete_session(token: str) -> None:
         save_json(SESSIONS_PATH, sessions)
 
 
-def get_session_user(cookie_header: str | None, cookie_name: str, role: str | None = None) -> str | None:
-    if not cookie_header:
-        return None
+@functools.lru_cache(maxsize=256)
+def parse_cookie_header(cookie_header: str) -> MappingProxyType:
+    # Una peticion consulta la misma cabecera Cookie varias veces (sesion admin, sesion alumno, render).
     cookies = {}
     for part in cookie_header.split(";"):
         if "=" in part:
             key, value = part.split("=", 1)
             cookies[key.strip()] = value.strip()
-    token = cookies.get(cookie_name)
+    return MappingProxyType(cookies)
+
+
+def get_session_user(cookie_header: str | None, cookie_name: str, role: str | None = None) -> str | None:
+    if not cookie_header:
+        return None
+    token = parse_cookie_header(cookie_header).get(cookie_name)
     if not token:
         return None
-    raw_sessions = load_json(SESSIONS_PATH, {})
+    # Lectura sobre el valor compartido de la cache: solo se copia y guarda si hay sesiones caducadas.
+    raw_sessions = load_json_entry(SESSIONS_PATH, {})[1]
     if not isinstance(raw_sessions, dict):
         raw_sessions = {}
     sessions = clean_sessions(raw_sessions)
-    if sessions != raw_sessions:
+    if len(sessions) != len(raw_sessions):
         save_json(SESSIONS_PATH, sessions)
     data = sessions.get(token)
     if not data:
@@ -1585,34 +2058,167 @@ def get_cookie_token(cookie_header: str | None, cookie_name: str) -> str | None:
     return None
 
 
-def strip_fallback_blocks(content: str, key: str) -> str:
-    start = f"<!-- FALLBACK_{key}_START -->"
-    end = f"<!-- FALLBACK_{key}_END -->"
-    while True:
-        start_index = content.find(start)
-        if start_index == -1:
-            break
-        end_index = content.find(end, start_index + len(start))
-        if end_index == -1:
-            break
-        content = content[:start_index] + content[end_index + len(end):]
-    return content
+@functools.lru_cache(maxsize=32)
+def compile_template(content: str) -> tuple:
+    # Segmentos: literal, placeholder (con su texto original) o bloque FALLBACK, que cierra la
+    # secuencia y enlaza con la continuación según la clave exista o no.
+    compiled: dict[int, tuple] = {}
+
+    def compile_from(position: int) -> tuple:
+        if position in compiled:
+            return compiled[position]
+        start = position
+        segments = []
+        while True:
+            match = TEMPLATE_TOKEN_RE.search(content, position)
+            if match is None:
+                break
+            if match.start() > position:
+                segments.append((TEMPLATE_LITERAL, content[position:match.start()]))
+            fallback_key = match.group(2)
+            if fallback_key is not None:
+                missing_segments = ((TEMPLATE_LITERAL, match.group(1)),) + compile_from(match.end(1))
+                segments.append((TEMPLATE_FALLBACK, fallback_key, missing_segments, compile_from(match.end())))
+                compiled[start] = tuple(segments)
+                return compiled[start]
+            key = match.group(3) or match.group(4) or match.group(5)
+            segments.append((TEMPLATE_PLACEHOLDER, key, match.group(0)))
+            position = match.end()
+        if position < len(content):
+            segments.append((TEMPLATE_LITERAL, content[position:]))
+        compiled[start] = tuple(segments)
+        return compiled[start]
+
+    return compile_from(0)
+
+
+def get_compiled_template(path: Path) -> tuple:
+    try:
+        signature = file_signature(os.stat(path))
+    except OSError:
+        signature = None
+    with COMPILED_TEMPLATES_LOCK:
+        cached = COMPILED_TEMPLATES.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    segments = compile_template(path.read_text(encoding="utf-8"))
+    with COMPILED_TEMPLATES_LOCK:
+        COMPILED_TEMPLATES[path] = (
+            signature,
+            segments,
+            collect_template_keys(segments),
+            encode_template_segments(segments, {}),
+        )
+    return segments
+
+
+def encode_template_segments(segments: tuple, encoded: dict[int, tuple]) -> tuple:
+    # Misma estructura con los literales ya en UTF-8 para escribirlos sin recodificar.
+    if id(segments) in encoded:
+        return encoded[id(segments)]
+    result = []
+    for segment in segments:
+        if segment[0] == TEMPLATE_LITERAL:
+            result.append((TEMPLATE_LITERAL, segment[1].encode("utf-8")))
+        elif segment[0] == TEMPLATE_PLACEHOLDER:
+            result.append((TEMPLATE_PLACEHOLDER, segment[1], segment[2].encode("utf-8")))
+        else:
+            result.append(
+                (
+                    TEMPLATE_FALLBACK,
+                    segment[1],
+                    encode_template_segments(segment[2], encoded),
+                    encode_template_segments(segment[3], encoded),
+                )
+            )
+    encoded[id(segments)] = tuple(result)
+    return encoded[id(segments)]
+
+
+def get_encoded_template(path: Path) -> tuple:
+    get_compiled_template(path)
+    with COMPILED_TEMPLATES_LOCK:
+        return COMPILED_TEMPLATES[path][3]
+
 
+def collect_template_keys(segments: tuple) -> frozenset[str]:
+    keys = set()
+    pending = [segments]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        for segment in current:
+            if segment[0] == TEMPLATE_PLACEHOLDER:
+                keys.add(segment[1])
+            elif segment[0] == TEMPLATE_FALLBACK:
+                keys.add(segment[1])
+                pending.extend((segment[2], segment[3]))
+    return frozenset(keys)
+
+
+def get_template_keys(path: Path) -> frozenset[str]:
+    # Claves ({{KEY}} y FALLBACK_KEY) que usa la plantilla compilada.
+    get_compiled_template(path)
+    with COMPILED_TEMPLATES_LOCK:
+        return COMPILED_TEMPLATES[path][2]
+
+
+def iter_template_fragments(segments: tuple, replacements: dict[str, str | Iterable[str]]):
+    while segments:
+        next_segments = ()
+        for segment in segments:
+            kind = segment[0]
+            if kind == TEMPLATE_LITERAL:
+                yield segment[1]
+            elif kind == TEMPLATE_PLACEHOLDER:
+                value = replacements.get(segment[1])
+                if value is None:
+                    yield segment[2]
+                elif isinstance(value, str):
+                    if value:
+                        yield value
+                else:
+                    # Fragmento generado bajo demanda (se consume una sola vez).
+                    yield from value
+            else:
+                next_segments = segment[3] if segment[1] in replacements else segment[2]
+        segments = next_segments
+
+
+def render_template_stream(path: Path, replacements: dict[str, str | Iterable[str]], out) -> None:
+    buffer = bytearray()
+    for fragment in iter_template_fragments(get_encoded_template(path), replacements):
+        # Los literales de la plantilla ya son bytes; solo se codifican los valores.
+        buffer += fragment.encode("utf-8") if isinstance(fragment, str) else fragment
+        if len(buffer) >= TEMPLATE_STREAM_CHUNK_BYTES:
+            out.write(buffer)
+            buffer.clear()
+    if buffer:
+        out.write(buffer)
+
+
+def precompile_templates() -> None:
+    for template_path in (INDEX_TEMPLATE, ADMIN_TEMPLATE, PORTAL_TEMPLATE):
+        try:
+            get_compiled_template(template_path)
+        except OSError:
+            pass
 
-def render_template(path: Path, replacements: dict[str, str]) -> str:
-    content = path.read_text(encoding="utf-8")
-    for key, value in replacements.items():
-        token = "{{" + key + "}}"
-        content = content.replace(f"<!-- {token} -->", value)
-        content = content.replace(f"<!--{token}-->", value)
-        content = content.replace(token, value)
-        content = strip_fallback_blocks(content, key)
-    return content
+
+precompile_templates()
+
+
+def first_query_value(query: dict[str, list[str]], key: str) -> str:
+    values = query.get(key)
+    return values[0] if values else ""
 
 
 def build_form_alert(query: dict[str, list[str]]) -> str:
-    status = (query.get("status") or [""])[0]
-    message = (query.get("message") or [""])[0]
+    status = first_query_value(query, "status")
+    message = first_query_value(query, "message")
     if not status:
         return ""
     if status == "ok":
@@ -1630,11 +2236,11 @@ def build_form_alert(query: dict[str, list[str]]) -> str:
     else:
         text = message or "No se pudo enviar la solicitud."
         level = "error"
-    return f'<div class="form-alert {level}">{html.escape(text)}</div>'
+    return f'<div class="form-alert {level}">{escape_html(text)}</div>'
 
 
 def build_admin_alert(query: dict[str, list[str]]) -> str:
-    status = (query.get("admin_status") or query.get("status") or [""])[0]
+    status = first_query_value(query, "admin_status") or first_query_value(query, "status")
     if not status:
         return ""
     if status == "error":
@@ -1673,14 +2279,14 @@ def build_admin_alert(query: dict[str, list[str]]) -> str:
     if status not in messages:
         return ""
     text = messages[status]
-    return f'<div class="form-alert success">{html.escape(text)}</div>'
+    return f'<div class="form-alert success">{escape_html(text)}</div>'
 
 
 def resolve_admin_section(query: dict[str, list[str]]) -> str:
-    section = str((query.get("admin_section") or [""])[0]).strip().lower()
+    section = first_query_value(query, "admin_section").strip().lower()
     if section in {"inicio", "portal"}:
         return section
-    plan_user = str((query.get("plan_user") or [""])[0]).strip()
+    plan_user = first_query_value(query, "plan_user").strip()
     if plan_user:
         return "portal"
     return "inicio"
@@ -1721,7 +2327,7 @@ def build_access_alert(status: str, role: str) -> str:
         "admin_logout": ("success", "Sesión cerrada."),
     }
     level, text = messages.get(status, ("success", "Acceso actualizado."))
-    return f'<div class="form-alert {level}">{html.escape(text)}</div>'
+    return f'<div class="form-alert {level}">{escape_html(text)}</div>'
 
 
 def find_application(applications: list[dict], username: str) -> dict | None:
@@ -1732,56 +2338,59 @@ def find_application(applications: list[dict], username: str) -> dict | None:
     return None
 
 
-def render_application_list(applications: list[dict]) -> str:
-    items = []
+@functools.lru_cache(maxsize=1024)
+def quote_username(username: str) -> str:
+    # Valor de plan_user en enlaces y redirecciones; se repite para los mismos alumnos en cada render.
+    return urllib.parse.quote(username)
+
+
+def index_applications_by_username(applications: list[dict]) -> dict[str, dict]:
+    # Misma semántica que find_application: clave normalizada y primera coincidencia.
+    return {app.get("username", "").strip().lower(): app for app in reversed(applications)}
+
+
+def index_submissions_by_id(submissions: list[dict]) -> dict[str, dict]:
+    # Primera coincidencia por id, como el recorrido lineal que sustituye. Los envios sin id no se indexan.
+    return {sub["id"]: sub for sub in reversed(submissions) if sub["id"]}
+
+
+def iter_application_list(applications: list[dict]):
     for index, app in enumerate(applications):
         raw_id = str(app.get("id", ""))
-        app_id = html.escape(raw_id)
+        app_id = escape_html(raw_id)
         raw_username = str(app.get("username", ""))
-        username = html.escape(raw_username)
+        username = escape_html(raw_username)
         raw_email = str(app.get("email", ""))
-        email = html.escape(raw_email)
-        skill = html.escape(str(app.get("skill", "")))
-        level = html.escape(str(app.get("level", "")))
+        email = escape_html(raw_email)
+        skill = escape_html(str(app.get("skill", "")))
+        level = escape_html(str(app.get("level", "")))
         goal = html.escape(str(app.get("goal", "")))
         concerns = html.escape(str(app.get("concerns", "")))
         approved = bool(app.get("approved"))
         status = "Activo" if approved else "Pendiente"
         actions = []
         plan_href = (
-            f"/admin?admin_section=portal&plan_user={urllib.parse.quote(raw_username)}#plan"
+            f"/admin?admin_section=portal&plan_user={quote_username(raw_username)}#plan"
         )
         actions.append(f'<a class="btn glass primary small" href="{plan_href}">Ver alumno</a>')
         if not approved:
             actions.append(
-                "\n".join(
-                    [
-                        "  <form class=\"admin-inline-form\" action=\"/admin/applications/approve\" method=\"post\">",
-                        f"    <input type=\"hidden\" name=\"id\" value=\"{app_id}\">",
-                        "    <button class=\"btn glass primary small\" type=\"submit\">Aprobar</button>",
-                        "  </form>",
-                    ]
-                )
+                "  <form class=\"admin-inline-form\" action=\"/admin/applications/approve\" method=\"post\">\n"
+                f"    <input type=\"hidden\" name=\"id\" value=\"{app_id}\">\n"
+                "    <button class=\"btn glass primary small\" type=\"submit\">Aprobar</button>\n"
+                "  </form>"
             )
         actions.append(
-            "\n".join(
-                [
-                    "  <form class=\"admin-inline-form\" action=\"/admin/clients/duplicate\" method=\"post\">",
-                    f"    <input type=\"hidden\" name=\"id\" value=\"{app_id}\">",
-                    "    <button class=\"btn glass ghost small\" type=\"submit\">Duplicar</button>",
-                    "  </form>",
-                ]
-            )
+            "  <form class=\"admin-inline-form\" action=\"/admin/clients/duplicate\" method=\"post\">\n"
+            f"    <input type=\"hidden\" name=\"id\" value=\"{app_id}\">\n"
+            "    <button class=\"btn glass ghost small\" type=\"submit\">Duplicar</button>\n"
+            "  </form>"
         )
         actions.append(
-            "\n".join(
-                [
-                    "  <form class=\"admin-inline-form\" action=\"/admin/applications/delete\" method=\"post\">",
-                    f"    <input type=\"hidden\" name=\"id\" value=\"{app_id}\">",
-                    "    <button class=\"btn glass ghost small\" type=\"submit\">Rechazar</button>",
-                    "  </form>",
-                ]
-            )
+            "  <form class=\"admin-inline-form\" action=\"/admin/applications/delete\" method=\"post\">\n"
+            f"    <input type=\"hidden\" name=\"id\" value=\"{app_id}\">\n"
+            "    <button class=\"btn glass ghost small\" type=\"submit\">Rechazar</button>\n"
+            "  </form>"
         )
         search_blob = " ".join([raw_username, raw_email, str(app.get("skill", "")), raw_id]).lower()
         meta = []
@@ -1807,7 +2416,9 @@ def render_application_list(applications: list[dict]) -> str:
         if concerns:
             detail_lines.append(f"      <span>Inquietudes: {concerns}</span>")
         open_attr = " open" if index == 0 else ""
-        items.append(
+        if index:
+            yield "\n"
+        yield (
             "\n".join(
                 [
                     f'<li class="admin-item admin-edit-item admin-collapsible-item student-item" data-search="{html.escape(search_blob)}">',
@@ -1830,15 +2441,26 @@ def render_application_list(applications: list[dict]) -> str:
                 ]
             )
         )
-    return "\n".join(items) if items else "<li class=\"admin-item\">Sin solicitudes.</li>"
+    if not applications:
+        yield "<li class=\"admin-item\">Sin solicitudes.</li>"
+
+
+@functools.lru_cache(maxsize=4096)
+def format_timestamp(timestamp: int, pattern: str) -> str:
+    return site_datetime_from_timestamp(timestamp).strftime(pattern)
 
 
 def format_date(value: int | float | str) -> str:
+    if value == 0:
+        return EPOCH_DATE_TEXT
     try:
         timestamp = int(value)
     except (TypeError, ValueError):
         return ""
-    return site_datetime_from_timestamp(timestamp).strftime("%d-%m-%Y")
+    return format_timestamp(timestamp, "%d-%m-%Y")
+
+
+EPOCH_DATE_TEXT = format_timestamp(0, "%d-%m-%Y")
 
 
 def format_datetime(value: int | float | str) -> str:
@@ -1846,7 +2468,7 @@ def format_datetime(value: int | float | str) -> str:
         timestamp = int(value)
     except (TypeError, ValueError):
         return ""
-    return site_datetime_from_timestamp(timestamp).strftime("%d-%m %H:%M")
+    return format_timestamp(timestamp, "%d-%m %H:%M")
 
 
 def compute_day_progress(day: dict) -> dict:
@@ -1922,35 +2544,56 @@ def build_progress_payload(plan: dict) -> dict:
     return {"weeks": week_payload}
 
 
-def load_chat_messages(username: str) -> list[dict]:
-    records = load_json(CHATS_PATH, [])
-    if not isinstance(records, list):
-        return []
-    target = username.strip().lower()
-    filtered = []
+def group_chat_messages(records: list) -> dict[str, list[dict]]:
+    # Un solo recorrido de la lista: mensajes normalizados por usuario (minusculas) y ordenados por fecha.
+    grouped: dict[str, list[dict]] = {}
     for item in records:
         if not isinstance(item, dict):
             continue
-        if str(item.get("username", "")).strip().lower() != target:
-            continue
+        get = item.get
+        raw_username = str(get("username", ""))
         try:
-            created_at = int(item.get("created_at", 0) or 0)
+            created_at = int(get("created_at", 0) or 0)
         except (TypeError, ValueError):
             created_at = 0
-        filtered.append(
+        grouped.setdefault(raw_username.strip().lower(), []).append(
             {
-                "id": str(item.get("id", "")),
-                "username": str(item.get("username", "")),
-                "author": str(item.get("author", "")),
-                "text": str(item.get("text", "")),
+                "id": str(get("id", "")),
+                "username": raw_username,
+                "author": str(get("author", "")),
+                "text": str(get("text", "")),
                 "created_at": created_at,
             }
         )
-    filtered.sort(key=lambda entry: entry.get("created_at", 0))
-    return filtered
+    for messages in grouped.values():
+        messages.sort(key=itemgetter("created_at"))
+    return grouped
+
+
+def load_chats_by_user() -> dict[str, list[dict]]:
+    # Agrupado una vez por version de cache de CHATS_PATH. Dict y listas son de solo lectura.
+    global CHATS_BY_USER_CACHE
+    version, records = load_json_entry(CHATS_PATH, [])
+    if version is not None:
+        with CHATS_BY_USER_CACHE_LOCK:
+            cached = CHATS_BY_USER_CACHE
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    grouped = group_chat_messages(records if isinstance(records, list) else [])
+    if version is not None:
+        with CHATS_BY_USER_CACHE_LOCK:
+            CHATS_BY_USER_CACHE = (version, grouped)
+    return grouped
+
+
+def load_chat_messages(username: str) -> list[dict]:
+    # Lista compartida de load_chats_by_user: solo lectura.
+    return load_chats_by_user().get(username.strip().lower(), [])
 
 
 def render_chat_panel(username: str, role: str) -> str:
+    # Los mensajes son texto libre: sin la cache de escape_html.
+    escape = html.escape
     messages = load_chat_messages(username)
     items = []
     for msg in messages[-200:]:
@@ -1958,60 +2601,51 @@ def render_chat_panel(username: str, role: str) -> str:
         own = "is-own" if (role == "user" and author == "user") or (role == "admin" and author == "coach") else ""
         author_label = "Alumno" if author == "user" else "Profesor"
         created_at = format_datetime(msg.get("created_at", 0))
-        text = html.escape(msg.get("text", ""))
+        text = escape(msg.get("text", ""))
         items.append(
-            "\n".join(
-                [
-                    f'<li class="chat-message {own}">',
-                    f'  <span class="chat-author">{author_label}</span>',
-                    f"  <p>{text}</p>",
-                    f'  <span class="chat-time">{created_at}</span>',
-                    "</li>",
-                ]
-            )
+            f'<li class="chat-message {own}">\n'
+            f'  <span class="chat-author">{author_label}</span>\n'
+            f"  <p>{text}</p>\n"
+            f'  <span class="chat-time">{created_at}</span>\n'
+            "</li>"
         )
     list_html = "\n".join(items) if items else '<li class="chat-empty">Sin mensajes todavía.</li>'
     if role == "admin":
-        return "\n".join(
-            [
-                '<div class="portal-card glass-card chat-panel">',
-                f'  <h3 id="coach_chat_title">Comentarios con {html.escape(username)}</h3>',
-                f'  <ul id="coach_chat_list" class="chat-list">{list_html}</ul>',
-                '  <form class="admin-form chat-form" action="/admin/chat/send" method="post">',
-                f'    <input id="coach_chat_username" type="hidden" name="username" value="{html.escape(username)}">',
-                '    <div class="form-field">',
-                '      <label for="coach_chat_text">Comentario para el alumno</label>',
-                '      <textarea id="coach_chat_text" name="text" rows="3" placeholder="Escribe un mensaje..." required></textarea>',
-                "    </div>",
-                '    <button class="btn glass primary small" type="submit">Enviar</button>',
-                "  </form>",
-                "</div>",
-            ]
+        return (
+            '<div class="portal-card glass-card chat-panel">\n'
+            f'  <h3 id="coach_chat_title">Comentarios con {escape(username)}</h3>\n'
+            f'  <ul id="coach_chat_list" class="chat-list">{list_html}</ul>\n'
+            '  <form class="admin-form chat-form" action="/admin/chat/send" method="post">\n'
+            f'    <input id="coach_chat_username" type="hidden" name="username" value="{escape(username)}">\n'
+            '    <div class="form-field">\n'
+            '      <label for="coach_chat_text">Comentario para el alumno</label>\n'
+            '      <textarea id="coach_chat_text" name="text" rows="3" placeholder="Escribe un mensaje..." required></textarea>\n'
+            "    </div>\n"
+            '    <button class="btn glass primary small" type="submit">Enviar</button>\n'
+            "  </form>\n"
+            "</div>"
         )
     else:
-        form_html = "\n".join(
-            [
-                '<form class="admin-form chat-form" action="/portal/chat/send" method="post">',
-                '  <div class="form-field">',
-                '    <label for="user_chat_text">Comentarios con tu profesor</label>',
-                '    <textarea id="user_chat_text" name="text" rows="3" placeholder="Escribe tu consulta o comentario..." required></textarea>',
-                "  </div>",
-                '  <button class="btn glass primary small" type="submit">Enviar</button>',
-                "</form>",
-            ]
+        form_html = (
+            '<form class="admin-form chat-form" action="/portal/chat/send" method="post">\n'
+            '  <div class="form-field">\n'
+            '    <label for="user_chat_text">Comentarios con tu profesor</label>\n'
+            '    <textarea id="user_chat_text" name="text" rows="3" placeholder="Escribe tu consulta o comentario..." required></textarea>\n'
+            "  </div>\n"
+            '  <button class="btn glass primary small" type="submit">Enviar</button>\n'
+            "</form>"
         )
-    return "\n".join(
-        [
-            '<div class="portal-card glass-card chat-panel">',
-            "  <h3>Comentarios con tu profesor</h3>",
-            f'  <ul class="chat-list">{list_html}</ul>',
-            form_html,
-            "</div>",
-        ]
+    return (
+        '<div class="portal-card glass-card chat-panel">\n'
+        "  <h3>Comentarios con tu profesor</h3>\n"
+        f'  <ul class="chat-list">{list_html}</ul>\n'
+        f"{form_html}\n"
+        "</div>"
     )
 
 
 def render_coach_dashboard(applications: list[dict], storage_status: dict) -> str:
+    escape = escape_html
     now = datetime.now()
     this_month = 0
     duplicate_rows = 0
@@ -2048,9 +2682,9 @@ def render_coach_dashboard(applications: list[dict], storage_status: dict) -> st
         storage_class = "storage-ok"
     elif storage_mode in {"db_error", "db_required_missing"}:
         storage_class = "storage-error"
-    storage_title = html.escape(str(storage_status.get("title", "")))
-    storage_detail = html.escape(str(storage_status.get("detail", "")))
-    storage_debug = html.escape(str(storage_status.get("debug", "")))
+    storage_title = escape(str(storage_status.get("title", "")))
+    storage_detail = escape(str(storage_status.get("detail", "")))
+    storage_debug = escape(str(storage_status.get("debug", "")))
     storage_strict = bool(storage_status.get("strict"))
     storage_lines = [
         f'  <div class="storage-pill {storage_class}">',
@@ -2106,19 +2740,19 @@ def render_coach_dashboard(applications: list[dict], storage_status: dict) -> st
     smtp_lines = [
         f'  <div class="storage-pill {smtp_class}">',
         '    <span class="storage-pill-label">Estado SMTP</span>',
-        f"    <strong>{html.escape(smtp_title)}</strong>",
-        f"    <span>{html.escape(smtp_detail)}</span>",
+        f"    <strong>{escape(smtp_title)}</strong>",
+        f"    <span>{escape(smtp_detail)}</span>",
         (
             "    <span>"
-            f"Host: {html.escape(smtp_host)} · Puerto: {smtp_port} · Seguridad: {html.escape(smtp_security)}"
+            f"Host: {escape(smtp_host)} · Puerto: {smtp_port} · Seguridad: {escape(smtp_security)}"
             "</span>"
         ),
-        f"    <span>Usuario SMTP: {html.escape(smtp_user)}</span>",
-        f"    <span>Bandeja admin: {html.escape(smtp_admin)}</span>",
+        f"    <span>Usuario SMTP: {escape(smtp_user)}</span>",
+        f"    <span>Bandeja admin: {escape(smtp_admin)}</span>",
         (
             "    <span>"
-            f"Origen variables: host={html.escape(smtp_host_source)} · "
-            f"user={html.escape(smtp_user_source)} · pass={html.escape(smtp_pass_source)}"
+            f"Origen variables: host={escape(smtp_host_source)} · "
+            f"user={escape(smtp_user_source)} · pass={escape(smtp_pass_source)}"
             "</span>"
         ),
     ]
@@ -2127,47 +2761,45 @@ def render_coach_dashboard(applications: list[dict], storage_status: dict) -> st
             [
                 '    <details class="storage-pill-debug">',
                 "      <summary>Ver detalle técnico SMTP</summary>",
-                f"      <pre>{html.escape(smtp_error)}</pre>",
+                f"      <pre>{escape(smtp_error)}</pre>",
                 "    </details>",
             ]
         )
     smtp_lines.append("  </div>")
     smtp_html = "\n".join(smtp_lines)
-    return "\n".join(
-        [
-            '<div class="admin-card glass-card admin-wide">',
-            '  <details class="admin-collapsible admin-main-collapsible" open>',
-            '    <summary class="admin-collapsible-summary admin-main-summary">',
-            '      <div class="admin-collapsible-main">',
-            "        <strong>Gestión de alumnos</strong>",
-            "        <span>Estado de guardado, métricas y filtro</span>",
-            "      </div>",
-            '      <span class="admin-collapsible-tag">Dashboard</span>',
-            "    </summary>",
-            '    <div class="admin-collapsible-content coach-dashboard">',
-            "      <div class=\"coach-dashboard-head\">",
-            '        <a class="btn glass ghost small" href="/admin/export/json">⬇ Descargar todos los JSON en ZIP</a>',
-            '        <form class="admin-inline-form" action="/admin/smtp/test" method="post">',
-            '          <button class="btn glass ghost small" type="submit">Probar SMTP</button>',
-            "        </form>",
-            "      </div>",
-            storage_html,
-            smtp_html,
-            "      <div class=\"coach-stats\">",
-            f"        <span>Total de alumnos: <strong>{total}</strong></span>",
-            f"        <span>Activos: <strong>{approved}</strong></span>",
-            f"        <span>Pendientes: <strong>{pending}</strong></span>",
-            f"        <span>Altas este mes: <strong>{this_month}</strong></span>",
-            f"        <span>Posibles duplicados: <strong>{duplicate_rows}</strong></span>",
-            "      </div>",
-            '      <div class="form-field">',
-            '        <label for="student_search">Buscar alumno (usuario, email o ID)</label>',
-            '        <input id="student_search" type="text" placeholder="Escribe para filtrar...">',
-            "      </div>",
-            "    </div>",
-            "  </details>",
-            "</div>",
-        ]
+    return (
+        '<div class="admin-card glass-card admin-wide">\n'
+        '  <details class="admin-collapsible admin-main-collapsible" open>\n'
+        '    <summary class="admin-collapsible-summary admin-main-summary">\n'
+        '      <div class="admin-collapsible-main">\n'
+        "        <strong>Gestión de alumnos</strong>\n"
+        "        <span>Estado de guardado, métricas y filtro</span>\n"
+        "      </div>\n"
+        '      <span class="admin-collapsible-tag">Dashboard</span>\n'
+        "    </summary>\n"
+        '    <div class="admin-collapsible-content coach-dashboard">\n'
+        "      <div class=\"coach-dashboard-head\">\n"
+        '        <a class="btn glass ghost small" href="/admin/export/json">⬇ Descargar todos los JSON en ZIP</a>\n'
+        '        <form class="admin-inline-form" action="/admin/smtp/test" method="post">\n'
+        '          <button class="btn glass ghost small" type="submit">Probar SMTP</button>\n'
+        "        </form>\n"
+        "      </div>\n"
+        f"{storage_html}\n"
+        f"{smtp_html}\n"
+        "      <div class=\"coach-stats\">\n"
+        f"        <span>Total de alumnos: <strong>{total}</strong></span>\n"
+        f"        <span>Activos: <strong>{approved}</strong></span>\n"
+        f"        <span>Pendientes: <strong>{pending}</strong></span>\n"
+        f"        <span>Altas este mes: <strong>{this_month}</strong></span>\n"
+        f"        <span>Posibles duplicados: <strong>{duplicate_rows}</strong></span>\n"
+        "      </div>\n"
+        '      <div class="form-field">\n'
+        '        <label for="student_search">Buscar alumno (usuario, email o ID)</label>\n'
+        '        <input id="student_search" type="text" placeholder="Escribe para filtrar...">\n'
+        "      </div>\n"
+        "    </div>\n"
+        "  </details>\n"
+        "</div>"
     )
 
 
@@ -2184,37 +2816,35 @@ def render_visit_metrics() -> str:
     has_visits = total_views > 0
     status_class = "storage-ok" if has_visits else "storage-local"
     status_title = "Contador activo" if has_visits else "Esperando primeras visitas"
-    last_visit_text = html.escape(format_visit_timestamp(stats.get("last_visit_at", 0)))
-
-    return "\n".join(
-        [
-            '<div class="admin-card glass-card admin-wide">',
-            '  <details class="admin-collapsible admin-main-collapsible" open>',
-            '    <summary class="admin-collapsible-summary admin-main-summary">',
-            '      <div class="admin-collapsible-main">',
-            "        <strong>Visitas a la web</strong>",
-            "        <span>Actividad de la pagina principal en hora de Madrid</span>",
-            "      </div>",
-            '      <span class="admin-collapsible-tag">Metricas</span>',
-            "    </summary>",
-            '    <div class="admin-collapsible-content coach-dashboard">',
-            '      <div class="coach-stats">',
-            f"        <span>Visitas totales: <strong>{format_admin_number(total_views)}</strong></span>",
-            f"        <span>Visitantes unicos: <strong>{format_admin_number(unique_visitors)}</strong></span>",
-            f"        <span>Hoy: <strong>{format_admin_number(today_views)}</strong></span>",
-            f"        <span>Ultimos 7 dias: <strong>{format_admin_number(recent_views)}</strong></span>",
-            "      </div>",
-            f'      <div class="storage-pill {status_class}">',
-            '        <span class="storage-pill-label">Actividad</span>',
-            f"        <strong>{html.escape(status_title)}</strong>",
-            "        <span>Cuenta las aperturas de la pagina principal.</span>",
-            "        <span>Los visitantes unicos se estiman por navegador usando una cookie persistente.</span>",
-            f"        <span>Ultima visita detectada: {last_visit_text} (hora de Madrid).</span>",
-            "      </div>",
-            "    </div>",
-            "  </details>",
-            "</div>",
-        ]
+    last_visit_text = escape_html(format_visit_timestamp(stats.get("last_visit_at", 0)))
+
+    return (
+        '<div class="admin-card glass-card admin-wide">\n'
+        '  <details class="admin-collapsible admin-main-collapsible" open>\n'
+        '    <summary class="admin-collapsible-summary admin-main-summary">\n'
+        '      <div class="admin-collapsible-main">\n'
+        "        <strong>Visitas a la web</strong>\n"
+        "        <span>Actividad de la pagina principal en hora de Madrid</span>\n"
+        "      </div>\n"
+        '      <span class="admin-collapsible-tag">Metricas</span>\n'
+        "    </summary>\n"
+        '    <div class="admin-collapsible-content coach-dashboard">\n'
+        '      <div class="coach-stats">\n'
+        f"        <span>Visitas totales: <strong>{format_admin_number(total_views)}</strong></span>\n"
+        f"        <span>Visitantes unicos: <strong>{format_admin_number(unique_visitors)}</strong></span>\n"
+        f"        <span>Hoy: <strong>{format_admin_number(today_views)}</strong></span>\n"
+        f"        <span>Ultimos 7 dias: <strong>{format_admin_number(recent_views)}</strong></span>\n"
+        "      </div>\n"
+        f'      <div class="storage-pill {status_class}">\n'
+        '        <span class="storage-pill-label">Actividad</span>\n'
+        f"        <strong>{escape_html(status_title)}</strong>\n"
+        "        <span>Cuenta las aperturas de la pagina principal.</span>\n"
+        "        <span>Los visitantes unicos se estiman por navegador usando una cookie persistente.</span>\n"
+        f"        <span>Ultima visita detectada: {last_visit_text} (hora de Madrid).</span>\n"
+        "      </div>\n"
+        "    </div>\n"
+        "  </details>\n"
+        "</div>"
     )
 
 
@@ -2251,13 +2881,63 @@ def plan_week_to_texts(week: dict) -> list[str]:
     return texts[:7]
 
 
+def render_training_item(item: dict, week_index: int, day_index: int, item_index: int) -> str:
+    escape = escape_html
+    exercise = escape(item.get("exercise", ""))
+    sets = escape(item.get("sets", ""))
+    reps = escape(item.get("reps", ""))
+    weight = escape(item.get("weight", ""))
+    rest = escape(item.get("rest", ""))
+    notes = escape(item.get("notes", ""))
+    status = str(item.get("status", "")).strip()
+    status_note = escape(item.get("status_note", ""))
+    student_note = escape(item.get("student_note", ""))
+    status_badge, status_class = TRAINING_ITEM_STATUS.get(status, ("Pendiente", "pending"))
+    meta_html = (
+        (f"<span>Series: {sets}</span>" if sets else "")
+        + (f"<span>Reps: {reps}</span>" if reps else "")
+        + (f"<span>Peso: {weight}</span>" if weight else "")
+        + (f"<span>Descanso: {rest}</span>" if rest else "")
+        + (f"<span>Notas: {notes}</span>" if notes else "")
+    ) or "<span>Trabajo técnico.</span>"
+    status_note_html = f'              <p class="item-status-note">{status_note}</p>\n' if status_note else ""
+    return (
+        f'            <div class="plan-item portal-item {status_class}">\n'
+        '              <div class="portal-item-head">\n'
+        f"                <h4>{exercise or 'Ejercicio'}</h4>\n"
+        f'                <span class="item-status {status_class}">{status_badge}</span>\n'
+        "              </div>\n"
+        f'              <div class="plan-meta">{meta_html}</div>\n'
+        f"{status_note_html}"
+        '              <form class="item-status-form" action="/portal/item/update" method="post">\n'
+        f'                <input type="hidden" name="week" value="{week_index}">\n'
+        f'                <input type="hidden" name="day" value="{day_index}">\n'
+        f'                <input type="hidden" name="item" value="{item_index}">\n'
+        '                <div class="status-buttons">\n'
+        f'                  <button class="status-button done{" is-active" if status == "done" else ""}" type="submit" name="status" value="done">Hecho</button>\n'
+        f'                  <button class="status-button missed{" is-active" if status == "missed" else ""}" type="submit" name="status" value="missed">Fallé</button>\n'
+        "                </div>\n"
+        f'                <input class="status-note" name="status_note" type="text" placeholder="Motivo (opcional)" value="{status_note}">\n'
+        f'                <textarea class="day-feedback" name="student_note" rows="2" placeholder="Pesos usados / sensaciones">{student_note}</textarea>\n'
+        '                <button class="btn glass ghost small" type="submit">Guardar</button>\n'
+        "              </form>\n"
+        "            </div>"
+    )
+
+
+TRAINING_ITEM_STATUS = {
+    "done": ("Completado", "done"),
+    "missed": ("Fallado", "missed"),
+}
+
+
 def render_training_plan(plan: dict, active_week: int | None = None) -> str:
     normalized = normalize_plan(plan)
     if active_week not in {1, 2, 3, 4}:
         active_week = None
     parts = [
         '<div class="training-board glass-card" data-stagger>',
-        f'  <div class="training-head"><h3>{html.escape(normalized.get("title", "Plan de entrenamiento"))}</h3></div>',
+        f'  <div class="training-head"><h3>{escape_html(normalized.get("title", "Plan de entrenamiento"))}</h3></div>',
         '  <div class="training-filter">',
         '    <label for="portal_week_select">Semana</label>',
         '    <select id="portal_week_select">',
@@ -2271,8 +2951,8 @@ def render_training_plan(plan: dict, active_week: int | None = None) -> str:
         '  <div class="training-grid">',
     ]
     for week_index, week in enumerate(normalized.get("weeks", []), start=1):
-        week_title = html.escape(week.get("title", f"Semana {week_index}"))
-        week_summary = html.escape(week.get("summary", ""))
+        week_title = escape_html(week.get("title", f"Semana {week_index}"))
+        week_summary = escape_html(week.get("summary", ""))
         week_stats = compute_week_progress(week)
         hidden_class = ""
         if active_week and active_week != week_index:
@@ -2313,14 +2993,14 @@ def render_training_plan(plan: dict, active_week: int | None = None) -> str:
         parts.append('      <div class="day-grid">')
         days = week.get("days") or []
         for day_index, day_text in enumerate(days, start=1):
-            day_title = html.escape(day_text.get("title", "")) if isinstance(day_text, dict) else ""
+            day_title = escape_html(day_text.get("title", "")) if isinstance(day_text, dict) else ""
             rest_flag = bool(day_text.get("rest")) if isinstance(day_text, dict) else False
             day_label = day_title or DAY_LABELS[(day_index - 1) % len(DAY_LABELS)]
             day_stats = compute_day_progress(day_text if isinstance(day_text, dict) else {})
             parts.append('        <div class="day-card">')
             parts.append('          <div class="day-card-head">')
             parts.append(f'            <span class="day-label">Día {day_index}</span>')
-            parts.append(f'            <strong class="day-title">{html.escape(day_label)}</strong>')
+            parts.append(f'            <strong class="day-title">{escape_html(day_label)}</strong>')
             parts.append(
                 f'            <span class="day-mini-stats">✓ {day_stats["done"]} · ✕ {day_stats["missed"]} · ⏳ {day_stats["pending"]}</span>'
             )
@@ -2332,69 +3012,11 @@ def render_training_plan(plan: dict, active_week: int | None = None) -> str:
                 if len(items) > 1:
                     parts.append('          <div class="portal-scroll-hint">Desliza para ver todos los ejercicios en orden</div>')
                 parts.append('          <div class="plan-items portal-items-row">')
-                for item_index, item in enumerate(items, start=1):
-                    if not isinstance(item, dict):
-                        continue
-                    exercise = html.escape(item.get("exercise", ""))
-                    sets = html.escape(item.get("sets", ""))
-                    reps = html.escape(item.get("reps", ""))
-                    weight = html.escape(item.get("weight", ""))
-                    rest = html.escape(item.get("rest", ""))
-                    notes = html.escape(item.get("notes", ""))
-                    status = str(item.get("status", "")).strip()
-                    status_note = html.escape(item.get("status_note", ""))
-                    student_note = html.escape(item.get("student_note", ""))
-                    status_badge = "Pendiente"
-                    status_class = "pending"
-                    if status == "done":
-                        status_badge = "Completado"
-                        status_class = "done"
-                    elif status == "missed":
-                        status_badge = "Fallado"
-                        status_class = "missed"
-                    meta_parts = []
-                    if sets:
-                        meta_parts.append(f"<span>Series: {sets}</span>")
-                    if reps:
-                        meta_parts.append(f"<span>Reps: {reps}</span>")
-                    if weight:
-                        meta_parts.append(f"<span>Peso: {weight}</span>")
-                    if rest:
-                        meta_parts.append(f"<span>Descanso: {rest}</span>")
-                    if notes:
-                        meta_parts.append(f"<span>Notas: {notes}</span>")
-                    meta_html = "".join(meta_parts) if meta_parts else "<span>Trabajo técnico.</span>"
-                    parts.append(f'            <div class="plan-item portal-item {status_class}">')
-                    parts.append('              <div class="portal-item-head">')
-                    parts.append(f"                <h4>{exercise or 'Ejercicio'}</h4>")
-                    parts.append(f'                <span class="item-status {status_class}">{status_badge}</span>')
-                    parts.append("              </div>")
-                    parts.append(f'              <div class="plan-meta">{meta_html}</div>')
-                    if status_note:
-                        parts.append(f'              <p class="item-status-note">{status_note}</p>')
-                    parts.append('              <form class="item-status-form" action="/portal/item/update" method="post">')
-                    parts.append(f'                <input type="hidden" name="week" value="{week_index}">')
-                    parts.append(f'                <input type="hidden" name="day" value="{day_index}">')
-                    parts.append(f'                <input type="hidden" name="item" value="{item_index}">')
-                    parts.append('                <div class="status-buttons">')
-                    parts.append(
-                        f'                  <button class="status-button done{" is-active" if status == "done" else ""}" type="submit" name="status" value="done">Hecho</button>'
-                    )
-                    parts.append(
-                        f'                  <button class="status-button missed{" is-active" if status == "missed" else ""}" type="submit" name="status" value="missed">Fallé</button>'
-                    )
-                    parts.append("                </div>")
-                    parts.append(
-                        f'                <input class="status-note" name="status_note" type="text" placeholder="Motivo (opcional)" value="{status_note}">'
-                    )
-                    parts.append(
-                        f'                <textarea class="day-feedback" name="student_note" rows="2" placeholder="Pesos usados / sensaciones">{student_note}</textarea>'
-                    )
-                    parts.append(
-                        '                <button class="btn glass ghost small" type="submit">Guardar</button>'
-                    )
-                    parts.append("              </form>")
-                    parts.append("            </div>")
+                parts.extend(
+                    render_training_item(item, week_index, day_index, item_index)
+                    for item_index, item in enumerate(items, start=1)
+                    if isinstance(item, dict)
+                )
                 parts.append("          </div>")
             parts.append('        </div>')
         parts.append("      </div>")
@@ -2416,134 +3038,97 @@ def render_training_plan(plan: dict, active_week: int | None = None) -> str:
     return "\n".join(parts)
 
 
+def media_extension(name: str) -> str:
+    # Mismo resultado que Path(name).suffix.lower() sin construir un Path por elemento.
+    base = name
+    if "/" in base or base == ".":
+        base = next((part for part in reversed(name.split("/")) if part and part != "."), "")
+    dot = base.rfind(".")
+    if 0 < dot < len(base) - 1:
+        return base[dot:].lower()
+    return ""
+
+
 def render_submission_media(submission: dict) -> str:
     file_name = submission.get("file") or ""
     video_url = submission.get("video_url") or ""
     if file_name:
-        ext = Path(file_name).suffix.lower()
-        src = f"/uploads/{file_name}"
-        if ext in ALLOWED_IMAGE_EXT:
-            return (
-                f'<img src="{html.escape(src)}" alt="{html.escape(submission.get("title", ""))}" '
-                'loading="lazy" decoding="async">'
-            )
-        return (
-            f'<video data-src="{html.escape(src)}" autoplay loop muted playsinline preload="none"></video>'
-        )
+        src = "/uploads/" + escape_html(file_name)
+        if media_extension(file_name) in ALLOWED_IMAGE_EXT:
+            return IMAGE_MEDIA_TEMPLATE % (src, escape_html(submission.get("title", "")))
+        return VIDEO_MEDIA_TEMPLATE % src
     if video_url:
         return (
-            f'<a class="btn glass ghost small" href="{html.escape(video_url)}" '
+            f'<a class="btn glass ghost small" href="{escape_html(video_url)}" '
             f'target="_blank" rel="noopener">Ver vídeo</a>'
         )
     return PLACEHOLDER_SVG
 
 
+def render_comment_item(comment: dict) -> str:
+    return (
+        f'<li><span>{format_date(comment.get("created_at", 0))}</span>'
+        f'<p>{html.escape(comment.get("text", ""))}</p></li>'
+    )
+
+
 def render_submission_comments(comments: list[dict]) -> str:
     if not comments:
         return '<p class="form-note">Sin comentarios todavía.</p>'
-    items = []
-    for comment in comments:
-        text = html.escape(comment.get("text", ""))
-        created = format_date(comment.get("created_at", 0))
-        items.append(f'<li><span>{created}</span><p>{text}</p></li>')
-    return f'<ul class="comment-list">{"".join(items)}</ul>'
+    return f'<ul class="comment-list">{"".join(map(render_comment_item, comments))}</ul>'
 
 
 def render_user_submissions(submissions: list[dict], username: str) -> str:
     cards = []
-    for sub in submissions:
-        if sub.get("username") != username:
-            continue
-        title = html.escape(sub.get("title", "Envío"))
+    escape = escape_html
+    date_of = format_date
+    media_of = render_submission_media
+    comments_of = render_submission_comments
+    for sub in [sub for sub in submissions if sub.get("username") == username]:
+        title = escape(sub.get("title", "Envío"))
         desc = html.escape(sub.get("description", ""))
-        created = format_date(sub.get("created_at", 0))
-        media = render_submission_media(sub)
-        comments_html = render_submission_comments(sub.get("comments", []))
+        created = date_of(sub.get("created_at", 0))
+        media = media_of(sub)
+        comments_html = comments_of(sub["comments"])
         cards.append(
-            "\n".join(
-                [
-                    '<div class="submission-card glass-card stagger-item">',
-                    f"  <div class=\"submission-head\"><h4>{title}</h4><span>{created}</span></div>",
-                    f"  <p>{desc}</p>",
-                    f"  <div class=\"submission-media\">{media}</div>",
-                    f"  <div class=\"submission-comments\">{comments_html}</div>",
-                    "</div>",
-                ]
-            )
+            '<div class="submission-card glass-card stagger-item">\n'
+            f"  <div class=\"submission-head\"><h4>{title}</h4><span>{created}</span></div>\n"
+            f"  <p>{desc}</p>\n"
+            f"  <div class=\"submission-media\">{media}</div>\n"
+            f"  <div class=\"submission-comments\">{comments_html}</div>\n"
+            "</div>"
         )
     return "\n".join(cards) if cards else "<p class=\"form-note\">Aún no tienes envíos.</p>"
 
 
-def render_admin_submissions(submissions: list[dict]) -> str:
-    cards = []
-    for sub in submissions:
-        raw_id = sub.get("id", "")
-        sub_id = html.escape(raw_id)
-        comment_id = html.escape(f"comment_{raw_id}")
-        username = html.escape(sub.get("username", ""))
-        title = html.escape(sub.get("title", "Envío"))
-        desc = html.escape(sub.get("description", ""))
-        created = format_date(sub.get("created_at", 0))
-        media = render_submission_media(sub)
-        comments_html = render_submission_comments(sub.get("comments", []))
-        cards.append(
-            "\n".join(
-                [
-                    '<div class="submission-card glass-card stagger-item">',
-                    f"  <div class=\"submission-head\"><h4>{title}</h4><span>{created}</span></div>",
-                    f"  <p class=\"submission-user\">Alumno: {username}</p>",
-                    f"  <p>{desc}</p>",
-                    f"  <div class=\"submission-media\">{media}</div>",
-                    f"  <div class=\"submission-comments\">{comments_html}</div>",
-                    "  <form class=\"admin-form\" action=\"/admin/submissions/comment\" method=\"post\">",
-                    f"    <input type=\"hidden\" name=\"id\" value=\"{sub_id}\">",
-                    "    <div class=\"form-field\">",
-                    f"      <label for=\"{comment_id}\">Comentario técnico</label>",
-                    f"      <textarea id=\"{comment_id}\" name=\"comment\" rows=\"3\" required></textarea>",
-                    "    </div>",
-                    "    <button class=\"btn glass primary small\" type=\"submit\">Enviar comentario</button>",
-                    "  </form>",
-                    "  <form class=\"admin-form\" action=\"/admin/submissions/delete\" method=\"post\">",
-                    f"    <input type=\"hidden\" name=\"id\" value=\"{sub_id}\">",
-                    "    <button class=\"btn glass ghost small\" type=\"submit\">Eliminar envío</button>",
-                    "  </form>",
-                    "</div>",
-                ]
-            )
-        )
-    return "\n".join(cards) if cards else "<p class=\"form-note\">Sin envíos todavía.</p>"
-
-
 def render_forgot_password_block(prefix: str) -> str:
     safe_prefix = re.sub(r"[^a-z0-9_-]", "", prefix.lower()) or "reset"
     user_id = f"{safe_prefix}_reset_user"
     email_id = f"{safe_prefix}_reset_email"
-    return "\n".join(
-        [
-            '<details class="forgot-password-block">',
-            "  <summary>¿Olvidaste tu contraseña?</summary>",
-            '  <form class="admin-form" action="/password/forgot" method="post">',
-            '    <div class="form-row">',
-            '      <div class="form-field">',
-            f'        <label for="{user_id}">Usuario</label>',
-            f'        <input id="{user_id}" name="username" type="text" required>',
-            "      </div>",
-            '      <div class="form-field">',
-            f'        <label for="{email_id}">Email</label>',
-            f'        <input id="{email_id}" name="email" type="email" required>',
-            "      </div>",
-            "    </div>",
-            '    <button class="btn glass primary small" type="submit">Enviar enlace</button>',
-            '    <p class="form-note">Usa el mismo usuario y correo con el que te registraste.</p>',
-            "  </form>",
-            "</details>",
-        ]
+    return (
+        '<details class="forgot-password-block">\n'
+        "  <summary>¿Olvidaste tu contraseña?</summary>\n"
+        '  <form class="admin-form" action="/password/forgot" method="post">\n'
+        '    <div class="form-row">\n'
+        '      <div class="form-field">\n'
+        f'        <label for="{user_id}">Usuario</label>\n'
+        f'        <input id="{user_id}" name="username" type="text" required>\n'
+        "      </div>\n"
+        '      <div class="form-field">\n'
+        f'        <label for="{email_id}">Email</label>\n'
+        f'        <input id="{email_id}" name="email" type="email" required>\n'
+        "      </div>\n"
+        "    </div>\n"
+        '    <button class="btn glass primary small" type="submit">Enviar enlace</button>\n'
+        '    <p class="form-note">Usa el mismo usuario y correo con el que te registraste.</p>\n'
+        "  </form>\n"
+        "</details>"
     )
 
 
 def render_password_reset_page(query: dict[str, list[str]]) -> str:
-    token = (query.get("token") or [""])[0].strip()
-    access_status = (query.get("access") or [""])[0]
+    token = first_query_value(query, "token").strip()
+    access_status = first_query_value(query, "access")
     reset_data = peek_password_reset_token(token) if token else None
 
     if not access_status and token and not reset_data:
@@ -2552,210 +3137,207 @@ def render_password_reset_page(query: dict[str, list[str]]) -> str:
 
     if reset_data:
         username = html.escape(str(reset_data.get("username", "")))
-        card = "\n".join(
-            [
-                '<div class="admin-login glass-card">',
-                "  <h2>Restablecer contraseña</h2>",
-                f"  {alert}" if alert else "",
-                f"  <p>Vas a actualizar la contraseña de <strong>{username}</strong>.</p>",
-                '  <form class="admin-form" action="/password/reset" method="post">',
-                f'    <input type="hidden" name="token" value="{html.escape(token)}">',
-                '    <div class="form-field">',
-                '      <label for="reset_password">Nueva contraseña</label>',
-                '      <input id="reset_password" name="password" type="password" required>',
-                "    </div>",
-                '    <div class="form-field">',
-                '      <label for="reset_password_confirm">Repite la contraseña</label>',
-                '      <input id="reset_password_confirm" name="password_confirm" type="password" required>',
-                "    </div>",
-                '    <button class="btn glass primary" type="submit">Guardar contraseña</button>',
-                "  </form>",
-                '  <a class="btn glass ghost small" href="/portal">Volver al acceso</a>',
-                "</div>",
-            ]
+        alert_line = f"  {alert}" if alert else ""
+        card = (
+            '<div class="admin-login glass-card">\n'
+            "  <h2>Restablecer contraseña</h2>\n"
+            f"{alert_line}\n"
+            f"  <p>Vas a actualizar la contraseña de <strong>{username}</strong>.</p>\n"
+            '  <form class="admin-form" action="/password/reset" method="post">\n'
+            f'    <input type="hidden" name="token" value="{html.escape(token)}">\n'
+            '    <div class="form-field">\n'
+            '      <label for="reset_password">Nueva contraseña</label>\n'
+            '      <input id="reset_password" name="password" type="password" required>\n'
+            "    </div>\n"
+            '    <div class="form-field">\n'
+            '      <label for="reset_password_confirm">Repite la contraseña</label>\n'
+            '      <input id="reset_password_confirm" name="password_confirm" type="password" required>\n'
+            "    </div>\n"
+            '    <button class="btn glass primary" type="submit">Guardar contraseña</button>\n'
+            "  </form>\n"
+            '  <a class="btn glass ghost small" href="/portal">Volver al acceso</a>\n'
+            "</div>"
         )
     else:
         fallback_alert = alert or build_access_alert("user_reset_invalid", "user")
-        card = "\n".join(
-            [
-                '<div class="admin-login glass-card">',
-                "  <h2>Restablecer contraseña</h2>",
-                f"  {fallback_alert}" if fallback_alert else "",
-                "  <p>Solicita un nuevo enlace desde el acceso a tu Área Privada.</p>",
-                '  <a class="btn glass primary" href="/portal">Ir al portal</a>',
-                "</div>",
-            ]
+        alert_line = f"  {fallback_alert}" if fallback_alert else ""
+        card = (
+            '<div class="admin-login glass-card">\n'
+            "  <h2>Restablecer contraseña</h2>\n"
+            f"{alert_line}\n"
+            "  <p>Solicita un nuevo enlace desde el acceso a tu Área Privada.</p>\n"
+            '  <a class="btn glass primary" href="/portal">Ir al portal</a>\n'
+            "</div>"
         )
 
-    return "\n".join(
-        [
-            "<!doctype html>",
-            "<html lang=\"es\">",
-            "  <head>",
-            "    <meta charset=\"utf-8\">",
-            "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">",
-            "    <title>Restablecer contraseña - AuraCalistenia</title>",
-            "    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">",
-            "    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>",
-            "    <link href=\"https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Space+Grotesk:wght@300;400;500;600;700&display=swap\" rel=\"stylesheet\">",
-            "    <link rel=\"stylesheet\" href=\"/styles.css?v=20260303-2\">",
-            "  </head>",
-            "  <body class=\"admin-body\">",
-            "    <div class=\"noise\" aria-hidden=\"true\"></div>",
-            "    <header class=\"nav\">",
-            "      <div class=\"nav-inner\">",
-            "        <nav class=\"nav-group nav-left\"></nav>",
-            "        <a class=\"nav-brand\" href=\"/\" aria-label=\"AuraCalistenia\">",
-            "          <span class=\"brand-mark\" aria-hidden=\"true\"></span>",
-            "        </a>",
-            "        <nav class=\"nav-group nav-right\">",
-            "          <a href=\"/\">Inicio</a>",
-            "          <a href=\"/portal\">Portal</a>",
-            "        </nav>",
-            "        <nav class=\"nav-group nav-compact\" aria-label=\"Navegación\">",
-            "          <a href=\"/\">Inicio</a>",
-            "          <a href=\"/portal\">Portal</a>",
-            "        </nav>",
-            "      </div>",
-            "    </header>",
-            "    <main class=\"section\">",
-            f"      {card}",
-            "    </main>",
-            "    <script src=\"/script.js?v=20260303-2\"></script>",
-            "  </body>",
-            "</html>",
-        ]
+    return (
+        "<!doctype html>\n"
+        "<html lang=\"es\">\n"
+        "  <head>\n"
+        "    <meta charset=\"utf-8\">\n"
+        "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        "    <title>Restablecer contraseña - AuraCalistenia</title>\n"
+        "    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">\n"
+        "    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>\n"
+        "    <link href=\"https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Space+Grotesk:wght@300;400;500;600;700&display=swap\" rel=\"stylesheet\">\n"
+        "    <link rel=\"stylesheet\" href=\"/styles.css?v=20260303-2\">\n"
+        "  </head>\n"
+        "  <body class=\"admin-body\">\n"
+        "    <div class=\"noise\" aria-hidden=\"true\"></div>\n"
+        "    <header class=\"nav\">\n"
+        "      <div class=\"nav-inner\">\n"
+        "        <nav class=\"nav-group nav-left\"></nav>\n"
+        "        <a class=\"nav-brand\" href=\"/\" aria-label=\"AuraCalistenia\">\n"
+        "          <span class=\"brand-mark\" aria-hidden=\"true\"></span>\n"
+        "        </a>\n"
+        "        <nav class=\"nav-group nav-right\">\n"
+        "          <a href=\"/\">Inicio</a>\n"
+        "          <a href=\"/portal\">Portal</a>\n"
+        "        </nav>\n"
+        "        <nav class=\"nav-group nav-compact\" aria-label=\"Navegación\">\n"
+        "          <a href=\"/\">Inicio</a>\n"
+        "          <a href=\"/portal\">Portal</a>\n"
+        "        </nav>\n"
+        "      </div>\n"
+        "    </header>\n"
+        "    <main class=\"section\">\n"
+        f"      {card}\n"
+        "    </main>\n"
+        "    <script src=\"/script.js?v=20260303-2\"></script>\n"
+        "  </body>\n"
+        "</html>"
     )
 
 
 def render_review_page(card_html: str, page_title: str = "Revisar solicitud - AuraCalistenia") -> str:
-    return "\n".join(
-        [
-            "<!doctype html>",
-            "<html lang=\"es\">",
-            "  <head>",
-            "    <meta charset=\"utf-8\">",
-            "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">",
-            f"    <title>{html.escape(page_title)}</title>",
-            "    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">",
-            "    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>",
-            "    <link href=\"https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Space+Grotesk:wght@300;400;500;600;700&display=swap\" rel=\"stylesheet\">",
-            "    <link rel=\"stylesheet\" href=\"/styles.css?v=20260303-2\">",
-            "  </head>",
-            "  <body class=\"admin-body\">",
-            "    <div class=\"noise\" aria-hidden=\"true\"></div>",
-            "    <header class=\"nav\">",
-            "      <div class=\"nav-inner\">",
-            "        <nav class=\"nav-group nav-left\"></nav>",
-            "        <a class=\"nav-brand\" href=\"/\" aria-label=\"AuraCalistenia\">",
-            "          <span class=\"brand-mark\" aria-hidden=\"true\"></span>",
-            "        </a>",
-            "        <nav class=\"nav-group nav-right\">",
-            "          <a href=\"/\">Inicio</a>",
-            "          <a href=\"/admin\">Admin</a>",
-            "        </nav>",
-            "        <nav class=\"nav-group nav-compact\" aria-label=\"Navegación\">",
-            "          <a href=\"/\">Inicio</a>",
-            "          <a href=\"/admin\">Admin</a>",
-            "        </nav>",
-            "      </div>",
-            "    </header>",
-            "    <main class=\"section\">",
-            f"      {card_html}",
-            "    </main>",
-            "    <script src=\"/script.js?v=20260303-2\"></script>",
-            "  </body>",
-            "</html>",
-        ]
+    return (
+        "<!doctype html>\n"
+        "<html lang=\"es\">\n"
+        "  <head>\n"
+        "    <meta charset=\"utf-8\">\n"
+        "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        f"    <title>{html.escape(page_title)}</title>\n"
+        "    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">\n"
+        "    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>\n"
+        "    <link href=\"https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Space+Grotesk:wght@300;400;500;600;700&display=swap\" rel=\"stylesheet\">\n"
+        "    <link rel=\"stylesheet\" href=\"/styles.css?v=20260303-2\">\n"
+        "  </head>\n"
+        "  <body class=\"admin-body\">\n"
+        "    <div class=\"noise\" aria-hidden=\"true\"></div>\n"
+        "    <header class=\"nav\">\n"
+        "      <div class=\"nav-inner\">\n"
+        "        <nav class=\"nav-group nav-left\"></nav>\n"
+        "        <a class=\"nav-brand\" href=\"/\" aria-label=\"AuraCalistenia\">\n"
+        "          <span class=\"brand-mark\" aria-hidden=\"true\"></span>\n"
+        "        </a>\n"
+        "        <nav class=\"nav-group nav-right\">\n"
+        "          <a href=\"/\">Inicio</a>\n"
+        "          <a href=\"/admin\">Admin</a>\n"
+        "        </nav>\n"
+        "        <nav class=\"nav-group nav-compact\" aria-label=\"Navegación\">\n"
+        "          <a href=\"/\">Inicio</a>\n"
+        "          <a href=\"/admin\">Admin</a>\n"
+        "        </nav>\n"
+        "      </div>\n"
+        "    </header>\n"
+        "    <main class=\"section\">\n"
+        f"      {card_html}\n"
+        "    </main>\n"
+        "    <script src=\"/script.js?v=20260303-2\"></script>\n"
+        "  </body>\n"
+        "</html>"
     )
 
 
+ACCESS_ADMIN_CARD_TEMPLATE = (
+    '<div class="access-grid" data-stagger>\n'
+    '  <div class="portal-card glass-card stagger-item">\n'
+    "    <h3>Panel admin activo</h3>\n"
+    "{alert_line}\n"
+    "    <p>Puedes editar la web, eventos y alumnos desde el panel.</p>\n"
+    '    <div class="portal-actions">\n'
+    '      <a class="btn glass primary" href="/admin">Ir al panel admin</a>\n'
+    '      <form class="portal-actions" action="/admin/logout" method="post">\n'
+    '        <button class="btn nav-logout-btn" type="submit">Cerrar sesión</button>\n'
+    "      </form>\n"
+    "    </div>\n"
+    "  </div>\n"
+    "</div>"
+)
+ACCESS_PORTAL_CARD_TEMPLATE = (
+    '<div class="access-grid" data-stagger>\n'
+    '  <div class="portal-card glass-card stagger-item">\n'
+    "    <h3>Panel de alumno activo</h3>\n"
+    "{alert_line}\n"
+    "    <p>Bienvenido, {username}.</p>\n"
+    '    <div class="portal-actions">\n'
+    '      <a class="btn glass primary" href="/portal">Ver mi plan</a>\n'
+    '      <form class="portal-actions" action="/logout" method="post">\n'
+    '        <button class="btn nav-logout-btn" type="submit">Cerrar sesión</button>\n'
+    "      </form>\n"
+    "    </div>\n"
+    "  </div>\n"
+    "</div>"
+)
+ACCESS_LOGIN_CARD_TEMPLATE = (
+    '<div class="access-grid" data-stagger><div class="portal-card glass-card stagger-item">\n'
+    "  <h3>Acceso a tu Área Privada</h3>\n"
+    "  <p>Usa tus credenciales de alumno o admin.</p>\n"
+    "{alert_line}\n"
+    "  <form class=\"admin-form\" action=\"/login\" method=\"post\">\n"
+    "    <div class=\"form-field\">\n"
+    "      <label for=\"portal_user\">Usuario</label>\n"
+    "      <input id=\"portal_user\" name=\"username\" type=\"text\" required>\n"
+    "    </div>\n"
+    "    <div class=\"form-field\">\n"
+    "      <label for=\"portal_pass\">Contraseña</label>\n"
+    "      <input id=\"portal_pass\" name=\"password\" type=\"password\" required>\n"
+    "    </div>\n"
+    "    <button class=\"btn glass primary\" type=\"submit\">Entrar</button>\n"
+    "  </form>\n"
+    "{forgot_block}\n"
+    "</div></div>"
+)
+HOME_FORGOT_PASSWORD_BLOCK = render_forgot_password_block("home")
+ANONYMOUS_ACCESS_SECTION = ACCESS_LOGIN_CARD_TEMPLATE.format(
+    alert_line="", forgot_block=HOME_FORGOT_PASSWORD_BLOCK
+)
+
+
 def render_access_section(query: dict[str, list[str]], cookie_header: str | None) -> str:
-    access_status = (query.get("access") or [""])[0]
+    access_status = first_query_value(query, "access")
     user_alert = build_access_alert(access_status, "user")
     admin_alert = build_access_alert(access_status, "admin")
     admin_user = get_session_user(cookie_header, ADMIN_SESSION_COOKIE, "admin")
     portal_user = get_session_user(cookie_header, USER_SESSION_COOKIE, "user")
 
     if admin_user:
-        return "\n".join(
-            [
-                '<div class="access-grid" data-stagger>',
-                '  <div class="portal-card glass-card stagger-item">',
-                "    <h3>Panel admin activo</h3>",
-                f"    {admin_alert}" if admin_alert else "",
-                "    <p>Puedes editar la web, eventos y alumnos desde el panel.</p>",
-                '    <div class="portal-actions">',
-                '      <a class="btn glass primary" href="/admin">Ir al panel admin</a>',
-                '      <form class="portal-actions" action="/admin/logout" method="post">',
-                '        <button class="btn nav-logout-btn" type="submit">Cerrar sesión</button>',
-                "      </form>",
-                "    </div>",
-                "  </div>",
-                "</div>",
-            ]
-        )
+        return ACCESS_ADMIN_CARD_TEMPLATE.format(alert_line=f"    {admin_alert}" if admin_alert else "")
 
     if portal_user:
-        return "\n".join(
-            [
-                '<div class="access-grid" data-stagger>',
-                '  <div class="portal-card glass-card stagger-item">',
-                "    <h3>Panel de alumno activo</h3>",
-                f"    {user_alert}" if user_alert else "",
-                f"    <p>Bienvenido, {html.escape(portal_user)}.</p>",
-                '    <div class="portal-actions">',
-                '      <a class="btn glass primary" href="/portal">Ver mi plan</a>',
-                '      <form class="portal-actions" action="/logout" method="post">',
-                '        <button class="btn nav-logout-btn" type="submit">Cerrar sesión</button>',
-                "      </form>",
-                "    </div>",
-                "  </div>",
-                "</div>",
-            ]
+        return ACCESS_PORTAL_CARD_TEMPLATE.format(
+            alert_line=f"    {user_alert}" if user_alert else "",
+            username=html.escape(portal_user),
         )
 
     alert = user_alert or admin_alert
-    forgot_block = render_forgot_password_block("home")
-    login_card = "\n".join(
-        [
-            '<div class="portal-card glass-card stagger-item">',
-            "  <h3>Acceso a tu Área Privada</h3>",
-            "  <p>Usa tus credenciales de alumno o admin.</p>",
-            f"  {alert}" if alert else "",
-            "  <form class=\"admin-form\" action=\"/login\" method=\"post\">",
-            "    <div class=\"form-field\">",
-            "      <label for=\"portal_user\">Usuario</label>",
-            "      <input id=\"portal_user\" name=\"username\" type=\"text\" required>",
-            "    </div>",
-            "    <div class=\"form-field\">",
-            "      <label for=\"portal_pass\">Contraseña</label>",
-            "      <input id=\"portal_pass\" name=\"password\" type=\"password\" required>",
-            "    </div>",
-            "    <button class=\"btn glass primary\" type=\"submit\">Entrar</button>",
-            "  </form>",
-            forgot_block,
-            "</div>",
-        ]
-    )
-    return f'<div class="access-grid" data-stagger>{login_card}</div>'
+    if not alert:
+        return ANONYMOUS_ACCESS_SECTION
+    return ACCESS_LOGIN_CARD_TEMPLATE.format(alert_line=f"  {alert}", forgot_block=HOME_FORGOT_PASSWORD_BLOCK)
 
 
 def render_events(events: list[dict]) -> str:
+    escape = escape_html
     parts = []
     for event in events:
         date_text = f"{event.get('date', '')} - {event.get('location', '')}".strip(" -")
         parts.append(
-            "\n".join(
-                [
-                    '<article class="news-card glass-card stagger-item">',
-                    f"  <span class=\"news-date\">{html.escape(date_text)}</span>",
-                    f"  <h3>{html.escape(event.get('title', ''))}</h3>",
-                    f"  <p>{html.escape(event.get('description', ''))}</p>",
-                    f"  <span class=\"news-tag\">{html.escape(event.get('tag', ''))}</span>",
-                    "</article>",
-                ]
-            )
+            '<article class="news-card glass-card stagger-item">\n'
+            f"  <span class=\"news-date\">{escape(date_text)}</span>\n"
+            f"  <h3>{escape(event.get('title', ''))}</h3>\n"
+            f"  <p>{escape(event.get('description', ''))}</p>\n"
+            f"  <span class=\"news-tag\">{escape(event.get('tag', ''))}</span>\n"
+            "</article>"
         )
     return "\n".join(parts)
 
@@ -2764,178 +3346,172 @@ def render_video_media(video: dict) -> str:
     file_name = video.get("file") or ""
     video_url = video.get("video_url") or ""
     if file_name:
-        ext = Path(file_name).suffix.lower()
-        src = f"/uploads/{file_name}"
-        if ext in ALLOWED_IMAGE_EXT:
-            return (
-                f'<img src="{html.escape(src)}" alt="{html.escape(video.get("title", ""))}" '
-                'loading="lazy" decoding="async">'
-            )
-        return (
-            f'<video data-src="{html.escape(src)}" autoplay loop muted playsinline preload="none"></video>'
-        )
+        src = "/uploads/" + escape_html(file_name)
+        if media_extension(file_name) in ALLOWED_IMAGE_EXT:
+            return IMAGE_MEDIA_TEMPLATE % (src, escape_html(video.get("title", "")))
+        return VIDEO_MEDIA_TEMPLATE % src
     if video_url:
-        ext = Path(video_url).suffix.lower()
-        src = html.escape(resolve_public_media_url(video_url))
+        ext = media_extension(video_url)
+        src = escape_html(resolve_public_media_url(video_url))
         if ext in ALLOWED_IMAGE_EXT:
-            return (
-                f'<img src="{src}" alt="{html.escape(video.get("title", ""))}" '
-                'loading="lazy" decoding="async">'
-            )
+            return IMAGE_MEDIA_TEMPLATE % (src, escape_html(video.get("title", "")))
         if ext in ALLOWED_VIDEO_EXT:
-            return f'<video data-src="{src}" autoplay loop muted playsinline preload="none"></video>'
+            return VIDEO_MEDIA_TEMPLATE % src
     return PLACEHOLDER_SVG
 
 
 def render_video_cards(videos: list[dict]) -> str:
+    escape = escape_html
+    escape_text = html.escape
+    media_of = render_video_media
+    public_url_of = resolve_public_media_url
     parts = []
     for video in videos:
         layout = video.get("layout", "")
         layout_class = ""
         if layout in {"tall", "wide"}:
             layout_class = f" {layout}"
-        media_html = render_video_media(video)
+        media_html = media_of(video)
         video_url = video.get("video_url") or ""
-        public_video_url = resolve_public_media_url(video_url)
+        public_video_url = public_url_of(video_url)
         link_html = ""
         if public_video_url:
             link_html = (
-                f'<a class="video-link glass-pill" href="{html.escape(public_video_url)}" '
+                f'<a class="video-link glass-pill" href="{escape_text(public_video_url)}" '
                 f'target="_blank" rel="noopener">Ver clip</a>'
             )
         parts.append(
-            "\n".join(
-                [
-                    f'<div class="video-card{layout_class} stagger-item">',
-                    '  <div class="video-thumb">',
-                    f"    {media_html}",
-                    f"    {link_html}",
-                    "  </div>",
-                    "  <div class=\"video-meta\">",
-                    f"    <span class=\"tag glass-pill\">{html.escape(video.get('tag', ''))}</span>",
-                    f"    <h3>{html.escape(video.get('title', ''))}</h3>",
-                    f"    <p>{html.escape(video.get('description', ''))}</p>",
-                    "  </div>",
-                    "</div>",
-                ]
-            )
+            f'<div class="video-card{layout_class} stagger-item">\n'
+            '  <div class="video-thumb">\n'
+            f"    {media_html}\n"
+            f"    {link_html}\n"
+            "  </div>\n"
+            "  <div class=\"video-meta\">\n"
+            f"    <span class=\"tag glass-pill\">{escape(video.get('tag', ''))}</span>\n"
+            f"    <h3>{escape(video.get('title', ''))}</h3>\n"
+            f"    <p>{escape_text(video.get('description', ''))}</p>\n"
+            "  </div>\n"
+            "</div>"
         )
     return "\n".join(parts)
 
 
-def render_event_list(events: list[dict]) -> str:
-    items = []
+def iter_event_list(events: list[dict]):
+    # Cache de escape solo para id, titulo y tag; el resto es texto libre.
+    escape = escape_html
+    escape_text = html.escape
     total = len(events)
     for index, event in enumerate(events):
-        event_id = str(event.get("id", ""))
+        event_id = escape(str(event.get("id", "")))
         raw_title = str(event.get("title", "")).strip()
         raw_date = str(event.get("date", "")).strip()
         raw_location = str(event.get("location", "")).strip()
         raw_description = str(event.get("description", "")).strip()
         raw_tag = str(event.get("tag", "")).strip()
-        title = html.escape(raw_title)
-        date = html.escape(raw_date)
-        location = html.escape(raw_location)
-        description = html.escape(raw_description)
-        tag = html.escape(raw_tag)
+        title = escape(raw_title)
+        date = escape_text(raw_date)
+        location = escape_text(raw_location)
+        description = escape_text(raw_description)
+        tag = escape(raw_tag)
         summary_parts = [part for part in [raw_date, raw_location] if part]
-        summary = html.escape(" · ".join(summary_parts)) if summary_parts else "Sin fecha ni lugar"
+        summary = escape_text(" · ".join(summary_parts)) if summary_parts else "Sin fecha ni lugar"
         title_display = title or "Competición sin título"
         tag_display = tag or "Sin etiqueta"
         open_attr = " open" if index == 0 else ""
         move_up_disabled = " disabled" if index == 0 else ""
         move_down_disabled = " disabled" if index == total - 1 else ""
-        items.append(
-            "\n".join(
-                [
-                    '<li class="admin-item admin-edit-item admin-collapsible-item">',
-                    f'  <details class="admin-collapsible"{open_attr}>',
-                    '    <summary class="admin-collapsible-summary">',
-                    '      <div class="admin-collapsible-main">',
-                    f"        <strong>{title_display}</strong>",
-                    f"        <span>{summary}</span>",
-                    "      </div>",
-                    f"      <span class=\"admin-collapsible-tag\">{tag_display}</span>",
-                    "    </summary>",
-                    '    <div class="admin-collapsible-content">',
-                    "      <form class=\"admin-form admin-inline-edit\" action=\"/admin/events/update\" method=\"post\">",
-                    f"        <input type=\"hidden\" name=\"id\" value=\"{html.escape(event_id)}\">",
-                    "        <div class=\"form-row\">",
-                    "          <div class=\"form-field\">",
-                    "            <label>Título</label>",
-                    f"            <input name=\"title\" type=\"text\" value=\"{title}\" required>",
-                    "          </div>",
-                    "          <div class=\"form-field\">",
-                    "            <label>Etiqueta</label>",
-                    f"            <input name=\"tag\" type=\"text\" value=\"{tag}\" required>",
-                    "          </div>",
-                    "        </div>",
-                    "        <div class=\"form-row\">",
-                    "          <div class=\"form-field\">",
-                    "            <label>Fecha</label>",
-                    f"            <input name=\"date\" type=\"text\" value=\"{date}\" required>",
-                    "          </div>",
-                    "          <div class=\"form-field\">",
-                    "            <label>Lugar</label>",
-                    f"            <input name=\"location\" type=\"text\" value=\"{location}\" required>",
-                    "          </div>",
-                    "        </div>",
-                    "        <div class=\"form-field\">",
-                    "          <label>Descripción</label>",
-                    f"          <input name=\"description\" type=\"text\" value=\"{description}\" required>",
-                    "        </div>",
-                    "        <div class=\"admin-actions\">",
-                    "          <button class=\"btn glass primary small\" type=\"submit\">Guardar</button>",
-                    "        </div>",
-                    "      </form>",
-                    "      <div class=\"admin-actions\">",
-                    "        <form class=\"admin-inline-form\" action=\"/admin/events/move\" method=\"post\">",
-                    f"          <input type=\"hidden\" name=\"id\" value=\"{html.escape(event_id)}\">",
-                    "          <input type=\"hidden\" name=\"direction\" value=\"up\">",
-                    f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_up_disabled}>Subir</button>",
-                    "        </form>",
-                    "        <form class=\"admin-inline-form\" action=\"/admin/events/move\" method=\"post\">",
-                    f"          <input type=\"hidden\" name=\"id\" value=\"{html.escape(event_id)}\">",
-                    "          <input type=\"hidden\" name=\"direction\" value=\"down\">",
-                    f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_down_disabled}>Bajar</button>",
-                    "        </form>",
-                    "        <form class=\"admin-inline-form\" action=\"/admin/events/delete\" method=\"post\">",
-                    f"          <input type=\"hidden\" name=\"id\" value=\"{html.escape(event_id)}\">",
-                    "          <button class=\"btn glass ghost small\" type=\"submit\">Eliminar</button>",
-                    "        </form>",
-                    "      </div>",
-                    "    </div>",
-                    "  </details>",
-                    "</li>",
-                ]
-            )
+        if index:
+            yield "\n"
+        yield (
+            '<li class="admin-item admin-edit-item admin-collapsible-item">\n'
+            f'  <details class="admin-collapsible"{open_attr}>\n'
+            '    <summary class="admin-collapsible-summary">\n'
+            '      <div class="admin-collapsible-main">\n'
+            f"        <strong>{title_display}</strong>\n"
+            f"        <span>{summary}</span>\n"
+            "      </div>\n"
+            f"      <span class=\"admin-collapsible-tag\">{tag_display}</span>\n"
+            "    </summary>\n"
+            '    <div class="admin-collapsible-content">\n'
+            "      <form class=\"admin-form admin-inline-edit\" action=\"/admin/events/update\" method=\"post\">\n"
+            f"        <input type=\"hidden\" name=\"id\" value=\"{event_id}\">\n"
+            "        <div class=\"form-row\">\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Título</label>\n"
+            f"            <input name=\"title\" type=\"text\" value=\"{title}\" required>\n"
+            "          </div>\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Etiqueta</label>\n"
+            f"            <input name=\"tag\" type=\"text\" value=\"{tag}\" required>\n"
+            "          </div>\n"
+            "        </div>\n"
+            "        <div class=\"form-row\">\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Fecha</label>\n"
+            f"            <input name=\"date\" type=\"text\" value=\"{date}\" required>\n"
+            "          </div>\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Lugar</label>\n"
+            f"            <input name=\"location\" type=\"text\" value=\"{location}\" required>\n"
+            "          </div>\n"
+            "        </div>\n"
+            "        <div class=\"form-field\">\n"
+            "          <label>Descripción</label>\n"
+            f"          <input name=\"description\" type=\"text\" value=\"{description}\" required>\n"
+            "        </div>\n"
+            "        <div class=\"admin-actions\">\n"
+            "          <button class=\"btn glass primary small\" type=\"submit\">Guardar</button>\n"
+            "        </div>\n"
+            "      </form>\n"
+            "      <div class=\"admin-actions\">\n"
+            "        <form class=\"admin-inline-form\" action=\"/admin/events/move\" method=\"post\">\n"
+            f"          <input type=\"hidden\" name=\"id\" value=\"{event_id}\">\n"
+            "          <input type=\"hidden\" name=\"direction\" value=\"up\">\n"
+            f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_up_disabled}>Subir</button>\n"
+            "        </form>\n"
+            "        <form class=\"admin-inline-form\" action=\"/admin/events/move\" method=\"post\">\n"
+            f"          <input type=\"hidden\" name=\"id\" value=\"{event_id}\">\n"
+            "          <input type=\"hidden\" name=\"direction\" value=\"down\">\n"
+            f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_down_disabled}>Bajar</button>\n"
+            "        </form>\n"
+            "        <form class=\"admin-inline-form\" action=\"/admin/events/delete\" method=\"post\">\n"
+            f"          <input type=\"hidden\" name=\"id\" value=\"{event_id}\">\n"
+            "          <button class=\"btn glass ghost small\" type=\"submit\">Eliminar</button>\n"
+            "        </form>\n"
+            "      </div>\n"
+            "    </div>\n"
+            "  </details>\n"
+            "</li>"
         )
-    return "\n".join(items) if items else "<li class=\"admin-item\">Sin competiciones.</li>"
+    if not events:
+        yield "<li class=\"admin-item\">Sin competiciones.</li>"
 
 
-def render_video_list(videos: list[dict]) -> str:
-    items = []
+def iter_video_list(videos: list[dict]):
+    # Cache de escape solo para id, titulo, tag y layout; el resto es texto libre.
+    escape = escape_html
+    escape_text = html.escape
     total = len(videos)
     for index, video in enumerate(videos):
-        video_id = str(video.get("id", ""))
+        video_id = escape(str(video.get("id", "")))
         raw_title = str(video.get("title", "")).strip()
         raw_tag = str(video.get("tag", "")).strip()
         raw_description = str(video.get("description", "")).strip()
         raw_layout = str(video.get("layout", "")).strip()
         raw_video_url = str(video.get("video_url", "")).strip()
         raw_file = str(video.get("file", "")).strip()
-        title = html.escape(raw_title)
-        tag = html.escape(raw_tag)
-        description = html.escape(raw_description)
-        layout = html.escape(raw_layout or "normal")
-        video_url = html.escape(raw_video_url)
-        file_label = html.escape(raw_file or "-")
+        title = escape(raw_title)
+        tag = escape(raw_tag)
+        description = escape_text(raw_description)
+        layout = escape(raw_layout or "normal")
+        video_url = escape_text(raw_video_url)
+        file_label = escape_text(raw_file or "-")
         title_display = title or "Vídeo sin título"
         tag_display = tag or "Sin etiqueta"
         layout_label = {"tall": "Tall", "wide": "Wide"}.get(raw_layout, "Normal")
         source_label = "Archivo subido" if raw_file else ("URL externa" if raw_video_url else "Sin fuente")
-        meta_summary = html.escape(f"{raw_tag or 'Sin etiqueta'} · {layout_label} · {source_label}")
-        search_blob = html.escape(
+        meta_summary = escape_text(f"{raw_tag or 'Sin etiqueta'} · {layout_label} · {source_label}")
+        search_blob = escape_text(
             " ".join([raw_title, raw_tag, raw_description, raw_video_url, raw_file]).lower()
         )
         open_attr = " open" if index == 0 else ""
@@ -2948,118 +3524,119 @@ def render_video_list(videos: list[dict]) -> str:
                 f'<option value="wide"{" selected" if raw_layout == "wide" else ""}>Wide</option>',
             ]
         )
-        items.append(
-            "\n".join(
-                [
-                    f'<li class="admin-item admin-edit-item admin-collapsible-item admin-media-item" data-search="{search_blob}">',
-                    f'  <details class="admin-collapsible"{open_attr}>',
-                    '    <summary class="admin-collapsible-summary">',
-                    '      <div class="admin-collapsible-main">',
-                    f"        <strong>{title_display}</strong>",
-                    f"        <span>{meta_summary}</span>",
-                    "      </div>",
-                    f"      <span class=\"admin-collapsible-tag\">{layout}</span>",
-                    "    </summary>",
-                    '    <div class="admin-collapsible-content">',
-                    "      <form class=\"admin-form admin-inline-edit\" action=\"/admin/videos/update\" method=\"post\" enctype=\"multipart/form-data\">",
-                    f"        <input type=\"hidden\" name=\"id\" value=\"{html.escape(video_id)}\">",
-                    "        <div class=\"form-row\">",
-                    "          <div class=\"form-field\">",
-                    "            <label>Título</label>",
-                    f"            <input name=\"title\" type=\"text\" value=\"{title}\" required>",
-                    "          </div>",
-                    "          <div class=\"form-field\">",
-                    "            <label>Etiqueta</label>",
-                    f"            <input name=\"tag\" type=\"text\" value=\"{tag}\" required>",
-                    "          </div>",
-                    "        </div>",
-                    "        <div class=\"form-row\">",
-                    "          <div class=\"form-field\">",
-                    "            <label>Descripción</label>",
-                    f"            <input name=\"description\" type=\"text\" value=\"{description}\" required>",
-                    "          </div>",
-                    "          <div class=\"form-field\">",
-                    "            <label>Diseño</label>",
-                    f"            <select name=\"layout\">{layout_options}</select>",
-                    "          </div>",
-                    "        </div>",
-                    "        <div class=\"form-row\">",
-                    "          <div class=\"form-field\">",
-                    "            <label>URL externa</label>",
-                    f"            <input name=\"video_url\" type=\"text\" value=\"{video_url}\">",
-                    "          </div>",
-                    "          <div class=\"form-field\">",
-                    "            <label>Archivo actual</label>",
-                    f"            <input type=\"text\" value=\"{file_label}\" readonly>",
-                    "          </div>",
-                    "        </div>",
-                    "        <div class=\"form-row\">",
-                    "          <div class=\"form-field\">",
-                    "            <label>Reemplazar archivo</label>",
-                    "            <input name=\"video_file\" type=\"file\" accept=\"video/mp4,video/webm,video/ogg,image/png,image/jpeg,image/webp\">",
-                    "          </div>",
-                    "          <div class=\"form-field\">",
-                    "            <label>Eliminar archivo actual</label>",
-                    "            <label class=\"checkbox-field\"><input type=\"checkbox\" name=\"remove_file\"> Quitar archivo subido</label>",
-                    "          </div>",
-                    "        </div>",
-                    "        <div class=\"admin-actions\">",
-                    "          <button class=\"btn glass primary small\" type=\"submit\">Guardar</button>",
-                    "        </div>",
-                    "      </form>",
-                    "      <div class=\"admin-actions\">",
-                    "        <form class=\"admin-inline-form\" action=\"/admin/videos/move\" method=\"post\">",
-                    f"          <input type=\"hidden\" name=\"id\" value=\"{html.escape(video_id)}\">",
-                    "          <input type=\"hidden\" name=\"direction\" value=\"up\">",
-                    f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_up_disabled}>Subir</button>",
-                    "        </form>",
-                    "        <form class=\"admin-inline-form\" action=\"/admin/videos/move\" method=\"post\">",
-                    f"          <input type=\"hidden\" name=\"id\" value=\"{html.escape(video_id)}\">",
-                    "          <input type=\"hidden\" name=\"direction\" value=\"down\">",
-                    f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_down_disabled}>Bajar</button>",
-                    "        </form>",
-                    "        <form class=\"admin-inline-form\" action=\"/admin/videos/delete\" method=\"post\">",
-                    f"          <input type=\"hidden\" name=\"id\" value=\"{html.escape(video_id)}\">",
-                    "          <button class=\"btn glass ghost small\" type=\"submit\">Eliminar</button>",
-                    "        </form>",
-                    "      </div>",
-                    "      <span class=\"admin-note\">Etiqueta actual: "
-                    f"{tag_display} · Diseño: {layout}</span>",
-                    "    </div>",
-                    "  </details>",
-                    "</li>",
-                ]
-            )
+        if index:
+            yield "\n"
+        yield (
+            f'<li class="admin-item admin-edit-item admin-collapsible-item admin-media-item" data-search="{search_blob}">\n'
+            f'  <details class="admin-collapsible"{open_attr}>\n'
+            '    <summary class="admin-collapsible-summary">\n'
+            '      <div class="admin-collapsible-main">\n'
+            f"        <strong>{title_display}</strong>\n"
+            f"        <span>{meta_summary}</span>\n"
+            "      </div>\n"
+            f"      <span class=\"admin-collapsible-tag\">{layout}</span>\n"
+            "    </summary>\n"
+            '    <div class="admin-collapsible-content">\n'
+            "      <form class=\"admin-form admin-inline-edit\" action=\"/admin/videos/update\" method=\"post\" enctype=\"multipart/form-data\">\n"
+            f"        <input type=\"hidden\" name=\"id\" value=\"{video_id}\">\n"
+            "        <div class=\"form-row\">\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Título</label>\n"
+            f"            <input name=\"title\" type=\"text\" value=\"{title}\" required>\n"
+            "          </div>\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Etiqueta</label>\n"
+            f"            <input name=\"tag\" type=\"text\" value=\"{tag}\" required>\n"
+            "          </div>\n"
+            "        </div>\n"
+            "        <div class=\"form-row\">\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Descripción</label>\n"
+            f"            <input name=\"description\" type=\"text\" value=\"{description}\" required>\n"
+            "          </div>\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Diseño</label>\n"
+            f"            <select name=\"layout\">{layout_options}</select>\n"
+            "          </div>\n"
+            "        </div>\n"
+            "        <div class=\"form-row\">\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>URL externa</label>\n"
+            f"            <input name=\"video_url\" type=\"text\" value=\"{video_url}\">\n"
+            "          </div>\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Archivo actual</label>\n"
+            f"            <input type=\"text\" value=\"{file_label}\" readonly>\n"
+            "          </div>\n"
+            "        </div>\n"
+            "        <div class=\"form-row\">\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Reemplazar archivo</label>\n"
+            "            <input name=\"video_file\" type=\"file\" accept=\"video/mp4,video/webm,video/ogg,image/png,image/jpeg,image/webp\">\n"
+            "          </div>\n"
+            "          <div class=\"form-field\">\n"
+            "            <label>Eliminar archivo actual</label>\n"
+            "            <label class=\"checkbox-field\"><input type=\"checkbox\" name=\"remove_file\"> Quitar archivo subido</label>\n"
+            "          </div>\n"
+            "        </div>\n"
+            "        <div class=\"admin-actions\">\n"
+            "          <button class=\"btn glass primary small\" type=\"submit\">Guardar</button>\n"
+            "        </div>\n"
+            "      </form>\n"
+            "      <div class=\"admin-actions\">\n"
+            "        <form class=\"admin-inline-form\" action=\"/admin/videos/move\" method=\"post\">\n"
+            f"          <input type=\"hidden\" name=\"id\" value=\"{video_id}\">\n"
+            "          <input type=\"hidden\" name=\"direction\" value=\"up\">\n"
+            f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_up_disabled}>Subir</button>\n"
+            "        </form>\n"
+            "        <form class=\"admin-inline-form\" action=\"/admin/videos/move\" method=\"post\">\n"
+            f"          <input type=\"hidden\" name=\"id\" value=\"{video_id}\">\n"
+            "          <input type=\"hidden\" name=\"direction\" value=\"down\">\n"
+            f"          <button class=\"btn glass ghost small\" type=\"submit\"{move_down_disabled}>Bajar</button>\n"
+            "        </form>\n"
+            "        <form class=\"admin-inline-form\" action=\"/admin/videos/delete\" method=\"post\">\n"
+            f"          <input type=\"hidden\" name=\"id\" value=\"{video_id}\">\n"
+            "          <button class=\"btn glass ghost small\" type=\"submit\">Eliminar</button>\n"
+            "        </form>\n"
+            "      </div>\n"
+            "      <span class=\"admin-note\">Etiqueta actual: "
+            f"{tag_display} · Diseño: {layout}</span>\n"
+            "    </div>\n"
+            "  </details>\n"
+            "</li>"
         )
-    return "\n".join(items) if items else "<li class=\"admin-item\">Sin vídeos.</li>"
+    if not videos:
+        yield "<li class=\"admin-item\">Sin vídeos.</li>"
+
+
+def as_text(value) -> str:
+    return value if isinstance(value, str) else str(value)
 
 
 def render_stats(stats: list[dict]) -> str:
     items = []
     for stat in stats:
-        value = html.escape(str(stat.get("value", "")))
-        label = html.escape(str(stat.get("label", "")))
-        if not value and not label:
+        raw_value = as_text(stat.get("value", ""))
+        raw_label = as_text(stat.get("label", ""))
+        if not raw_value and not raw_label:
             continue
+        value = escape_html(raw_value)
+        label = escape_html(raw_label)
         items.append(
-            "\n".join(
-                [
-                    '<div class="stat glass-card stagger-item">',
-                    f"  <span class=\"stat-number\">{value}</span>",
-                    f"  <span class=\"stat-label\">{label}</span>",
-                    "</div>",
-                ]
-            )
+            '<div class="stat glass-card stagger-item">\n'
+            f"  <span class=\"stat-number\">{value}</span>\n"
+            f"  <span class=\"stat-label\">{label}</span>\n"
+            "</div>"
         )
     return "\n".join(items)
 
 
 def render_paragraphs(paragraphs: list[str]) -> str:
-    return "\n".join([f"<p>{html.escape(text)}</p>" for text in paragraphs if str(text).strip()])
+    return "\n".join(f"<p>{escape_html(text)}</p>" for text in paragraphs if as_text(text).strip())
 
 
 def render_bullets(items: list[str]) -> str:
-    return "\n".join([f"<li>{html.escape(text)}</li>" for text in items if str(text).strip()])
+    return "\n".join(f"<li>{escape_html(text)}</li>" for text in items if as_text(text).strip())
 
 
 def resolve_public_media_url(raw_url: str) -> str:
@@ -3076,11 +3653,13 @@ def resolve_public_media_url(raw_url: str) -> str:
 def render_sponsors(sponsors: list[dict]) -> str:
     cards = []
     for sponsor in sponsors:
-        name = html.escape(str(sponsor.get("name", "")))
-        logo = html.escape(str(sponsor.get("logo", "")))
-        url = html.escape(str(sponsor.get("url", "")).strip())
-        if not name or not logo:
+        raw_name = as_text(sponsor.get("name", ""))
+        raw_logo = as_text(sponsor.get("logo", ""))
+        if not raw_name or not raw_logo:
             continue
+        name = escape_html(raw_name)
+        logo = escape_html(raw_logo)
+        url = escape_html(as_text(sponsor.get("url", "")).strip())
         open_tag = '<div class="sponsor-tile glass-card">'
         close_tag = "</div>"
         if url:
@@ -3090,80 +3669,114 @@ def render_sponsors(sponsors: list[dict]) -> str:
             )
             close_tag = "</a>"
         cards.append(
-            "\n".join(
-                [
-                    open_tag,
-                    f"  <img class=\"sponsor-logo\" src=\"{logo}\" alt=\"{name}\" loading=\"lazy\" decoding=\"async\">",
-                    f"  <span class=\"sponsor-name\">{name}</span>",
-                    "  <p class=\"sponsor-offer\">10% de descuento con el código <strong>FITA10</strong></p>",
-                    close_tag,
-                ]
-            )
+            f"{open_tag}\n"
+            f"  <img class=\"sponsor-logo\" src=\"{logo}\" alt=\"{name}\" loading=\"lazy\" decoding=\"async\">\n"
+            f"  <span class=\"sponsor-name\">{name}</span>\n"
+            "  <p class=\"sponsor-offer\">10% de descuento con el código <strong>FITA10</strong></p>\n"
+            f"{close_tag}"
         )
     if not cards:
         return ""
     cards_html = "\n".join(cards)
-    return "\n".join(
-        [
-            '<div class="sponsor-marquee stagger-item" aria-label="Patrocinadores colaboradores">',
-            '  <div class="sponsor-track">',
-            '    <div class="sponsor-loop">',
-            cards_html,
-            "    </div>",
-            '    <div class="sponsor-loop" aria-hidden="true">',
-            cards_html,
-            "    </div>",
-            "  </div>",
-            "</div>",
-        ]
+    return (
+        '<div class="sponsor-marquee stagger-item" aria-label="Patrocinadores colaboradores">\n'
+        '  <div class="sponsor-track">\n'
+        '    <div class="sponsor-loop">\n'
+        f"{cards_html}\n"
+        "    </div>\n"
+        '    <div class="sponsor-loop" aria-hidden="true">\n'
+        f"{cards_html}\n"
+        "    </div>\n"
+        "  </div>\n"
+        "</div>"
     )
 
 
-def render_index(query: dict[str, list[str]], cookie_header: str | None) -> str:
-    events = load_json(EVENTS_PATH, [])
-    videos = load_json(VIDEOS_PATH, [])
-    content = load_content()
-    hero = content.get("hero", {})
+INDEX_CONTENT_FIELDS = {
+    "HERO_EYEBROW": ("hero", "eyebrow"),
+    "HERO_TITLE": ("hero", "title"),
+    "HERO_SUBTITLE": ("hero", "subtitle"),
+    "BIO_EYEBROW": ("bio", "eyebrow"),
+    "BIO_NAME": ("bio", "name"),
+    "BIO_SIGNATURE": ("bio", "signature"),
+    "BIO_IMAGE": ("bio", "image"),
+    "BIO_IMAGE_CAPTION": ("bio", "image_caption"),
+    "PROGRAM_TITLE": ("program", "title"),
+    "PROGRAM_LEAD": ("program", "lead"),
+    "PROGRAM_HIGHLIGHT_TITLE": ("program", "highlight_title"),
+    "PROGRAM_HIGHLIGHT_TEXT": ("program", "highlight_text"),
+    "PROGRAM_IMAGE": ("program", "image"),
+    "PROGRAM_IMAGE_CAPTION": ("program", "image_caption"),
+    "CONTACT_EMAIL": ("contact", "email"),
+    "CONTACT_PHONE": ("contact", "phone"),
+    "CONTACT_CITY": ("contact", "city"),
+    "CONTACT_INSTAGRAM": ("contact", "instagram"),
+}
+
+# Campos de texto del formulario de contenido: mismo nombre que la clave de plantilla, en minusculas.
+CONTENT_FORM_FIELDS = {key.lower(): target for key, target in INDEX_CONTENT_FIELDS.items()}
+
+
+def build_index_replacements(query: dict[str, list[str]], cookie_header: str | None) -> dict[str, str]:
+    events_version, events = load_json_entry(EVENTS_PATH, [])
+    videos_version, videos = load_json_entry(VIDEOS_PATH, [])
+    content_version, content = load_content_entry()
     bio = content.get("bio", {})
     program = content.get("program", {})
-    contact = content.get("contact", {})
-    stats_html = render_stats(content.get("stats", []))
-    bio_paragraphs = render_paragraphs(bio.get("paragraphs", []))
-    program_bullets = render_bullets(program.get("bullets", []))
-    sponsors_html = render_sponsors(content.get("sponsors", []))
+    stats_html = render_cached_fragment("stats", content_version, render_stats, content.get("stats", []))
+    bio_paragraphs = render_cached_fragment(
+        "bio_paragraphs", content_version, render_paragraphs, bio.get("paragraphs", [])
+    )
+    program_bullets = render_cached_fragment(
+        "program_bullets", content_version, render_bullets, program.get("bullets", [])
+    )
+    sponsors_html = render_cached_fragment("sponsors", content_version, render_sponsors, content.get("sponsors", []))
     replacements = {
-        "EVENTS": render_events(events),
-        "VIDEOS": render_video_cards(videos),
+        "EVENTS": render_cached_fragment("events", events_version, render_events, events),
+        "VIDEOS": render_cached_fragment("videos", videos_version, render_video_cards, videos),
         "FORM_ALERT": build_form_alert(query),
         "ACCESS_CONTENT": render_access_section(query, cookie_header),
         "MEDIA_BASE_URL": html.escape(MEDIA_BASE_URL),
-        "HERO_EYEBROW": html.escape(hero.get("eyebrow", "")),
-        "HERO_TITLE": html.escape(hero.get("title", "")),
-        "HERO_SUBTITLE": html.escape(hero.get("subtitle", "")),
         "HERO_STATS": stats_html,
-        "BIO_EYEBROW": html.escape(bio.get("eyebrow", "")),
-        "BIO_NAME": html.escape(bio.get("name", "")),
         "BIO_PARAGRAPHS": bio_paragraphs,
-        "BIO_SIGNATURE": html.escape(bio.get("signature", "")),
-        "BIO_IMAGE": html.escape(bio.get("image", "")),
-        "BIO_IMAGE_CAPTION": html.escape(bio.get("image_caption", "")),
-        "PROGRAM_TITLE": html.escape(program.get("title", "")),
-        "PROGRAM_LEAD": html.escape(program.get("lead", "")),
-        "PROGRAM_HIGHLIGHT_TITLE": html.escape(program.get("highlight_title", "")),
-        "PROGRAM_HIGHLIGHT_TEXT": html.escape(program.get("highlight_text", "")),
         "PROGRAM_BULLETS": program_bullets,
-        "PROGRAM_IMAGE": html.escape(program.get("image", "")),
-        "PROGRAM_IMAGE_CAPTION": html.escape(program.get("image_caption", "")),
         "SPONSORS": sponsors_html,
-        "CONTACT_EMAIL": html.escape(contact.get("email", "")),
-        "CONTACT_PHONE": html.escape(contact.get("phone", "")),
-        "CONTACT_CITY": html.escape(contact.get("city", "")),
-        "CONTACT_INSTAGRAM": html.escape(contact.get("instagram", "")),
     }
-    return render_template(INDEX_TEMPLATE, replacements)
+    used_keys = get_template_keys(INDEX_TEMPLATE)
+    escape = escape_html
+    replacements.update(
+        {
+            key: escape(content.get(section, {}).get(field, ""))
+            for key, (section, field) in INDEX_CONTENT_FIELDS.items()
+            if key in used_keys
+        }
+    )
+    return replacements
 
 
-def render_plan_editor(applications: list[dict], selected_user: str, expanded: bool = False) -> str:
+PLAN_WEEK_OPTIONS = "".join(f'<option value="{i}">Semana {i}</option>' for i in range(1, 5))
+PLAN_DAY_OPTIONS = "".join(f'<option value="{i}">Día {i}</option>' for i in range(1, 8))
+
+
+@functools.lru_cache(maxsize=8)
+def render_plan_user_selector(usernames: tuple[str, ...]) -> str:
+    selector_items = []
+    for username in usernames:
+        label = escape_html(username)
+        href = (
+            f"/admin?admin_section=portal&plan_user={quote_username(username)}#plan"
+        )
+        selector_items.append(f'<a class="glass-pill" href="{href}">{label}</a>')
+    return f'<div class="user-selector"><span>Selecciona alumno:</span>{"".join(selector_items)}</div>'
+
+
+def render_plan_editor(
+    applications: list[dict],
+    applications_by_user: dict[str, dict],
+    selected_user: str,
+    expanded: bool = False,
+) -> str:
+    escape = escape_html
     if not applications:
         return (
             '<div class="admin-card glass-card admin-wide">'
@@ -3174,23 +3787,13 @@ def render_plan_editor(applications: list[dict], selected_user: str, expanded: b
 
     if not selected_user:
         selected_user = applications[0].get("username", "")
-    selected_app = find_application(applications, selected_user) if selected_user else None
+    selected_app = applications_by_user.get(selected_user.strip().lower()) if selected_user else None
     if not selected_app and applications:
         selected_user = applications[0].get("username", "")
         selected_app = applications[0]
     plan = normalize_plan((selected_app or {}).get("plan"))
 
-    selector_items = []
-    for app in applications:
-        username = app.get("username", "")
-        label = html.escape(username)
-        href = (
-            f"/admin?admin_section=portal&plan_user={urllib.parse.quote(username)}#plan"
-        )
-        selector_items.append(f'<a class="glass-pill" href="{href}">{label}</a>')
-    selector_html = (
-        f'<div class="user-selector"><span>Selecciona alumno:</span>{"".join(selector_items)}</div>'
-    )
+    selector_html = render_plan_user_selector(tuple(app.get("username", "") for app in applications))
     plan_data = {}
     progress_data = {}
     chat_data = {}
@@ -3220,227 +3823,317 @@ def render_plan_editor(applications: list[dict], selected_user: str, expanded: b
 
     week_blocks = []
     for week_index, week in enumerate(plan.get("weeks", []), start=1):
-        week_title = html.escape(week.get("title", f"Semana {week_index}"))
+        week_title = escape(week.get("title", f"Semana {week_index}"))
         day_cards = []
         for day_index, day in enumerate(week.get("days", []), start=1):
-            day_title = html.escape(day.get("title", ""))
+            day_title = escape(day.get("title", ""))
             rest_flag = "checked" if day.get("rest") else ""
             card_class = "plan-day-card is-rest" if day.get("rest") else "plan-day-card"
-            day_text = html.escape(plan_day_to_text(day))
+            day_text = escape(plan_day_to_text(day))
             day_cards.append(
-                "\n".join(
-                    [
-                        f'<div class="{card_class}" data-week="{week_index}" data-day="{day_index}">',
-                        '  <div class="plan-day-head">',
-                        f'    <span class="plan-day-label">Día {day_index}</span>',
-                        f'    <input class="plan-day-title" data-field="day-title" name="week{week_index}_day{day_index}_title" placeholder="Título del día" value="{day_title}">',
-                        '    <label class="plan-rest-toggle">',
-                        f'      <input data-field="day-rest" type="checkbox" name="week{week_index}_day{day_index}_rest" {rest_flag}> Descanso',
-                        "    </label>",
-                        '    <div class="plan-day-actions">',
-                        '      <button type="button" class="plan-day-move" data-action="left" aria-label="Mover día a la izquierda" title="Mover día a la izquierda">←</button>',
-                        '      <button type="button" class="plan-day-move" data-action="right" aria-label="Mover día a la derecha" title="Mover día a la derecha">→</button>',
-                        '      <button type="button" class="plan-day-clear" aria-label="Vaciar día" title="Vaciar día">🧹</button>',
-                        "    </div>",
-                        "  </div>",
-                        '  <div class="plan-day-editor-wrap">',
-                        '    <p class="plan-day-help">Una línea por ejercicio: Ejercicio | Series | Reps | Peso | Descanso | Notas</p>',
-                        f'    <textarea class="plan-day-editor" data-field="day-text" name="week{week_index}_day{day_index}_text" rows="8" placeholder="Dominadas | 4 | 8 | 20kg | 90s | Técnica estricta">{day_text}</textarea>',
-                        "  </div>",
-                        '  <p class="plan-rest-note">Descanso / movilidad</p>',
-                        "</div>",
-                    ]
-                )
+                f'<div class="{card_class}" data-week="{week_index}" data-day="{day_index}">\n'
+                '  <div class="plan-day-head">\n'
+                f'    <span class="plan-day-label">Día {day_index}</span>\n'
+                f'    <input class="plan-day-title" data-field="day-title" name="week{week_index}_day{day_index}_title" placeholder="Título del día" value="{day_title}">\n'
+                '    <label class="plan-rest-toggle">\n'
+                f'      <input data-field="day-rest" type="checkbox" name="week{week_index}_day{day_index}_rest" {rest_flag}> Descanso\n'
+                "    </label>\n"
+                '    <div class="plan-day-actions">\n'
+                '      <button type="button" class="plan-day-move" data-action="left" aria-label="Mover día a la izquierda" title="Mover día a la izquierda">←</button>\n'
+                '      <button type="button" class="plan-day-move" data-action="right" aria-label="Mover día a la derecha" title="Mover día a la derecha">→</button>\n'
+                '      <button type="button" class="plan-day-clear" aria-label="Vaciar día" title="Vaciar día">🧹</button>\n'
+                "    </div>\n"
+                "  </div>\n"
+                '  <div class="plan-day-editor-wrap">\n'
+                '    <p class="plan-day-help">Una línea por ejercicio: Ejercicio | Series | Reps | Peso | Descanso | Notas</p>\n'
+                f'    <textarea class="plan-day-editor" data-field="day-text" name="week{week_index}_day{day_index}_text" rows="8" placeholder="Dominadas | 4 | 8 | 20kg | 90s | Técnica estricta">{day_text}</textarea>\n'
+                "  </div>\n"
+                '  <p class="plan-rest-note">Descanso / movilidad</p>\n'
+                "</div>"
             )
+        day_cards_html = "\n".join(day_cards)
         week_blocks.append(
-            "\n".join(
-                [
-                    f'<div class="plan-week-block" data-week="{week_index}">',
-                    '  <div class="plan-week-head">',
-                    f'    <div class="plan-week-title-field"><label for="week{week_index}_title">Semana {week_index} - título</label>',
-                    f'    <input id="week{week_index}_title" name="week{week_index}_title" type="text" value="{week_title}"></div>',
-                    '    <div class="plan-week-actions">',
-                    '      <button type="button" class="btn glass ghost small plan-week-toggle" data-open-label="Minimizar" data-closed-label="Maximizar" aria-expanded="true">Minimizar</button>',
-                    '      <button type="button" class="btn glass ghost small plan-week-move" data-action="up" title="Subir semana">Subir semana</button>',
-                    '      <button type="button" class="btn glass ghost small plan-week-move" data-action="down" title="Bajar semana">Bajar semana</button>',
-                    '      <button type="button" class="btn glass ghost small plan-week-action" data-action="duplicate" title="Duplicar semana">Duplicar</button>',
-                    '      <button type="button" class="btn glass ghost small plan-week-action" data-action="clear" title="Vaciar semana">Vaciar</button>',
-                    "    </div>",
-                    "  </div>",
-                    '  <div class="plan-days-row">',
-                    "\n".join(day_cards),
-                    "  </div>",
-                    "</div>",
-                ]
-            )
+            f'<div class="plan-week-block" data-week="{week_index}">\n'
+            '  <div class="plan-week-head">\n'
+            f'    <div class="plan-week-title-field"><label for="week{week_index}_title">Semana {week_index} - título</label>\n'
+            f'    <input id="week{week_index}_title" name="week{week_index}_title" type="text" value="{week_title}"></div>\n'
+            '    <div class="plan-week-actions">\n'
+            '      <button type="button" class="btn glass ghost small plan-week-toggle" data-open-label="Minimizar" data-closed-label="Maximizar" aria-expanded="true">Minimizar</button>\n'
+            '      <button type="button" class="btn glass ghost small plan-week-move" data-action="up" title="Subir semana">Subir semana</button>\n'
+            '      <button type="button" class="btn glass ghost small plan-week-move" data-action="down" title="Bajar semana">Bajar semana</button>\n'
+            '      <button type="button" class="btn glass ghost small plan-week-action" data-action="duplicate" title="Duplicar semana">Duplicar</button>\n'
+            '      <button type="button" class="btn glass ghost small plan-week-action" data-action="clear" title="Vaciar semana">Vaciar</button>\n'
+            "    </div>\n"
+            "  </div>\n"
+            '  <div class="plan-days-row">\n'
+            f"{day_cards_html}\n"
+            "  </div>\n"
+            "</div>"
         )
-    progress_card_html = "\n".join(
-        [
-            '<div class="coach-progress-card">',
-            "  <h4>Progreso del alumno</h4>",
-            '  <div class="coach-progress-tools">',
-            '    <label for="coach_progress_week">Semana</label>',
-            '    <select id="coach_progress_week">',
-            '      <option value="1">Semana 1</option>',
-            '      <option value="2">Semana 2</option>',
-            '      <option value="3">Semana 3</option>',
-            '      <option value="4">Semana 4</option>',
-            "    </select>",
-            "  </div>",
-            '  <div class="coach-progress-content">',
-            '    <div id="coach_progress_donut" class="coach-progress-donut"><span id="coach_progress_pct">0%</span></div>',
-            '    <div class="coach-progress-kpis">',
-            '      <span class="ok">✓ Completados: <strong id="coach_progress_done">0</strong></span>',
-            '      <span class="bad">✕ Fallados: <strong id="coach_progress_missed">0</strong></span>',
-            '      <span class="wait">⏳ Pendientes: <strong id="coach_progress_pending">0</strong></span>',
-            "    </div>",
-            "  </div>",
-            "</div>",
-        ]
+    progress_card_html = (
+        '<div class="coach-progress-card">\n'
+        "  <h4>Progreso del alumno</h4>\n"
+        '  <div class="coach-progress-tools">\n'
+        '    <label for="coach_progress_week">Semana</label>\n'
+        '    <select id="coach_progress_week">\n'
+        '      <option value="1">Semana 1</option>\n'
+        '      <option value="2">Semana 2</option>\n'
+        '      <option value="3">Semana 3</option>\n'
+        '      <option value="4">Semana 4</option>\n'
+        "    </select>\n"
+        "  </div>\n"
+        '  <div class="coach-progress-content">\n'
+        '    <div id="coach_progress_donut" class="coach-progress-donut"><span id="coach_progress_pct">0%</span></div>\n'
+        '    <div class="coach-progress-kpis">\n'
+        '      <span class="ok">✓ Completados: <strong id="coach_progress_done">0</strong></span>\n'
+        '      <span class="bad">✕ Fallados: <strong id="coach_progress_missed">0</strong></span>\n'
+        '      <span class="wait">⏳ Pendientes: <strong id="coach_progress_pending">0</strong></span>\n'
+        "    </div>\n"
+        "  </div>\n"
+        "</div>"
     )
     chat_panel_html = render_chat_panel(selected_user, "admin") if selected_user else ""
     open_attr = " open" if expanded else ""
-
-    return "\n".join(
-        [
-            '<div id="plan" class="admin-card glass-card admin-wide">',
-            f'  <details class="admin-collapsible admin-main-collapsible"{open_attr}>',
-            '    <summary class="admin-collapsible-summary admin-main-summary">',
-            '      <div class="admin-collapsible-main">',
-            "        <strong>Plan de entrenamiento por alumno</strong>",
-            f"        <span>Alumno actual: {html.escape(selected_user)}</span>",
-            "      </div>",
-            '      <span class="admin-collapsible-tag">Plan</span>',
-            "    </summary>",
-            '    <div class="admin-collapsible-content">',
-            '      <div class="plan-editor">',
-            selector_html,
-            progress_card_html,
-            "  <div class=\"plan-tools\">",
-            "    <div class=\"plan-tool-row\">",
-            f"      <span class=\"plan-current-user\">Alumno actual: <strong>{html.escape(selected_user)}</strong></span>",
-            "      <label for=\"plan_user_select\">Cambiar alumno:</label>",
-            "      <select id=\"plan_user_select\">"
-            + "".join(
-                [
-                    (
-                        f'<option value="{html.escape(app.get("username",""))}"'
-                        f'{" selected" if app.get("username","") == selected_user else ""}>'
-                        f'{html.escape(app.get("username",""))}</option>'
-                    )
-                    for app in applications
-                ]
-            )
-            + "</select>",
-            '      <button type="button" class="btn glass ghost small" id="load_user_btn">Cargar</button>',
-            "      <span class=\"plan-tool-note\">Guarda antes de cambiar para no perder cambios.</span>",
-            "    </div>",
-            "    <div class=\"plan-tool-row\">",
-            '      <button type="button" class="btn glass ghost small" id="collapse_weeks_btn">Minimizar semanas</button>',
-            '      <button type="button" class="btn glass ghost small" id="expand_weeks_btn">Maximizar semanas</button>',
-            "      <span class=\"plan-tool-note\">Oculta o muestra semanas para reducir el largo de la página.</span>",
-            "    </div>",
-            '    <details class="plan-tools-advanced">',
-            "      <summary>Herramientas avanzadas (copiar y mover)</summary>",
-            "    <div class=\"plan-tool-row\">",
-            "      <label>Copiar semana:</label>",
-            "      <select id=\"copy_plan_user\">"
-            + "".join([f'<option value="{html.escape(app.get("username",""))}">{html.escape(app.get("username",""))}</option>' for app in applications])
-            + "</select>",
-            "      <select id=\"copy_plan_week\">"
-            + "".join([f'<option value="{i}">Semana {i}</option>' for i in range(1, 5)])
-            + "</select>",
-            "      <span>→</span>",
-            "      <select id=\"copy_target_user\">"
-            + "".join(
-                [
-                    (
-                        f'<option value="{html.escape(app.get("username",""))}"'
-                        f'{" selected" if app.get("username","") == selected_user else ""}>'
-                        f'{html.escape(app.get("username",""))}</option>'
-                    )
-                    for app in applications
-                ]
-            )
-            + "</select>",
-            "      <select id=\"copy_target_week\">"
-            + "".join([f'<option value="{i}">Semana {i}</option>' for i in range(1, 5)])
-            + "</select>",
-            '      <button type="button" class="btn glass ghost small" id="copy_week_btn">Copiar</button>',
-            "    </div>",
-            "    <div class=\"plan-tool-row\">",
-            "      <label>Copiar día:</label>",
-            "      <select id=\"copy_day_user\">"
-            + "".join([f'<option value="{html.escape(app.get("username",""))}">{html.escape(app.get("username",""))}</option>' for app in applications])
-            + "</select>",
-            "      <select id=\"copy_day_week\">"
-            + "".join([f'<option value="{i}">Semana {i}</option>' for i in range(1, 5)])
-            + "</select>",
-            "      <select id=\"copy_day_day\">"
-            + "".join([f'<option value="{i}">Día {i}</option>' for i in range(1, 8)])
-            + "</select>",
-            "      <span>→</span>",
-            "      <select id=\"copy_day_target_user\">"
-            + "".join(
-                [
-                    (
-                        f'<option value="{html.escape(app.get("username",""))}"'
-                        f'{" selected" if app.get("username","") == selected_user else ""}>'
-                        f'{html.escape(app.get("username",""))}</option>'
-                    )
-                    for app in applications
-                ]
-            )
-            + "</select>",
-            "      <select id=\"copy_day_target_week\">"
-            + "".join([f'<option value="{i}">Semana {i}</option>' for i in range(1, 5)])
-            + "</select>",
-            "      <select id=\"copy_day_target_day\">"
-            + "".join([f'<option value="{i}">Día {i}</option>' for i in range(1, 8)])
-            + "</select>",
-            '      <button type="button" class="btn glass ghost small" id="copy_day_btn">Copiar</button>',
-            "    </div>",
-            "    <div class=\"plan-tool-row\">",
-            "      <label>Mover día:</label>",
-            "      <select id=\"move_day_week_from\">"
-            + "".join([f'<option value="{i}">Semana {i}</option>' for i in range(1, 5)])
-            + "</select>",
-            "      <select id=\"move_day_from\">"
-            + "".join([f'<option value="{i}">Día {i}</option>' for i in range(1, 8)])
-            + "</select>",
-            "      <span>→</span>",
-            "      <select id=\"move_day_week_to\">"
-            + "".join([f'<option value="{i}">Semana {i}</option>' for i in range(1, 5)])
-            + "</select>",
-            "      <select id=\"move_day_to\">"
-            + "".join([f'<option value="{i}">Día {i}</option>' for i in range(1, 8)])
-            + "</select>",
-            '      <button type="button" class="btn glass ghost small" id="move_day_btn">Mover</button>',
-            '      <button type="button" class="btn glass ghost small" id="clear_day_btn">Vaciar destino</button>',
-            "    </div>",
-            "    </details>",
-            "  </div>",
-            "  <form class=\"admin-form\" action=\"/admin/plan/update\" method=\"post\">",
-            f"    <input type=\"hidden\" name=\"username\" value=\"{html.escape(selected_user)}\">",
-            '    <div class="form-field">',
-            "      <label for=\"plan_title\">Título del plan</label>",
-            f"      <input id=\"plan_title\" name=\"plan_title\" type=\"text\" value=\"{html.escape(plan.get('title', 'Plan de entrenamiento'))}\">",
-            "    </div>",
-            '    <div class="plan-weeks-row">',
-            "\n".join(week_blocks),
-            "    </div>",
-            "    <button class=\"btn glass primary\" type=\"submit\">Guardar plan</button>",
-            "  </form>",
-            chat_panel_html,
-            f'  <script type="application/json" id="plan-data">{plan_json}</script>',
-            f'  <script type="application/json" id="plan-progress-data">{progress_json}</script>',
-            f'  <script type="application/json" id="coach-chat-data">{chat_json}</script>',
-            "      </div>",
-            "    </div>",
-            "  </details>",
-            "</div>",
-        ]
+    user_options = "".join(
+        f'<option value="{escape(app.get("username",""))}">{escape(app.get("username",""))}</option>'
+        for app in applications
     )
+    selected_user_options = "".join(
+        f'<option value="{escape(app.get("username",""))}"'
+        f'{" selected" if app.get("username","") == selected_user else ""}>'
+        f'{escape(app.get("username",""))}</option>'
+        for app in applications
+    )
+    weeks_html = "\n".join(week_blocks)
+
+    return (
+        '<div id="plan" class="admin-card glass-card admin-wide">\n'
+        f'  <details class="admin-collapsible admin-main-collapsible"{open_attr}>\n'
+        '    <summary class="admin-collapsible-summary admin-main-summary">\n'
+        '      <div class="admin-collapsible-main">\n'
+        "        <strong>Plan de entrenamiento por alumno</strong>\n"
+        f"        <span>Alumno actual: {escape(selected_user)}</span>\n"
+        "      </div>\n"
+        '      <span class="admin-collapsible-tag">Plan</span>\n'
+        "    </summary>\n"
+        '    <div class="admin-collapsible-content">\n'
+        '      <div class="plan-editor">\n'
+        f"{selector_html}\n"
+        f"{progress_card_html}\n"
+        "  <div class=\"plan-tools\">\n"
+        "    <div class=\"plan-tool-row\">\n"
+        f"      <span class=\"plan-current-user\">Alumno actual: <strong>{escape(selected_user)}</strong></span>\n"
+        "      <label for=\"plan_user_select\">Cambiar alumno:</label>\n"
+        f"      <select id=\"plan_user_select\">{selected_user_options}</select>\n"
+        '      <button type="button" class="btn glass ghost small" id="load_user_btn">Cargar</button>\n'
+        "      <span class=\"plan-tool-note\">Guarda antes de cambiar para no perder cambios.</span>\n"
+        "    </div>\n"
+        "    <div class=\"plan-tool-row\">\n"
+        '      <button type="button" class="btn glass ghost small" id="collapse_weeks_btn">Minimizar semanas</button>\n'
+        '      <button type="button" class="btn glass ghost small" id="expand_weeks_btn">Maximizar semanas</button>\n'
+        "      <span class=\"plan-tool-note\">Oculta o muestra semanas para reducir el largo de la página.</span>\n"
+        "    </div>\n"
+        '    <details class="plan-tools-advanced">\n'
+        "      <summary>Herramientas avanzadas (copiar y mover)</summary>\n"
+        "    <div class=\"plan-tool-row\">\n"
+        "      <label>Copiar semana:</label>\n"
+        f"      <select id=\"copy_plan_user\">{user_options}</select>\n"
+        f"      <select id=\"copy_plan_week\">{PLAN_WEEK_OPTIONS}</select>\n"
+        "      <span>→</span>\n"
+        f"      <select id=\"copy_target_user\">{selected_user_options}</select>\n"
+        f"      <select id=\"copy_target_week\">{PLAN_WEEK_OPTIONS}</select>\n"
+        '      <button type="button" class="btn glass ghost small" id="copy_week_btn">Copiar</button>\n'
+        "    </div>\n"
+        "    <div class=\"plan-tool-row\">\n"
+        "      <label>Copiar día:</label>\n"
+        f"      <select id=\"copy_day_user\">{user_options}</select>\n"
+        f"      <select id=\"copy_day_week\">{PLAN_WEEK_OPTIONS}</select>\n"
+        f"      <select id=\"copy_day_day\">{PLAN_DAY_OPTIONS}</select>\n"
+        "      <span>→</span>\n"
+        f"      <select id=\"copy_day_target_user\">{selected_user_options}</select>\n"
+        f"      <select id=\"copy_day_target_week\">{PLAN_WEEK_OPTIONS}</select>\n"
+        f"      <select id=\"copy_day_target_day\">{PLAN_DAY_OPTIONS}</select>\n"
+        '      <button type="button" class="btn glass ghost small" id="copy_day_btn">Copiar</button>\n'
+        "    </div>\n"
+        "    <div class=\"plan-tool-row\">\n"
+        "      <label>Mover día:</label>\n"
+        f"      <select id=\"move_day_week_from\">{PLAN_WEEK_OPTIONS}</select>\n"
+        f"      <select id=\"move_day_from\">{PLAN_DAY_OPTIONS}</select>\n"
+        "      <span>→</span>\n"
+        f"      <select id=\"move_day_week_to\">{PLAN_WEEK_OPTIONS}</select>\n"
+        f"      <select id=\"move_day_to\">{PLAN_DAY_OPTIONS}</select>\n"
+        '      <button type="button" class="btn glass ghost small" id="move_day_btn">Mover</button>\n'
+        '      <button type="button" class="btn glass ghost small" id="clear_day_btn">Vaciar destino</button>\n'
+        "    </div>\n"
+        "    </details>\n"
+        "  </div>\n"
+        "  <form class=\"admin-form\" action=\"/admin/plan/update\" method=\"post\">\n"
+        f"    <input type=\"hidden\" name=\"username\" value=\"{escape(selected_user)}\">\n"
+        '    <div class="form-field">\n'
+        "      <label for=\"plan_title\">Título del plan</label>\n"
+        f"      <input id=\"plan_title\" name=\"plan_title\" type=\"text\" value=\"{escape(plan.get('title', 'Plan de entrenamiento'))}\">\n"
+        "    </div>\n"
+        '    <div class="plan-weeks-row">\n'
+        f"{weeks_html}\n"
+        "    </div>\n"
+        "    <button class=\"btn glass primary\" type=\"submit\">Guardar plan</button>\n"
+        "  </form>\n"
+        f"{chat_panel_html}\n"
+        f'  <script type="application/json" id="plan-data">{plan_json}</script>\n'
+        f'  <script type="application/json" id="plan-progress-data">{progress_json}</script>\n'
+        f'  <script type="application/json" id="coach-chat-data">{chat_json}</script>\n'
+        "      </div>\n"
+        "    </div>\n"
+        "  </details>\n"
+        "</div>"
+    )
+
+
+CONTENT_FORM_TEMPLATE = (
+    '<div class="admin-card glass-card admin-wide">\n'
+    '  <details class="admin-collapsible admin-main-collapsible">\n'
+    '    <summary class="admin-collapsible-summary admin-main-summary">\n'
+    '      <div class="admin-collapsible-main">\n'
+    "        <strong>Contenido de la web principal</strong>\n"
+    "        <span>Hero, bio, programa, contacto y patrocinadores</span>\n"
+    "      </div>\n"
+    '      <span class="admin-collapsible-tag">Editar</span>\n'
+    "    </summary>\n"
+    '    <div class="admin-collapsible-content">\n'
+    "      <form class=\"admin-form\" action=\"/admin/content\" method=\"post\" enctype=\"multipart/form-data\">\n"
+    '    <div class="form-section">\n'
+    "      <h4>Hero</h4>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"hero_eyebrow\">Eyebrow</label>\n"
+    "          <input id=\"hero_eyebrow\" name=\"hero_eyebrow\" type=\"text\" value=\"{hero_eyebrow}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"hero_title\">Título</label>\n"
+    "          <input id=\"hero_title\" name=\"hero_title\" type=\"text\" value=\"{hero_title}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"hero_subtitle\">Subtítulo</label>\n"
+    "        <textarea id=\"hero_subtitle\" name=\"hero_subtitle\" rows=\"3\">{hero_subtitle}</textarea>\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"hero_stats\">Stats (una línea por stat: valor | label)</label>\n"
+    "        <textarea id=\"hero_stats\" name=\"hero_stats\" rows=\"3\">{hero_stats}</textarea>\n"
+    "      </div>\n"
+    "    </div>\n"
+    '    <div class="form-section">\n'
+    "      <h4>Bio</h4>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"bio_eyebrow\">Eyebrow</label>\n"
+    "          <input id=\"bio_eyebrow\" name=\"bio_eyebrow\" type=\"text\" value=\"{bio_eyebrow}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"bio_name\">Nombre</label>\n"
+    "          <input id=\"bio_name\" name=\"bio_name\" type=\"text\" value=\"{bio_name}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"bio_paragraphs\">Párrafos (uno por línea)</label>\n"
+    "        <textarea id=\"bio_paragraphs\" name=\"bio_paragraphs\" rows=\"5\">{bio_paragraphs}</textarea>\n"
+    "      </div>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"bio_signature\">Firma</label>\n"
+    "          <input id=\"bio_signature\" name=\"bio_signature\" type=\"text\" value=\"{bio_signature}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"bio_image\">Imagen (ruta o URL)</label>\n"
+    "          <input id=\"bio_image\" name=\"bio_image\" type=\"text\" value=\"{bio_image}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"bio_image_file\">Subir imagen Bio (jpg/png/webp)</label>\n"
+    "        <input id=\"bio_image_file\" name=\"bio_image_file\" type=\"file\" accept=\"image/png,image/jpeg,image/webp\">\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"bio_image_caption\">Caption de la imagen</label>\n"
+    "        <input id=\"bio_image_caption\" name=\"bio_image_caption\" type=\"text\" value=\"{bio_image_caption}\">\n"
+    "      </div>\n"
+    "    </div>\n"
+    '    <div class="form-section">\n'
+    "      <h4>Programa</h4>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"program_title\">Título</label>\n"
+    "          <input id=\"program_title\" name=\"program_title\" type=\"text\" value=\"{program_title}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"program_image\">Imagen (ruta o URL)</label>\n"
+    "          <input id=\"program_image\" name=\"program_image\" type=\"text\" value=\"{program_image}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"program_image_file\">Subir imagen Programa (jpg/png/webp)</label>\n"
+    "        <input id=\"program_image_file\" name=\"program_image_file\" type=\"file\" accept=\"image/png,image/jpeg,image/webp\">\n"
+    "      </div>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"program_lead\">Lead</label>\n"
+    "        <textarea id=\"program_lead\" name=\"program_lead\" rows=\"3\">{program_lead}</textarea>\n"
+    "      </div>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"program_highlight_title\">Título destacado</label>\n"
+    "          <input id=\"program_highlight_title\" name=\"program_highlight_title\" type=\"text\" value=\"{program_highlight_title}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"program_highlight_text\">Texto destacado</label>\n"
+    "          <input id=\"program_highlight_text\" name=\"program_highlight_text\" type=\"text\" value=\"{program_highlight_text}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"program_bullets\">Bullets (uno por línea)</label>\n"
+    "          <textarea id=\"program_bullets\" name=\"program_bullets\" rows=\"4\">{program_bullets}</textarea>\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"program_image_caption\">Caption de la imagen</label>\n"
+    "          <input id=\"program_image_caption\" name=\"program_image_caption\" type=\"text\" value=\"{program_image_caption}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    "    </div>\n"
+    '    <div class="form-section">\n'
+    "      <h4>Contacto</h4>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"contact_email\">Email</label>\n"
+    "          <input id=\"contact_email\" name=\"contact_email\" type=\"email\" value=\"{contact_email}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"contact_phone\">Teléfono</label>\n"
+    "          <input id=\"contact_phone\" name=\"contact_phone\" type=\"text\" value=\"{contact_phone}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    '      <div class="form-row">\n'
+    '        <div class="form-field">\n'
+    "          <label for=\"contact_city\">Ciudad</label>\n"
+    "          <input id=\"contact_city\" name=\"contact_city\" type=\"text\" value=\"{contact_city}\">\n"
+    "        </div>\n"
+    '        <div class="form-field">\n'
+    "          <label for=\"contact_instagram\">Instagram</label>\n"
+    "          <input id=\"contact_instagram\" name=\"contact_instagram\" type=\"text\" value=\"{contact_instagram}\">\n"
+    "        </div>\n"
+    "      </div>\n"
+    "    </div>\n"
+    '    <div class="form-section">\n'
+    "      <h4>Patrocinadores</h4>\n"
+    '      <div class="form-field">\n'
+    "        <label for=\"sponsors\">Lista (nombre | ruta-logo | enlace-opcional)</label>\n"
+    "        <textarea id=\"sponsors\" name=\"sponsors\" rows=\"3\">{sponsors}</textarea>\n"
+    "      </div>\n"
+    "    </div>\n"
+    "        <button class=\"btn glass primary\" type=\"submit\">Guardar contenido</button>\n"
+    "      </form>\n"
+    "    </div>\n"
+    "  </details>\n"
+    "</div>"
+)
 
 
 def render_content_form(content: dict) -> str:
@@ -3464,159 +4157,38 @@ def render_content_form(content: dict) -> str:
         ]
     )
 
-    return "\n".join(
-        [
-            '<div class="admin-card glass-card admin-wide">',
-            '  <details class="admin-collapsible admin-main-collapsible">',
-            '    <summary class="admin-collapsible-summary admin-main-summary">',
-            '      <div class="admin-collapsible-main">',
-            "        <strong>Contenido de la web principal</strong>",
-            "        <span>Hero, bio, programa, contacto y patrocinadores</span>",
-            "      </div>",
-            '      <span class="admin-collapsible-tag">Editar</span>',
-            "    </summary>",
-            '    <div class="admin-collapsible-content">',
-            "      <form class=\"admin-form\" action=\"/admin/content\" method=\"post\" enctype=\"multipart/form-data\">",
-            '    <div class="form-section">',
-            "      <h4>Hero</h4>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"hero_eyebrow\">Eyebrow</label>",
-            f"          <input id=\"hero_eyebrow\" name=\"hero_eyebrow\" type=\"text\" value=\"{html.escape(hero.get('eyebrow',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"hero_title\">Título</label>",
-            f"          <input id=\"hero_title\" name=\"hero_title\" type=\"text\" value=\"{html.escape(hero.get('title',''))}\">",
-            "        </div>",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"hero_subtitle\">Subtítulo</label>",
-            f"        <textarea id=\"hero_subtitle\" name=\"hero_subtitle\" rows=\"3\">{html.escape(hero.get('subtitle',''))}</textarea>",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"hero_stats\">Stats (una línea por stat: valor | label)</label>",
-            f"        <textarea id=\"hero_stats\" name=\"hero_stats\" rows=\"3\">{html.escape(stats_text)}</textarea>",
-            "      </div>",
-            "    </div>",
-            '    <div class="form-section">',
-            "      <h4>Bio</h4>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"bio_eyebrow\">Eyebrow</label>",
-            f"          <input id=\"bio_eyebrow\" name=\"bio_eyebrow\" type=\"text\" value=\"{html.escape(bio.get('eyebrow',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"bio_name\">Nombre</label>",
-            f"          <input id=\"bio_name\" name=\"bio_name\" type=\"text\" value=\"{html.escape(bio.get('name',''))}\">",
-            "        </div>",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"bio_paragraphs\">Párrafos (uno por línea)</label>",
-            f"        <textarea id=\"bio_paragraphs\" name=\"bio_paragraphs\" rows=\"5\">{html.escape(bio_paragraphs)}</textarea>",
-            "      </div>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"bio_signature\">Firma</label>",
-            f"          <input id=\"bio_signature\" name=\"bio_signature\" type=\"text\" value=\"{html.escape(bio.get('signature',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"bio_image\">Imagen (ruta o URL)</label>",
-            f"          <input id=\"bio_image\" name=\"bio_image\" type=\"text\" value=\"{html.escape(bio.get('image',''))}\">",
-            "        </div>",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"bio_image_file\">Subir imagen Bio (jpg/png/webp)</label>",
-            "        <input id=\"bio_image_file\" name=\"bio_image_file\" type=\"file\" accept=\"image/png,image/jpeg,image/webp\">",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"bio_image_caption\">Caption de la imagen</label>",
-            f"        <input id=\"bio_image_caption\" name=\"bio_image_caption\" type=\"text\" value=\"{html.escape(bio.get('image_caption',''))}\">",
-            "      </div>",
-            "    </div>",
-            '    <div class="form-section">',
-            "      <h4>Programa</h4>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"program_title\">Título</label>",
-            f"          <input id=\"program_title\" name=\"program_title\" type=\"text\" value=\"{html.escape(program.get('title',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"program_image\">Imagen (ruta o URL)</label>",
-            f"          <input id=\"program_image\" name=\"program_image\" type=\"text\" value=\"{html.escape(program.get('image',''))}\">",
-            "        </div>",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"program_image_file\">Subir imagen Programa (jpg/png/webp)</label>",
-            "        <input id=\"program_image_file\" name=\"program_image_file\" type=\"file\" accept=\"image/png,image/jpeg,image/webp\">",
-            "      </div>",
-            '      <div class="form-field">',
-            "        <label for=\"program_lead\">Lead</label>",
-            f"        <textarea id=\"program_lead\" name=\"program_lead\" rows=\"3\">{html.escape(program.get('lead',''))}</textarea>",
-            "      </div>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"program_highlight_title\">Título destacado</label>",
-            f"          <input id=\"program_highlight_title\" name=\"program_highlight_title\" type=\"text\" value=\"{html.escape(program.get('highlight_title',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"program_highlight_text\">Texto destacado</label>",
-            f"          <input id=\"program_highlight_text\" name=\"program_highlight_text\" type=\"text\" value=\"{html.escape(program.get('highlight_text',''))}\">",
-            "        </div>",
-            "      </div>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"program_bullets\">Bullets (uno por línea)</label>",
-            f"          <textarea id=\"program_bullets\" name=\"program_bullets\" rows=\"4\">{html.escape(program_bullets)}</textarea>",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"program_image_caption\">Caption de la imagen</label>",
-            f"          <input id=\"program_image_caption\" name=\"program_image_caption\" type=\"text\" value=\"{html.escape(program.get('image_caption',''))}\">",
-            "        </div>",
-            "      </div>",
-            "    </div>",
-            '    <div class="form-section">',
-            "      <h4>Contacto</h4>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"contact_email\">Email</label>",
-            f"          <input id=\"contact_email\" name=\"contact_email\" type=\"email\" value=\"{html.escape(contact.get('email',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"contact_phone\">Teléfono</label>",
-            f"          <input id=\"contact_phone\" name=\"contact_phone\" type=\"text\" value=\"{html.escape(contact.get('phone',''))}\">",
-            "        </div>",
-            "      </div>",
-            '      <div class="form-row">',
-            '        <div class="form-field">',
-            "          <label for=\"contact_city\">Ciudad</label>",
-            f"          <input id=\"contact_city\" name=\"contact_city\" type=\"text\" value=\"{html.escape(contact.get('city',''))}\">",
-            "        </div>",
-            '        <div class="form-field">',
-            "          <label for=\"contact_instagram\">Instagram</label>",
-            f"          <input id=\"contact_instagram\" name=\"contact_instagram\" type=\"text\" value=\"{html.escape(contact.get('instagram',''))}\">",
-            "        </div>",
-            "      </div>",
-            "    </div>",
-            '    <div class="form-section">',
-            "      <h4>Patrocinadores</h4>",
-            '      <div class="form-field">',
-            "        <label for=\"sponsors\">Lista (nombre | ruta-logo | enlace-opcional)</label>",
-            f"        <textarea id=\"sponsors\" name=\"sponsors\" rows=\"3\">{html.escape(sponsors_text)}</textarea>",
-            "      </div>",
-            "    </div>",
-            "        <button class=\"btn glass primary\" type=\"submit\">Guardar contenido</button>",
-            "      </form>",
-            "    </div>",
-            "  </details>",
-            "</div>",
-        ]
+    return CONTENT_FORM_TEMPLATE.format_map(
+        {
+            "hero_eyebrow": html.escape(hero.get("eyebrow", "")),
+            "hero_title": html.escape(hero.get("title", "")),
+            "hero_subtitle": html.escape(hero.get("subtitle", "")),
+            "hero_stats": html.escape(stats_text),
+            "bio_eyebrow": html.escape(bio.get("eyebrow", "")),
+            "bio_name": html.escape(bio.get("name", "")),
+            "bio_paragraphs": html.escape(bio_paragraphs),
+            "bio_signature": html.escape(bio.get("signature", "")),
+            "bio_image": html.escape(bio.get("image", "")),
+            "bio_image_caption": html.escape(bio.get("image_caption", "")),
+            "program_title": html.escape(program.get("title", "")),
+            "program_image": html.escape(program.get("image", "")),
+            "program_lead": html.escape(program.get("lead", "")),
+            "program_highlight_title": html.escape(program.get("highlight_title", "")),
+            "program_highlight_text": html.escape(program.get("highlight_text", "")),
+            "program_bullets": html.escape(program_bullets),
+            "program_image_caption": html.escape(program.get("image_caption", "")),
+            "contact_email": html.escape(contact.get("email", "")),
+            "contact_phone": html.escape(contact.get("phone", "")),
+            "contact_city": html.escape(contact.get("city", "")),
+            "contact_instagram": html.escape(contact.get("instagram", "")),
+            "sponsors": html.escape(sponsors_text),
+        }
     )
 
 
-def render_admin_page(query: dict[str, list[str]]) -> str:
+def build_admin_replacements(query: dict[str, list[str]]) -> dict[str, str | Iterable[str]]:
     section = resolve_admin_section(query)
-    selected_user = (query.get("plan_user") or [""])[0]
-    status = (query.get("status") or [""])[0]
+    selected_user = first_query_value(query, "plan_user")
+    status = first_query_value(query, "status")
     replacements = {
         "ADMIN_MESSAGE": build_admin_alert(query),
         "COACH_DASHBOARD": "",
@@ -3635,201 +4207,308 @@ def render_admin_page(query: dict[str, list[str]]) -> str:
             {
                 "VISIT_METRICS": render_visit_metrics(),
                 "CONTENT_FORM": render_content_form(content),
-                "EVENT_LIST": render_event_list(events),
-                "VIDEO_LIST": render_video_list(videos),
+                "EVENT_LIST": iter_event_list(events),
+                "VIDEO_LIST": iter_video_list(videos),
             }
         )
     else:
-        applications = load_applications()
+        applications, _, applications_by_user = load_applications_snapshot()
         storage_status = get_storage_status()
         plan_expanded = bool(selected_user or status == "plan_saved")
         replacements.update(
             {
                 "COACH_DASHBOARD": render_coach_dashboard(applications, storage_status),
-                "PLAN_EDITOR": render_plan_editor(applications, selected_user, expanded=plan_expanded),
-                "APPLICATION_LIST": render_application_list(applications),
+                "PLAN_EDITOR": render_plan_editor(
+                    applications, applications_by_user, selected_user, expanded=plan_expanded
+                ),
+                "APPLICATION_LIST": iter_application_list(applications),
             }
         )
-    return render_template(ADMIN_TEMPLATE, replacements)
+    return replacements
+
+
+LOGIN_PAGE_TEMPLATE = (
+    "<!doctype html>\n"
+    "<html lang=\"es\">\n"
+    "  <head>\n"
+    "    <meta charset=\"utf-8\">\n"
+    "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+    "    <title>Acceso admin - AuraCalistenia</title>\n"
+    "    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">\n"
+    "    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>\n"
+    "    <link href=\"https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Space+Grotesk:wght@300;400;500;600;700&display=swap\" rel=\"stylesheet\">\n"
+    "    <link rel=\"stylesheet\" href=\"/styles.css?v=20260303-2\">\n"
+    "  </head>\n"
+    "  <body class=\"admin-body\">\n"
+    "    <div class=\"noise\" aria-hidden=\"true\"></div>\n"
+    "    <header class=\"nav\">\n"
+    "      <div class=\"nav-inner\">\n"
+    "        <nav class=\"nav-group nav-left\"></nav>\n"
+    "        <a class=\"nav-brand\" href=\"/\" aria-label=\"AuraCalistenia\">\n"
+    "          <span class=\"brand-mark\" aria-hidden=\"true\"></span>\n"
+    "        </a>\n"
+    "        <nav class=\"nav-group nav-right\">\n"
+    "          <a href=\"/\">Inicio</a>\n"
+    "        </nav>\n"
+    "        <nav class=\"nav-group nav-compact\" aria-label=\"Navegación\">\n"
+    "          <a href=\"/\">Inicio</a>\n"
+    "        </nav>\n"
+    "      </div>\n"
+    "    </header>\n"
+    "    <main class=\"section\">\n"
+    "      <div class=\"admin-login glass-card\">\n"
+    "        <h2>Acceso admin</h2>\n"
+    "        {message}\n"
+    "        <form class=\"admin-form\" action=\"/admin/login\" method=\"post\">\n"
+    "          <div class=\"form-field\">\n"
+    "            <label for=\"admin_user\">Usuario</label>\n"
+    "            <input id=\"admin_user\" name=\"username\" type=\"text\" required>\n"
+    "          </div>\n"
+    "          <div class=\"form-field\">\n"
+    "            <label for=\"admin_pass\">Contraseña</label>\n"
+    "            <input id=\"admin_pass\" name=\"password\" type=\"password\" required>\n"
+    "          </div>\n"
+    "          <button class=\"btn glass primary\" type=\"submit\">Entrar</button>\n"
+    "        </form>\n"
+    "      </div>\n"
+    "    </main>\n"
+    "    <script src=\"/script.js?v=20260303-2\"></script>\n"
+    "  </body>\n"
+    "</html>"
+)
 
 
+@functools.lru_cache(maxsize=8)
 def render_login_page(error: str | None = None) -> str:
     message = ""
     if error:
         message = f'<div class="form-alert error">{html.escape(error)}</div>'
-    return "\n".join(
-        [
-            "<!doctype html>",
-            "<html lang=\"es\">",
-            "  <head>",
-            "    <meta charset=\"utf-8\">",
-            "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">",
-            "    <title>Acceso admin - AuraCalistenia</title>",
-            "    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">",
-            "    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>",
-            "    <link href=\"https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Space+Grotesk:wght@300;400;500;600;700&display=swap\" rel=\"stylesheet\">",
-            "    <link rel=\"stylesheet\" href=\"/styles.css?v=20260303-2\">",
-            "  </head>",
-            "  <body class=\"admin-body\">",
-            "    <div class=\"noise\" aria-hidden=\"true\"></div>",
-            "    <header class=\"nav\">",
-            "      <div class=\"nav-inner\">",
-            "        <nav class=\"nav-group nav-left\"></nav>",
-            "        <a class=\"nav-brand\" href=\"/\" aria-label=\"AuraCalistenia\">",
-            "          <span class=\"brand-mark\" aria-hidden=\"true\"></span>",
-            "        </a>",
-            "        <nav class=\"nav-group nav-right\">",
-            "          <a href=\"/\">Inicio</a>",
-            "        </nav>",
-            "        <nav class=\"nav-group nav-compact\" aria-label=\"Navegación\">",
-            "          <a href=\"/\">Inicio</a>",
-            "        </nav>",
-            "      </div>",
-            "    </header>",
-            "    <main class=\"section\">",
-            "      <div class=\"admin-login glass-card\">",
-            "        <h2>Acceso admin</h2>",
-            f"        {message}",
-            "        <form class=\"admin-form\" action=\"/admin/login\" method=\"post\">",
-            "          <div class=\"form-field\">",
-            "            <label for=\"admin_user\">Usuario</label>",
-            "            <input id=\"admin_user\" name=\"username\" type=\"text\" required>",
-            "          </div>",
-            "          <div class=\"form-field\">",
-            "            <label for=\"admin_pass\">Contraseña</label>",
-            "            <input id=\"admin_pass\" name=\"password\" type=\"password\" required>",
-            "          </div>",
-            "          <button class=\"btn glass primary\" type=\"submit\">Entrar</button>",
-            "        </form>",
-            "      </div>",
-            "    </main>",
-            "    <script src=\"/script.js?v=20260303-2\"></script>",
-            "  </body>",
-            "</html>",
-        ]
-    )
+    return LOGIN_PAGE_TEMPLATE.format(message=message)
+
+
+PORTAL_LOGIN_CARD_TEMPLATE = (
+    '<div class="portal-card glass-card stagger-item">\n'
+    "  <h3>Acceso a tu Área Privada</h3>\n"
+    "  <p>Introduce tu usuario y contraseña para ver tu plan.</p>\n"
+    "{alert_line}\n"
+    "  <form class=\"admin-form\" action=\"/login\" method=\"post\">\n"
+    "    <div class=\"form-field\">\n"
+    "      <label for=\"portal_user\">Usuario</label>\n"
+    "      <input id=\"portal_user\" name=\"username\" type=\"text\" required>\n"
+    "    </div>\n"
+    "    <div class=\"form-field\">\n"
+    "      <label for=\"portal_pass\">Contraseña</label>\n"
+    "      <input id=\"portal_pass\" name=\"password\" type=\"password\" required>\n"
+    "    </div>\n"
+    "    <button class=\"btn glass primary\" type=\"submit\">Entrar</button>\n"
+    "  </form>\n"
+    "{forgot_block}\n"
+    "</div>"
+)
+PORTAL_FORGOT_PASSWORD_BLOCK = render_forgot_password_block("portal")
+ANONYMOUS_PORTAL_LOGIN_CARD = PORTAL_LOGIN_CARD_TEMPLATE.format(
+    alert_line="", forgot_block=PORTAL_FORGOT_PASSWORD_BLOCK
+)
+PORTAL_SUMMARY_TEMPLATE = (
+    '<div class="portal-card glass-card stagger-item">\n'
+    "  <h3>Plan activo</h3>\n"
+    "{alert_line}\n"
+    "  <p>Bienvenido, {username}.</p>\n"
+    "  <div class=\"portal-meta\">\n"
+    "    <span>Skill: {skill}</span>\n"
+    "    <span>Objetivo: {goal}</span>\n"
+    "    <span>Nivel: {level}</span>\n"
+    "  </div>\n"
+    "</div>"
+)
+PORTAL_CONTENT_TEMPLATE = (
+    '<div class="access-grid" data-stagger>\n'
+    "{summary}\n"
+    "</div>\n"
+    '<details class="portal-collapsible" open>\n'
+    "  <summary>Plan de entrenamiento</summary>\n"
+    "  {plan_html}\n"
+    "</details>\n"
+    '<details class="portal-collapsible">\n'
+    "  <summary>Chat con tu entrenador</summary>\n"
+    "  {chat_html}\n"
+    "</details>"
+)
+PORTAL_NAV_ACTIONS = (
+    '<form class="nav-logout-form" action="/logout" method="post">\n'
+    '  <button class="btn nav-logout-btn" type="submit">Cerrar sesión</button>\n'
+    "</form>"
+)
 
 
-def render_portal_page(query: dict[str, list[str]], cookie_header: str | None) -> str:
-    access_status = (query.get("access") or [""])[0]
+def build_portal_replacements(query: dict[str, list[str]], cookie_header: str | None) -> dict[str, str]:
+    escape = escape_html
+    access_status = first_query_value(query, "access")
     user_alert = build_access_alert(access_status, "user")
     portal_user = get_session_user(cookie_header, USER_SESSION_COOKIE, "user")
-    applications = load_applications()
 
     if not portal_user:
-        forgot_block = render_forgot_password_block("portal")
-        login_card = "\n".join(
-            [
-                '<div class="portal-card glass-card stagger-item">',
-                "  <h3>Acceso a tu Área Privada</h3>",
-                "  <p>Introduce tu usuario y contraseña para ver tu plan.</p>",
-                f"  {user_alert}" if user_alert else "",
-                "  <form class=\"admin-form\" action=\"/login\" method=\"post\">",
-                "    <div class=\"form-field\">",
-                "      <label for=\"portal_user\">Usuario</label>",
-                "      <input id=\"portal_user\" name=\"username\" type=\"text\" required>",
-                "    </div>",
-                "    <div class=\"form-field\">",
-                "      <label for=\"portal_pass\">Contraseña</label>",
-                "      <input id=\"portal_pass\" name=\"password\" type=\"password\" required>",
-                "    </div>",
-                "    <button class=\"btn glass primary\" type=\"submit\">Entrar</button>",
-                "  </form>",
-                forgot_block,
-                "</div>",
-            ]
-        )
-        return render_template(
-            PORTAL_TEMPLATE,
-            {
-                "PORTAL_CONTENT": login_card,
-                "PORTAL_NAV_ACTIONS": "",
-                "PORTAL_HOME_HREF": "/",
-            },
-        )
+        login_card = ANONYMOUS_PORTAL_LOGIN_CARD
+        if user_alert:
+            login_card = PORTAL_LOGIN_CARD_TEMPLATE.format(
+                alert_line=f"  {user_alert}", forgot_block=PORTAL_FORGOT_PASSWORD_BLOCK
+            )
+        return {
+            "PORTAL_CONTENT": login_card,
+            "PORTAL_NAV_ACTIONS": "",
+            "PORTAL_HOME_HREF": "/",
+        }
 
-    app = find_application(applications, portal_user) or {}
-    week_param = (query.get("week") or [""])[0]
+    app = lookup_application(portal_user) or {}
+    week_param = first_query_value(query, "week")
     try:
         active_week = int(week_param)
     except (TypeError, ValueError):
         active_week = None
     plan_html = render_training_plan(app.get("plan", {}), active_week=active_week)
     chat_html = render_chat_panel(portal_user, "user")
-    skill = html.escape(app.get("skill", "Sin datos"))
-    level = html.escape(app.get("level", ""))
-    goal = html.escape(app.get("goal", ""))
-    summary = "\n".join(
-        [
-            '<div class="portal-card glass-card stagger-item">',
-            "  <h3>Plan activo</h3>",
-            f"  {user_alert}" if user_alert else "",
-            f"  <p>Bienvenido, {html.escape(portal_user)}.</p>",
-            "  <div class=\"portal-meta\">",
-            f"    <span>Skill: {skill}</span>",
-            f"    <span>Objetivo: {goal or 'Sin datos'}</span>",
-            f"    <span>Nivel: {level or 'Sin datos'}</span>",
-            "  </div>",
-            "</div>",
-        ]
+    level = escape(app.get("level", ""))
+    goal = escape(app.get("goal", ""))
+    summary = PORTAL_SUMMARY_TEMPLATE.format(
+        alert_line=f"  {user_alert}" if user_alert else "",
+        username=escape(portal_user),
+        skill=escape(app.get("skill", "Sin datos")),
+        goal=goal or "Sin datos",
+        level=level or "Sin datos",
     )
+    portal_content = PORTAL_CONTENT_TEMPLATE.format(summary=summary, plan_html=plan_html, chat_html=chat_html)
+    return {
+        "PORTAL_CONTENT": portal_content,
+        "PORTAL_NAV_ACTIONS": PORTAL_NAV_ACTIONS,
+        "PORTAL_HOME_HREF": "/portal",
+    }
 
-    nav_actions = "\n".join(
-        [
-            '<form class="nav-logout-form" action="/logout" method="post">',
-            '  <button class="btn nav-logout-btn" type="submit">Cerrar sesión</button>',
-            "</form>",
-        ]
-    )
 
-    portal_content = "\n".join(
-        [
-            '<div class="access-grid" data-stagger>',
-            summary,
-            "</div>",
-            '<details class="portal-collapsible" open>',
-            "  <summary>Plan de entrenamiento</summary>",
-            f"  {plan_html}",
-            "</details>",
-            '<details class="portal-collapsible">',
-            "  <summary>Chat con tu entrenador</summary>",
-            f"  {chat_html}",
-            "</details>",
-        ]
-    )
-    return render_template(
-        PORTAL_TEMPLATE,
-        {
-            "PORTAL_CONTENT": portal_content,
-            "PORTAL_NAV_ACTIONS": nav_actions,
-            "PORTAL_HOME_HREF": "/portal",
-        },
-    )
+def iter_body_chunks(stream, length: int):
+    remaining = length
+    while remaining > 0:
+        chunk = stream.read(min(MULTIPART_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def parse_multipart_stream(
+    stream,
+    length: int,
+    content_type: str,
+    pending: list[UploadedFile] | None = None,
+) -> tuple[dict[str, str], dict[str, UploadedFile]]:
+    # Lee el cuerpo por bloques de 64 KiB y vuelca cada fichero a un temporal dentro de UPLOAD_DIR.
+    data: dict[str, str] = {}
+    files: dict[str, UploadedFile] = {}
+    content_header = EmailMessage()
+    content_header["Content-Type"] = content_type
+    boundary = content_header.get_param("boundary")
+    chunks = iter_body_chunks(stream, length)
+    if not boundary:
+        for _ in chunks:
+            pass
+        return data, files
+    delimiter = b"--" + str(boundary).encode("latin-1")
+    separator = b"\r\n" + delimiter
+    buffer = bytearray()
+
+    def fill() -> bool:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer.extend(chunk)
+        return True
+
+    while True:
+        index = buffer.find(delimiter)
+        if index != -1:
+            del buffer[: index + len(delimiter)]
+            break
+        if len(buffer) > len(delimiter):
+            del buffer[: len(buffer) - len(delimiter)]
+        if not fill():
+            return data, files
+
+    complete = True
+    while complete:
+        while len(buffer) < 2:
+            if not fill():
+                complete = False
+                break
+        if not complete or buffer[:2] == b"--":
+            break
+        header_end = buffer.find(b"\r\n\r\n")
+        while header_end == -1:
+            if len(buffer) > MULTIPART_HEADER_LIMIT or not fill():
+                complete = False
+                break
+            header_end = buffer.find(b"\r\n\r\n")
+        if not complete:
+            break
+        raw_headers = bytes(buffer[:header_end]).lstrip(b" \t")
+        if raw_headers.startswith(b"\r\n"):
+            raw_headers = raw_headers[2:]
+        del buffer[: header_end + 4]
+        part = BytesParser(policy=default).parsebytes(raw_headers + b"\r\n\r\n", headersonly=True)
+        name = None
+        if part.get_content_disposition() == "form-data":
+            name = part.get_param("name", header="content-disposition")
+        filename = part.get_filename() if name else None
+        upload = None
+        if filename:
+            sink = NamedTemporaryFile(mode="w+b", dir=UPLOAD_DIR, prefix=UPLOAD_PART_PREFIX, suffix=".part", delete=False)
+            upload = UploadedFile(filename=filename, file=sink)
+            if pending is not None:
+                pending.append(upload)
+        else:
+            sink = BytesIO()
+        written = 0
+        while True:
+            index = buffer.find(separator)
+            end = index if index != -1 else len(buffer) - len(separator) + 1
+            if end > 0:
+                # Un fichero que supera MAX_UPLOAD_BYTES se descarta al vuelo: el resto del cuerpo solo se consume.
+                if upload is not None and (upload.oversized or written + end > MAX_UPLOAD_BYTES):
+                    if not upload.oversized:
+                        upload.oversized = True
+                        sink.seek(0)
+                        sink.truncate()
+                else:
+                    sink.write(buffer[:end])
+                    written += end
+                del buffer[:end]
+            if index != -1:
+                del buffer[: len(separator)]
+                break
+            if not fill():
+                complete = False
+                break
+        if not name:
+            continue
+        if filename:
+            sink.seek(0)
+            previous = files.get(name)
+            if previous is not None and pending is None:
+                discard_uploaded_file(previous)
+            files[name] = upload
+        else:
+            charset = part.get_content_charset() or "utf-8"
+            data[name] = sink.getvalue().decode(charset, errors="replace")
+
+    for _ in chunks:
+        pass
+    return data, files
 
 
 def parse_post_data(handler: SimpleHTTPRequestHandler) -> tuple[dict[str, str], dict[str, UploadedFile]]:
     content_type = handler.headers.get("Content-Type", "")
     length = int(handler.headers.get("Content-Length", 0))
     if content_type.startswith("multipart/form-data"):
-        raw_body = handler.rfile.read(length)
-        header = f"Content-Type: {content_type}\r\nMIME-Version: 1.0\r\n\r\n".encode("utf-8")
-        message = BytesParser(policy=default).parsebytes(header + raw_body)
-        data: dict[str, str] = {}
-        files: dict[str, UploadedFile] = {}
-        for part in message.iter_parts():
-            if part.get_content_disposition() != "form-data":
-                continue
-            name = part.get_param("name", header="content-disposition")
-            if not name:
-                continue
-            filename = part.get_filename()
-            payload = part.get_payload(decode=True) or b""
-            if filename:
-                files[name] = UploadedFile(filename=filename, file=BytesIO(payload))
-            else:
-                charset = part.get_content_charset() or "utf-8"
-                data[name] = payload.decode(charset, errors="replace")
-        return data, files
+        pending = getattr(handler, "pending_uploads", None)
+        return parse_multipart_stream(handler.rfile, length, content_type, pending)
 
     body = handler.rfile.read(length).decode("utf-8")
     parsed = urllib.parse.parse_qs(body)
@@ -3837,28 +4516,35 @@ def parse_post_data(handler: SimpleHTTPRequestHandler) -> tuple[dict[str, str],
     return data, {}
 
 
+def parse_id_list(data: dict[str, str]) -> list[str]:
+    raw = data.get("ids") or data.get("id", "")
+    return list(dict.fromkeys(value.strip() for value in raw.split(",") if value.strip()))
+
+
 def parse_lines(text: str) -> list[str]:
-    return [line.strip() for line in text.splitlines() if line.strip()]
+    if not text:
+        return []
+    return [line for line in map(str.strip, text.splitlines()) if line]
 
 
 def parse_pair_lines(text: str) -> list[tuple[str, str]]:
     pairs = []
     for line in parse_lines(text):
-        parts = [part.strip() for part in line.split("|")]
+        parts = line.split("|", 2)
         if len(parts) < 2:
             continue
-        pairs.append((parts[0], parts[1]))
+        pairs.append((parts[0].strip(), parts[1].strip()))
     return pairs
 
 
 def parse_sponsor_lines(text: str) -> list[dict]:
     sponsors = []
     for line in parse_lines(text):
-        parts = [part.strip() for part in line.split("|")]
+        parts = line.split("|", 3)
         if len(parts) < 2:
             continue
-        name, logo = parts[0], parts[1]
-        url = parts[2] if len(parts) > 2 else ""
+        name, logo = parts[0].strip(), parts[1].strip()
+        url = parts[2].strip() if len(parts) > 2 else ""
         if not name or not logo:
             continue
         sponsor = {"name": name, "logo": logo}
@@ -3868,25 +4554,20 @@ def parse_sponsor_lines(text: str) -> list[dict]:
     return sponsors
 
 
+PLAN_ITEM_TEXT_FIELDS = ("exercise", "sets", "reps", "weight", "rest", "notes")
+
+
 def parse_day_items(text: str) -> list[dict]:
+    # Solo se cortan y limpian las 6 primeras columnas; lo que sobre tras el sexto "|" se ignora.
     items = []
     for line in parse_lines(text):
-        parts = [part.strip() for part in line.split("|")]
-        while len(parts) < 6:
-            parts.append("")
-        exercise, sets, reps, weight, rest, notes = parts[:6]
-        if not exercise:
+        parts = line.split("|", 6)
+        item = dict(zip(PLAN_ITEM_TEXT_FIELDS, map(str.strip, parts)))
+        if not item["exercise"]:
             continue
-        items.append(
-            {
-                "exercise": exercise,
-                "sets": sets,
-                "reps": reps,
-                "weight": weight,
-                "rest": rest,
-                "notes": notes,
-            }
-        )
+        for field in PLAN_ITEM_TEXT_FIELDS[len(parts) :]:
+            item[field] = ""
+        items.append(item)
     return items
 
 
@@ -3921,14 +4602,95 @@ def parse_plan_items_from_form(data: dict[str, str], week_index: int, day_index:
     return items
 
 
-def send_email(
+def open_smtp_connection(
+    host: str,
+    port: int,
+    use_ssl: bool,
+    use_tls: bool,
+    username: str,
+    password: str,
+) -> smtplib.SMTP:
+    server = smtplib.SMTP_SSL(host, port, timeout=10) if use_ssl else smtplib.SMTP(host, port, timeout=10)
+    try:
+        server.ehlo()
+        if use_tls and not use_ssl:
+            server.starttls()
+            server.ehlo()
+        if username and password:
+            server.login(username, password)
+    except Exception:
+        close_smtp_connection(server)
+        raise
+    return server
+
+
+def close_smtp_connection(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+def smtp_password_digest(password: str) -> bytes:
+    return hashlib.sha256(password.encode("utf-8")).digest()
+
+
+def take_pooled_smtp(key: tuple, password: str) -> smtplib.SMTP | None:
+    # La conexión se saca del pool mientras se usa: dos hilos nunca comparten sesión SMTP.
+    with SMTP_POOL_LOCK:
+        entry = SMTP_POOL.pop(key, None)
+    if entry is None:
+        return None
+    server, used_at, password_digest = entry
+    if time.monotonic() - used_at > SMTP_IDLE_TTL or not secrets.compare_digest(
+        password_digest, smtp_password_digest(password)
+    ):
+        close_smtp_connection(server)
+        return None
+    try:
+        if server.noop()[0] == 250:
+            return server
+    except Exception:
+        pass
+    server.close()
+    return None
+
+
+def release_pooled_smtp(key: tuple, password: str, server: smtplib.SMTP) -> None:
+    with SMTP_POOL_LOCK:
+        stale = [entry[0] for entry in SMTP_POOL.values()]
+        SMTP_POOL.clear()
+        SMTP_POOL[key] = (server, time.monotonic(), smtp_password_digest(password))
+    for previous in stale:
+        close_smtp_connection(previous)
+    # Si no se vuelve a usar, la sesión se cierra al caducar en lugar de esperar al siguiente correo.
+    timer = threading.Timer(SMTP_IDLE_TTL, close_pooled_smtp, kwargs={"idle_only": True})
+    timer.daemon = True
+    timer.start()
+
+
+def close_pooled_smtp(idle_only: bool = False) -> None:
+    now = time.monotonic()
+    with SMTP_POOL_LOCK:
+        expired = [
+            key for key, entry in SMTP_POOL.items() if not idle_only or now - entry[1] >= SMTP_IDLE_TTL
+        ]
+        servers = [SMTP_POOL.pop(key)[0] for key in expired]
+    for server in servers:
+        close_smtp_connection(server)
+
+
+atexit.register(close_pooled_smtp)
+
+
+def build_email_message(
     smtp_settings: dict,
     to_email: str,
     subject: str,
     body: str,
     html_body: str | None = None,
     reply_to: str | None = None,
-) -> None:
+) -> EmailMessage:
     msg = EmailMessage()
     from_name = smtp_settings.get("from_name") or "AuraCalistenia"
     from_email = smtp_settings.get("username") or smtp_settings.get("admin_email") or ""
@@ -3940,6 +4702,18 @@ def send_email(
         msg.add_alternative(html_body, subtype="html")
     if reply_to:
         msg["Reply-To"] = reply_to
+    return msg
+
+
+def send_email(
+    smtp_settings: dict,
+    to_email: str,
+    subject: str,
+    body: str,
+    html_body: str | None = None,
+    reply_to: str | None = None,
+) -> None:
+    msg = build_email_message(smtp_settings, to_email, subject, body, html_body=html_body, reply_to=reply_to)
 
     host = str(smtp_settings.get("host", "")).strip()
     if not host:
@@ -3987,23 +4761,25 @@ def send_email(
     last_error: Exception | None = None
     last_attempt = (port, use_ssl, use_tls)
     for attempt_port, attempt_ssl, attempt_tls in attempts:
-        try:
-            last_attempt = (attempt_port, attempt_ssl, attempt_tls)
-            if attempt_ssl:
-                with smtplib.SMTP_SSL(host, attempt_port, timeout=10) as server:
-                    server.ehlo()
-                    if username and password:
-                        server.login(username, password)
-                    server.send_message(msg)
+        last_attempt = (attempt_port, attempt_ssl, attempt_tls)
+        pool_key = (host, attempt_port, attempt_ssl, attempt_tls, username)
+        server = take_pooled_smtp(pool_key, password)
+        if server is not None:
+            try:
+                server.send_message(msg)
+            except Exception:
+                close_smtp_connection(server)
+            else:
+                release_pooled_smtp(pool_key, password, server)
                 return
-            with smtplib.SMTP(host, attempt_port, timeout=10) as server:
-                server.ehlo()
-                if attempt_tls:
-                    server.starttls()
-                    server.ehlo()
-                if username and password:
-                    server.login(username, password)
+        try:
+            server = open_smtp_connection(host, attempt_port, attempt_ssl, attempt_tls, username, password)
+            try:
                 server.send_message(msg)
+            except Exception:
+                close_smtp_connection(server)
+                raise
+            release_pooled_smtp(pool_key, password, server)
             return
         except Exception as exc:
             last_error = exc
@@ -4163,33 +4939,31 @@ def notify_application_decision(
             "Si no recuerdas la contraseña, entra al portal y usa la opción de recuperar acceso.\n\n"
             "Un saludo,\nAura Calistenia"
         )
-        html_body = "\n".join(
-            [
-                "<html><body style=\"font-family:Arial,sans-serif;background:#f5f7fb;color:#1e2330;\">",
-                "<div style=\"max-width:640px;margin:24px auto;background:#ffffff;border:1px solid #e4e8f0;border-radius:14px;padding:24px;\">",
-                "<h2 style=\"margin:0 0 12px 0;color:#0d7e57;\">Solicitud aceptada</h2>",
-                f"<p style=\"margin:0 0 10px 0;\">Hola <strong>{html.escape(username)}</strong>,</p>",
-                "<p style=\"margin:0 0 12px 0;color:#2f3748;\">Tu solicitud ha sido <strong>aceptada</strong>. Ya puedes entrar al portal.</p>",
-                f"<p style=\"margin:0 0 16px 0;\"><a href=\"{portal_url_safe}\" style=\"display:inline-block;padding:10px 14px;background:#0d7e57;color:#fff;text-decoration:none;border-radius:10px;font-weight:700;\">Entrar al portal</a></p>",
-                "<div style=\"padding:14px;border:1px solid #e4e8f0;border-radius:12px;background:#fafbff;margin-bottom:14px;\">",
-                "<p style=\"margin:0 0 8px 0;color:#394056;\"><strong>Datos de acceso</strong></p>",
-                f"<p style=\"margin:0 0 6px 0;color:#5f677a;\">URL: <a href=\"{portal_url_safe}\">{portal_url_safe}</a></p>",
-                f"<p style=\"margin:0 0 6px 0;color:#5f677a;\">Usuario: <strong>{html.escape(username)}</strong></p>",
-                "<p style=\"margin:0;color:#5f677a;\">Contraseña: la que creaste al registrarte</p>",
-                "</div>",
-                "<div style=\"padding:14px;border:1px solid #e4e8f0;border-radius:12px;background:#ffffff;\">",
-                "<p style=\"margin:0 0 8px 0;color:#394056;\"><strong>Qué encontrarás dentro</strong></p>",
-                "<ol style=\"margin:0 0 0 18px;padding:0;color:#49506a;\">",
-                "<li style=\"margin-bottom:6px;\"><strong>Plan activo:</strong> skill, objetivo y nivel actual.</li>",
-                "<li style=\"margin-bottom:6px;\"><strong>Plan de entrenamiento:</strong> semanas y días con ejercicios y detalles.</li>",
-                "<li style=\"margin-bottom:6px;\"><strong>Estado de ejercicios:</strong> marca Hecho/Fallé y guarda notas.</li>",
-                "<li style=\"margin-bottom:6px;\"><strong>Resumen semanal:</strong> deja balance de la semana.</li>",
-                "<li><strong>Chat con tu profesor:</strong> dudas, ajustes y feedback.</li>",
-                "</ol>",
-                "</div>",
-                "<p style=\"margin:14px 0 0 0;color:#5f677a;\">Si olvidaste la contraseña, usa la opción de recuperación desde el propio portal.</p>",
-                "</div></body></html>",
-            ]
+        html_body = (
+            "<html><body style=\"font-family:Arial,sans-serif;background:#f5f7fb;color:#1e2330;\">\n"
+            "<div style=\"max-width:640px;margin:24px auto;background:#ffffff;border:1px solid #e4e8f0;border-radius:14px;padding:24px;\">\n"
+            "<h2 style=\"margin:0 0 12px 0;color:#0d7e57;\">Solicitud aceptada</h2>\n"
+            f"<p style=\"margin:0 0 10px 0;\">Hola <strong>{html.escape(username)}</strong>,</p>\n"
+            "<p style=\"margin:0 0 12px 0;color:#2f3748;\">Tu solicitud ha sido <strong>aceptada</strong>. Ya puedes entrar al portal.</p>\n"
+            f"<p style=\"margin:0 0 16px 0;\"><a href=\"{portal_url_safe}\" style=\"display:inline-block;padding:10px 14px;background:#0d7e57;color:#fff;text-decoration:none;border-radius:10px;font-weight:700;\">Entrar al portal</a></p>\n"
+            "<div style=\"padding:14px;border:1px solid #e4e8f0;border-radius:12px;background:#fafbff;margin-bottom:14px;\">\n"
+            "<p style=\"margin:0 0 8px 0;color:#394056;\"><strong>Datos de acceso</strong></p>\n"
+            f"<p style=\"margin:0 0 6px 0;color:#5f677a;\">URL: <a href=\"{portal_url_safe}\">{portal_url_safe}</a></p>\n"
+            f"<p style=\"margin:0 0 6px 0;color:#5f677a;\">Usuario: <strong>{html.escape(username)}</strong></p>\n"
+            "<p style=\"margin:0;color:#5f677a;\">Contraseña: la que creaste al registrarte</p>\n"
+            "</div>\n"
+            "<div style=\"padding:14px;border:1px solid #e4e8f0;border-radius:12px;background:#ffffff;\">\n"
+            "<p style=\"margin:0 0 8px 0;color:#394056;\"><strong>Qué encontrarás dentro</strong></p>\n"
+            "<ol style=\"margin:0 0 0 18px;padding:0;color:#49506a;\">\n"
+            "<li style=\"margin-bottom:6px;\"><strong>Plan activo:</strong> skill, objetivo y nivel actual.</li>\n"
+            "<li style=\"margin-bottom:6px;\"><strong>Plan de entrenamiento:</strong> semanas y días con ejercicios y detalles.</li>\n"
+            "<li style=\"margin-bottom:6px;\"><strong>Estado de ejercicios:</strong> marca Hecho/Fallé y guarda notas.</li>\n"
+            "<li style=\"margin-bottom:6px;\"><strong>Resumen semanal:</strong> deja balance de la semana.</li>\n"
+            "<li><strong>Chat con tu profesor:</strong> dudas, ajustes y feedback.</li>\n"
+            "</ol>\n"
+            "</div>\n"
+            "<p style=\"margin:14px 0 0 0;color:#5f677a;\">Si olvidaste la contraseña, usa la opción de recuperación desde el propio portal.</p>\n"
+            "</div></body></html>"
         )
     else:
         subject = "Estado de tu solicitud - Aura Calistenia"
@@ -4201,17 +4975,15 @@ def notify_application_decision(
             "Gracias por tu interés y comprensión.\n\n"
             "Un saludo,\nAura Calistenia"
         )
-        html_body = "\n".join(
-            [
-                "<html><body style=\"font-family:Arial,sans-serif;background:#f5f7fb;color:#1e2330;\">",
-                "<div style=\"max-width:640px;margin:24px auto;background:#ffffff;border:1px solid #e4e8f0;border-radius:14px;padding:24px;\">",
-                "<h2 style=\"margin:0 0 12px 0;color:#b35a3f;\">Solicitud no aceptada por ahora</h2>",
-                f"<p style=\"margin:0 0 10px 0;\">Hola <strong>{html.escape(username)}</strong>,</p>",
-                "<p style=\"margin:0 0 12px 0;color:#2f3748;\">Hemos revisado tu solicitud, pero en este momento no podemos aceptarla.</p>",
-                "<p style=\"margin:0 0 12px 0;color:#5f677a;\">Lo sentimos: ahora mismo no hay plazas disponibles. Tu solicitud se conservará para volver a estudiarla más adelante.</p>",
-                "<p style=\"margin:0;color:#5f677a;\">Gracias por tu interés y comprensión.</p>",
-                "</div></body></html>",
-            ]
+        html_body = (
+            "<html><body style=\"font-family:Arial,sans-serif;background:#f5f7fb;color:#1e2330;\">\n"
+            "<div style=\"max-width:640px;margin:24px auto;background:#ffffff;border:1px solid #e4e8f0;border-radius:14px;padding:24px;\">\n"
+            "<h2 style=\"margin:0 0 12px 0;color:#b35a3f;\">Solicitud no aceptada por ahora</h2>\n"
+            f"<p style=\"margin:0 0 10px 0;\">Hola <strong>{html.escape(username)}</strong>,</p>\n"
+            "<p style=\"margin:0 0 12px 0;color:#2f3748;\">Hemos revisado tu solicitud, pero en este momento no podemos aceptarla.</p>\n"
+            "<p style=\"margin:0 0 12px 0;color:#5f677a;\">Lo sentimos: ahora mismo no hay plazas disponibles. Tu solicitud se conservará para volver a estudiarla más adelante.</p>\n"
+            "<p style=\"margin:0;color:#5f677a;\">Gracias por tu interés y comprensión.</p>\n"
+            "</div></body></html>"
         )
 
     try:
@@ -4265,17 +5037,15 @@ def notify_password_reset(username: str, email_value: str, reset_url: str, smtp_
         f"Enlace de restablecimiento: {reset_url}\n\n"
         f"Este enlace caduca en {ttl_minutes} minutos."
     )
-    html_body = "\n".join(
-        [
-            "<html><body style=\"font-family:Arial,sans-serif;background:#f5f7fb;color:#1e2330;\">",
-            "<div style=\"max-width:640px;margin:24px auto;background:#ffffff;border:1px solid #e4e8f0;border-radius:14px;padding:24px;\">",
-            "<h2 style=\"margin:0 0 12px 0;color:#b08b4a;\">Restablecer contraseña</h2>",
-            f"<p style=\"margin:0 0 8px 0;\">Hola <strong>{html.escape(username)}</strong>,</p>",
-            "<p style=\"margin:0 0 14px 0;color:#5f677a;\">Pulsa en el botón para crear una contraseña nueva.</p>",
-            f"<p style=\"margin:0 0 14px 0;\"><a href=\"{html.escape(reset_url)}\" style=\"display:inline-block;padding:12px 18px;background:#0d7e57;color:#fff;text-decoration:none;border-radius:10px;\">Restablecer contraseña</a></p>",
-            f"<p style=\"margin:0;color:#5f677a;\">Este enlace caduca en {ttl_minutes} minutos. Si no lo solicitaste, ignora este correo.</p>",
-            "</div></body></html>",
-        ]
+    html_body = (
+        "<html><body style=\"font-family:Arial,sans-serif;background:#f5f7fb;color:#1e2330;\">\n"
+        "<div style=\"max-width:640px;margin:24px auto;background:#ffffff;border:1px solid #e4e8f0;border-radius:14px;padding:24px;\">\n"
+        "<h2 style=\"margin:0 0 12px 0;color:#b08b4a;\">Restablecer contraseña</h2>\n"
+        f"<p style=\"margin:0 0 8px 0;\">Hola <strong>{html.escape(username)}</strong>,</p>\n"
+        "<p style=\"margin:0 0 14px 0;color:#5f677a;\">Pulsa en el botón para crear una contraseña nueva.</p>\n"
+        f"<p style=\"margin:0 0 14px 0;\"><a href=\"{html.escape(reset_url)}\" style=\"display:inline-block;padding:12px 18px;background:#0d7e57;color:#fff;text-decoration:none;border-radius:10px;\">Restablecer contraseña</a></p>\n"
+        f"<p style=\"margin:0;color:#5f677a;\">Este enlace caduca en {ttl_minutes} minutos. Si no lo solicitaste, ignora este correo.</p>\n"
+        "</div></body></html>"
     )
     try:
         send_email(smtp_settings, email_value, subject, body, html_body=html_body)
@@ -4313,21 +5083,35 @@ def handle_file_upload(field: UploadedFile) -> tuple[str, str] | None:
         return None
     original = Path(field.filename).name
     ext = Path(original).suffix.lower()
-    if ext not in ALLOWED_VIDEO_EXT and ext not in ALLOWED_IMAGE_EXT:
+    if ext not in ALLOWED_MEDIA_EXT or field.oversized:
         return None
-    safe_name = f"{int(time.time())}_{secrets.token_hex(4)}{ext}"
+    safe_name = f"{int(time.time())}_{random_hex_id(4)}{ext}"
     dest = UPLOAD_DIR / safe_name
 
-    with dest.open("wb") as handle:
-        field.file.seek(0)
-        shutil.copyfileobj(field.file, handle)
-
-    if dest.stat().st_size > MAX_UPLOAD_BYTES:
-        dest.unlink(missing_ok=True)
+    # El parser ya escribio el fichero en UPLOAD_DIR (y corto los que pasan de MAX_UPLOAD_BYTES): basta renombrarlo.
+    field.file.close()
+    try:
+        os.chmod(field.file.name, 0o644)
+        os.replace(field.file.name, dest)
+    except OSError:
         return None
     return safe_name, ext
 
 
+def discard_uploaded_file(upload: UploadedFile) -> None:
+    try:
+        upload.file.close()
+    except Exception:
+        pass
+    Path(upload.file.name).unlink(missing_ok=True)
+
+
+def close_uploaded_files(uploads: list[UploadedFile]) -> None:
+    for upload in uploads:
+        discard_uploaded_file(upload)
+    uploads.clear()
+
+
 def move_item_by_id(items: list[dict], item_id: str, direction: str) -> tuple[list[dict], bool]:
     index = -1
     for idx, item in enumerate(items):
@@ -4346,10 +5130,56 @@ def move_item_by_id(items: list[dict], item_id: str, direction: str) -> tuple[li
 
 
 class AuraHandler(SimpleHTTPRequestHandler):
+    # Rutas fijas: una busqueda en diccionario por peticion en lugar de una cadena de comparaciones.
+    GET_REDIRECTS = {
+        "/admin.html": "/admin",
+        "/portal.html": "/portal",
+        "/legal": "/legal.html",
+    }
+    POST_PUBLIC_ROUTES = {
+        "/apply": "handle_apply",
+        "/admin/login": "handle_admin_login",
+        "/admin/logout": "handle_admin_logout",
+        "/login": "handle_login",
+        "/logout": "handle_user_logout",
+        "/password/forgot": "handle_password_forgot",
+        "/password/reset": "handle_password_reset",
+        "/admin/applications/review/confirm": "handle_application_review_confirm",
+        "/user/submissions/add": "handle_submission_add",
+        "/portal/day/update": "handle_day_update",
+        "/portal/item/update": "handle_item_update",
+        "/portal/week/update": "handle_week_update",
+        "/portal/chat/send": "handle_portal_chat_send",
+    }
+    POST_ADMIN_ROUTES = {
+        "/admin/events/add": "handle_event_add",
+        "/admin/events/update": "handle_event_update",
+        "/admin/events/move": "handle_event_move",
+        "/admin/events/delete": "handle_event_delete",
+        "/admin/videos/add": "handle_video_add",
+        "/admin/videos/update": "handle_video_update",
+        "/admin/videos/move": "handle_video_move",
+        "/admin/videos/delete": "handle_video_delete",
+        "/admin/plan/update": "handle_plan_update",
+        "/admin/content": "handle_content_update",
+        "/admin/smtp/test": "handle_smtp_test",
+        "/admin/clients/add": "handle_client_add",
+        "/admin/clients/duplicate": "handle_client_duplicate",
+        "/admin/applications/approve": "handle_application_approve",
+        "/admin/applications/delete": "handle_application_delete",
+        "/admin/submissions/comment": "handle_submission_comment",
+        "/admin/submissions/delete": "handle_submission_delete",
+        "/admin/chat/send": "handle_admin_chat_send",
+    }
+
+    pending_body = b""
+    defer_file_body = False
+    deferred_file: IO[bytes] | None = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(BASE_DIR), **kwargs)
 
-    def end_headers(self) -> None:
+    def cache_control_value(self) -> str | None:
         path = urllib.parse.urlparse(self.path).path.lower()
         static_ext = (
             ".css",
@@ -4368,11 +5198,39 @@ class AuraHandler(SimpleHTTPRequestHandler):
             ".woff2",
         )
         if path.startswith("/uploads/") or path.endswith(static_ext):
-            self.send_header("Cache-Control", "public, max-age=604800, immutable")
-        elif path in {"/", "/admin", "/admin/", "/portal", "/portal/", "/password/reset"} or path.endswith(".html"):
-            self.send_header("Cache-Control", "no-store")
+            return "public, max-age=604800, immutable"
+        if path in {"/", "/admin", "/admin/", "/portal", "/portal/", "/password/reset"} or path.endswith(".html"):
+            return "no-store"
+        return None
+
+    def end_headers(self) -> None:
+        cache_control = self.cache_control_value()
+        if cache_control:
+            self.send_header("Cache-Control", cache_control)
         super().end_headers()
 
+    def flush_headers(self) -> None:
+        body = self.pending_body
+        if body and hasattr(self, "_headers_buffer"):
+            self.pending_body = b""
+            self._headers_buffer.append(body)
+        super().flush_headers()
+
+    def copyfile(self, source, outputfile) -> None:
+        if self.defer_file_body and not isinstance(source, BytesIO):
+            # Adaptador WSGI: el fichero estatico se entrega al servidor en lugar de copiarse a memoria.
+            self.deferred_file = os.fdopen(os.dup(source.fileno()), "rb")
+            return
+        super().copyfile(source, outputfile)
+
+    def end_headers_with_body(self, payload: bytes) -> None:
+        # Cabeceras y cuerpo salen en una sola escritura al socket en lugar de dos.
+        self.pending_body = payload
+        self.end_headers()
+        if self.pending_body:
+            self.pending_body = b""
+            self.wfile.write(payload)
+
     def send_html(
         self,
         content: str,
@@ -4383,11 +5241,28 @@ class AuraHandler(SimpleHTTPRequestHandler):
         self.send_response(status)
         self.send_header("Content-Type", "text/html; charset=utf-8")
         self.send_header("Content-Length", str(len(encoded)))
+        if extra_headers:
+            for header_name, header_value in extra_headers:
+                self.send_header(header_name, header_value)
+        self.end_headers_with_body(encoded)
+
+    def send_template(
+        self,
+        template_path: Path,
+        replacements: dict[str, str | Iterable[str]],
+        status: int = HTTPStatus.OK,
+        extra_headers: list[tuple[str, str]] | None = None,
+    ) -> None:
+        # Sin Content-Length: el cuerpo se escribe por fragmentos y termina al cerrar la conexion.
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Connection", "close")
         if extra_headers:
             for header_name, header_value in extra_headers:
                 self.send_header(header_name, header_value)
         self.end_headers()
-        self.wfile.write(encoded)
+        self.close_connection = True
+        render_template_stream(template_path, replacements, self.wfile)
 
     def send_bytes(self, payload: bytes, content_type: str, filename: str | None = None) -> None:
         self.send_response(HTTPStatus.OK)
@@ -4395,13 +5270,23 @@ class AuraHandler(SimpleHTTPRequestHandler):
         self.send_header("Content-Length", str(len(payload)))
         if filename:
             self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
-        self.end_headers()
-        self.wfile.write(payload)
+        self.end_headers_with_body(payload)
 
     def redirect(self, location: str) -> None:
-        self.send_response(HTTPStatus.SEE_OTHER)
-        self.send_header("Location", location)
-        self.end_headers()
+        # La 303 se compone entera y sale en una escritura, sin pasar por send_response/send_header.
+        # Misma Cache-Control que pondria end_headers para esta ruta.
+        self.log_request(HTTPStatus.SEE_OTHER)
+        cache_control = self.cache_control_value()
+        cache_line = f"Cache-Control: {cache_control}\r\n" if cache_control else ""
+        self.wfile.write(
+            (
+                f"{self.protocol_version} 303 See Other\r\n"
+                f"Server: {self.version_string()}\r\n"
+                f"Date: {self.date_time_string()}\r\n"
+                f"Location: {location}\r\n"
+                f"{cache_line}\r\n"
+            ).encode("latin-1", "strict")
+        )
 
     def admin_redirect(self, status: str) -> None:
         referer = self.headers.get("Referer", "")
@@ -4413,18 +5298,21 @@ class AuraHandler(SimpleHTTPRequestHandler):
                 ref_query = {}
             target_query = {"status": status}
             for key in ("admin_section", "plan_user"):
-                value = str((ref_query.get(key) or [""])[0]).strip()
+                value = first_query_value(ref_query, key).strip()
                 if value:
                     target_query[key] = value
             self.redirect(f"/admin?{urllib.parse.urlencode(target_query)}")
         else:
             self.redirect(f"/?admin_status={status}#acceso")
 
-    def redirect_user_access(self, status: str) -> None:
+    def user_access_location(self, status: str) -> str:
         referer = self.headers.get("Referer", "")
-        target = "/portal" if "/portal" in referer else "/"
-        suffix = f"?access={status}" + ("" if target == "/portal" else "#acceso")
-        self.redirect(f"{target}{suffix}")
+        if "/portal" in referer:
+            return f"/portal?access={status}"
+        return f"/?access={status}#acceso"
+
+    def redirect_user_access(self, status: str) -> None:
+        self.redirect(self.user_access_location(status))
 
     def get_public_base_url(self) -> str:
         forwarded = self.headers.get("Forwarded", "")
@@ -4445,7 +5333,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
         return f"{proto}://{host}"
 
     def apply_user_home_grace_ttl(self, cookie_header: str | None, query: dict[str, list[str]]) -> None:
-        from_portal = str((query.get("from") or [""])[0]).strip().lower() == "portal"
+        from_portal = first_query_value(query, "from").strip().lower() == "portal"
         referer = self.headers.get("Referer", "")
         if not from_portal and "/portal" not in referer:
             return
@@ -4484,8 +5372,8 @@ class AuraHandler(SimpleHTTPRequestHandler):
         ]
 
     def handle_application_review(self, query: dict[str, list[str]]) -> None:
-        token = (query.get("token") or [""])[0].strip()
-        decision = normalize_application_decision((query.get("decision") or [""])[0])
+        token = first_query_value(query, "token").strip()
+        decision = normalize_application_decision(first_query_value(query, "decision"))
         if not token or not decision:
             card = "\n".join(
                 [
@@ -4529,7 +5417,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
             return
 
         app_id = str(token_payload.get("app_id", "")).strip()
-        applications = load_applications()
+        applications = load_applications_snapshot()[0]
         target_app = None
         for app in applications:
             if str(app.get("id", "")).strip() == app_id:
@@ -4614,42 +5502,8 @@ class AuraHandler(SimpleHTTPRequestHandler):
             card = "\n".join(
                 [
                     '<div class="admin-login glass-card">',
-                    "  <h2>Solicitud ya revisada</h2>",
-                    "  <p>Esta acción ya fue confirmada anteriormente.</p>",
-                    '  <a class="btn glass primary" href="/admin">Ir al panel admin</a>',
-                    "</div>",
-                ]
-            )
-            self.send_html(render_review_page(card))
-            return
-
-        app_id = str(token_payload.get("app_id", "")).strip()
-        applications = load_applications()
-        target_app = None
-        if decision == "approved":
-            for app in applications:
-                if str(app.get("id", "")).strip() != app_id:
-                    continue
-                app["approved"] = True
-                target_app = app
-                break
-        else:
-            remaining = []
-            for app in applications:
-                if str(app.get("id", "")).strip() == app_id and target_app is None:
-                    target_app = app
-                    continue
-                remaining.append(app)
-            applications = remaining
-
-        mark_application_review_token_used(token, decision)
-
-        if not target_app:
-            card = "\n".join(
-                [
-                    '<div class="admin-login glass-card">',
-                    "  <h2>Solicitud no disponible</h2>",
-                    "  <p>La solicitud ya no existe o fue procesada desde otro lugar.</p>",
+                    "  <h2>Solicitud ya revisada</h2>",
+                    "  <p>Esta acción ya fue confirmada anteriormente.</p>",
                     '  <a class="btn glass primary" href="/admin">Ir al panel admin</a>',
                     "</div>",
                 ]
@@ -4657,7 +5511,39 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.send_html(render_review_page(card))
             return
 
-        save_json(APPLICATIONS_PATH, applications)
+        app_id = str(token_payload.get("app_id", "")).strip()
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            target_app = None
+            if decision == "approved":
+                for app in applications:
+                    if str(app.get("id", "")).strip() != app_id:
+                        continue
+                    app["approved"] = True
+                    target_app = app
+                    break
+            else:
+                for index, app in enumerate(applications):
+                    if str(app.get("id", "")).strip() == app_id:
+                        target_app = applications.pop(index)
+                        break
+
+            mark_application_review_token_used(token, decision)
+
+            if not target_app:
+                card = "\n".join(
+                    [
+                        '<div class="admin-login glass-card">',
+                        "  <h2>Solicitud no disponible</h2>",
+                        "  <p>La solicitud ya no existe o fue procesada desde otro lugar.</p>",
+                        '  <a class="btn glass primary" href="/admin">Ir al panel admin</a>',
+                        "</div>",
+                    ]
+                )
+                self.send_html(render_review_page(card))
+                return
+
+            save_json(APPLICATIONS_PATH, applications)
         smtp_settings = load_smtp_settings()
         queued = notify_application_decision_async(
             target_app,
@@ -4691,6 +5577,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
             ("videos.json", VIDEOS_PATH),
             ("applications.json", APPLICATIONS_PATH),
             ("submissions.json", SUBMISSIONS_PATH),
+            ("submission_comments.json", SUBMISSION_COMMENTS_PATH),
             ("chats.json", CHATS_PATH),
             ("sessions.json", SESSIONS_PATH),
             ("settings.json", SETTINGS_PATH),
@@ -4704,6 +5591,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
                 "videos.json": [],
                 "applications.json": [],
                 "submissions.json": [],
+                "submission_comments.json": {},
                 "chats.json": [],
                 "sessions.json": {},
                 "settings.json": {},
@@ -4712,25 +5600,22 @@ class AuraHandler(SimpleHTTPRequestHandler):
                 "application_review_tokens.json": {},
             }
             for archive_name, source_path in files:
-                payload = load_json(source_path, defaults.get(archive_name, {}))
-                bundle.writestr(
-                    archive_name,
-                    json.dumps(payload, indent=2, ensure_ascii=True),
-                )
+                payload = load_json_entry(source_path, defaults.get(archive_name, {}))[1]
+                bundle.writestr(archive_name, encode_json_file(payload))
         payload = memory.getvalue()
         self.send_bytes(payload, "application/zip", f"aura-backup-{timestamp}.zip")
 
     def do_GET(self) -> None:
         parsed = urllib.parse.urlparse(self.path)
         path = parsed.path
-        query = urllib.parse.parse_qs(parsed.query)
+        query = urllib.parse.parse_qs(parsed.query) if parsed.query else {}
         cookie_header = self.headers.get("Cookie")
 
         if path in {"/", "/index.html"}:
             self.apply_user_home_grace_ttl(cookie_header, query)
-            page = render_index(query, cookie_header)
+            replacements = build_index_replacements(query, cookie_header)
             visit_headers = self.record_public_visit(cookie_header)
-            self.send_html(page, extra_headers=visit_headers)
+            self.send_template(INDEX_TEMPLATE, replacements, extra_headers=visit_headers)
             return
 
         if path == "/admin/applications/review":
@@ -4740,27 +5625,20 @@ class AuraHandler(SimpleHTTPRequestHandler):
         if path == "/admin" or path == "/admin/":
             user = get_session_user(cookie_header, ADMIN_SESSION_COOKIE, "admin")
             if user:
-                self.send_html(render_admin_page(query))
+                self.send_template(ADMIN_TEMPLATE, build_admin_replacements(query))
             else:
-                access = (query.get("access") or [""])[0]
+                access = first_query_value(query, "access")
                 error = "Credenciales admin incorrectas." if access == "admin_error" else None
                 self.send_html(render_login_page(error))
             return
 
-        if path == "/admin.html":
-            self.redirect("/admin")
-            return
-
-        if path == "/portal.html":
-            self.redirect("/portal")
-            return
-
-        if path == "/legal":
-            self.redirect("/legal.html")
+        redirect_target = self.GET_REDIRECTS.get(path)
+        if redirect_target:
+            self.redirect(redirect_target)
             return
 
         if path == "/portal" or path == "/portal/":
-            self.send_html(render_portal_page(query, cookie_header))
+            self.send_template(PORTAL_TEMPLATE, build_portal_replacements(query, cookie_header))
             return
 
         if path == "/password/reset":
@@ -4781,60 +5659,33 @@ class AuraHandler(SimpleHTTPRequestHandler):
 
         super().do_GET()
 
-    def do_POST(self) -> None:
-        parsed = urllib.parse.urlparse(self.path)
-        path = parsed.path
-
-        if path == "/apply":
-            self.handle_apply()
-            return
-
-        if path == "/admin/login":
-            self.handle_admin_login()
-            return
-
-        if path == "/admin/logout":
-            self.handle_admin_logout()
-            return
-
-        if path == "/login":
-            self.handle_login()
-            return
-
-        if path == "/logout":
-            self.handle_user_logout()
-            return
-
-        if path == "/password/forgot":
-            self.handle_password_forgot()
-            return
-
-        if path == "/password/reset":
-            self.handle_password_reset()
-            return
-
-        if path == "/admin/applications/review/confirm":
-            self.handle_application_review_confirm()
-            return
-
-        if path == "/user/submissions/add":
-            self.handle_submission_add()
-            return
-
-        if path == "/portal/day/update":
-            self.handle_day_update()
-            return
-
-        if path == "/portal/item/update":
-            self.handle_item_update()
-            return
+    def request_body_too_large(self) -> bool:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            return False
+        if self.headers.get("Content-Type", "").startswith("multipart/form-data"):
+            return length > MAX_MULTIPART_BYTES
+        return length > MAX_FORM_BYTES
 
-        if path == "/portal/week/update":
-            self.handle_week_update()
+    def do_POST(self) -> None:
+        # Un cuerpo que pasa del tope se rechaza antes de leerlo; la conexion se cierra sin consumirlo.
+        if self.request_body_too_large():
+            self.close_connection = True
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
             return
+        # Los ficheros subidos se cierran aqui, una sola vez, al terminar la peticion.
+        self.pending_uploads: list[UploadedFile] = []
+        try:
+            self.dispatch_post()
+        finally:
+            close_uploaded_files(self.pending_uploads)
 
-        if path == "/portal/chat/send":
-            self.handle_portal_chat_send()
+    def dispatch_post(self) -> None:
+        path = urllib.parse.urlparse(self.path).path
+        handler_name = self.POST_PUBLIC_ROUTES.get(path)
+        if handler_name:
+            getattr(self, handler_name)()
             return
 
         admin_user = get_session_user(self.headers.get("Cookie"), ADMIN_SESSION_COOKIE, "admin")
@@ -4842,76 +5693,9 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.send_error(HTTPStatus.FORBIDDEN)
             return
 
-        if path == "/admin/events/add":
-            self.handle_event_add()
-            return
-
-        if path == "/admin/events/update":
-            self.handle_event_update()
-            return
-
-        if path == "/admin/events/move":
-            self.handle_event_move()
-            return
-
-        if path == "/admin/events/delete":
-            self.handle_event_delete()
-            return
-
-        if path == "/admin/videos/add":
-            self.handle_video_add()
-            return
-
-        if path == "/admin/videos/update":
-            self.handle_video_update()
-            return
-
-        if path == "/admin/videos/move":
-            self.handle_video_move()
-            return
-
-        if path == "/admin/videos/delete":
-            self.handle_video_delete()
-            return
-
-        if path == "/admin/plan/update":
-            self.handle_plan_update()
-            return
-
-        if path == "/admin/content":
-            self.handle_content_update()
-            return
-
-        if path == "/admin/smtp/test":
-            self.handle_smtp_test()
-            return
-
-        if path == "/admin/clients/add":
-            self.handle_client_add()
-            return
-
-        if path == "/admin/clients/duplicate":
-            self.handle_client_duplicate()
-            return
-
-        if path == "/admin/applications/approve":
-            self.handle_application_approve()
-            return
-
-        if path == "/admin/applications/delete":
-            self.handle_application_delete()
-            return
-
-        if path == "/admin/submissions/comment":
-            self.handle_submission_comment()
-            return
-
-        if path == "/admin/submissions/delete":
-            self.handle_submission_delete()
-            return
-
-        if path == "/admin/chat/send":
-            self.handle_admin_chat_send()
+        handler_name = self.POST_ADMIN_ROUTES.get(path)
+        if handler_name:
+            getattr(self, handler_name)()
             return
 
         self.send_error(HTTPStatus.NOT_FOUND)
@@ -4933,32 +5717,34 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.redirect("/?status=error&message=Email inválido")
             return
 
-        applications = load_applications()
-        for app in applications:
-            if app.get("username", "").lower() == username.lower():
+        salt, pw_hash = hash_password(password)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications, (usernames, emails) = load_applications_entry()
+            username_index = usernames.get(username.lower())
+            email_index = emails.get(email.lower())
+            if username_index is not None and (email_index is None or username_index <= email_index):
                 self.redirect("/?status=error&message=Usuario ya registrado")
                 return
-            if app.get("email", "").lower() == email.lower():
+            if email_index is not None:
                 self.redirect("/?status=error&message=Email ya registrado")
                 return
 
-        salt, pw_hash = hash_password(password)
-        application = {
-            "id": secrets.token_hex(6),
-            "username": username,
-            "email": email,
-            "skill": skill,
-            "level": level,
-            "goal": goal,
-            "concerns": concerns,
-            "salt": salt,
-            "hash": pw_hash,
-            "approved": False,
-            "plan": copy_default_plan(),
-            "created_at": int(time.time()),
-        }
-        applications.append(application)
-        save_json(APPLICATIONS_PATH, applications)
+            application = {
+                "id": random_hex_id(6),
+                "username": username,
+                "email": email,
+                "skill": skill,
+                "level": level,
+                "goal": goal,
+                "concerns": concerns,
+                "salt": salt,
+                "hash": pw_hash,
+                "approved": False,
+                "plan": copy_default_plan(),
+                "created_at": int(time.time()),
+            }
+            applications.append(application)
+            save_json(APPLICATIONS_PATH, applications)
 
         smtp_settings = load_smtp_settings()
         missing = smtp_missing_fields(smtp_settings)
@@ -5029,10 +5815,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
         username = data.get("username", "").strip()
         password = data.get("password", "").strip()
         if not username or not password:
-            referer = self.headers.get("Referer", "")
-            target = "/portal" if "/portal" in referer else "/"
-            suffix = "?access=user_missing" + ("" if target == "/portal" else "#acceso")
-            self.redirect(f"{target}{suffix}")
+            self.redirect_user_access("user_missing")
             return
 
         settings = enforce_admin_credentials()
@@ -5056,25 +5839,15 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.redirect("/admin?access=admin_error")
             return
 
-        applications = load_applications()
-        app = find_application(applications, username)
+        app = lookup_application(username)
         if not app:
-            referer = self.headers.get("Referer", "")
-            target = "/portal" if "/portal" in referer else "/"
-            suffix = "?access=user_error" + ("" if target == "/portal" else "#acceso")
-            self.redirect(f"{target}{suffix}")
+            self.redirect_user_access("user_error")
             return
         if not verify_password(password, app.get("salt", ""), app.get("hash", "")):
-            referer = self.headers.get("Referer", "")
-            target = "/portal" if "/portal" in referer else "/"
-            suffix = "?access=user_error" + ("" if target == "/portal" else "#acceso")
-            self.redirect(f"{target}{suffix}")
+            self.redirect_user_access("user_error")
             return
         if not app.get("approved"):
-            referer = self.headers.get("Referer", "")
-            target = "/portal" if "/portal" in referer else "/"
-            suffix = "?access=user_pending" + ("" if target == "/portal" else "#acceso")
-            self.redirect(f"{target}{suffix}")
+            self.redirect_user_access("user_pending")
             return
 
         cookie_header = self.headers.get("Cookie")
@@ -5099,10 +5872,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
             delete_session(token)
         self.send_response(HTTPStatus.SEE_OTHER)
         self.send_header("Set-Cookie", f"{USER_SESSION_COOKIE}=deleted; Path=/; Max-Age=0")
-        referer = self.headers.get("Referer", "")
-        target = "/portal" if "/portal" in referer else "/"
-        suffix = "?access=user_logout" + ("" if target == "/portal" else "#acceso")
-        self.send_header("Location", f"{target}{suffix}")
+        self.send_header("Location", self.user_access_location("user_logout"))
         self.end_headers()
 
     def handle_password_forgot(self) -> None:
@@ -5113,8 +5883,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.redirect_user_access("user_reset_missing")
             return
 
-        applications = load_applications()
-        app = find_application(applications, username)
+        app = lookup_application(username)
         if not app:
             self.redirect_user_access("user_reset_sent")
             return
@@ -5162,19 +5931,20 @@ class AuraHandler(SimpleHTTPRequestHandler):
 
         username = str(payload.get("username", "")).strip()
         email_value = str(payload.get("email", "")).strip().lower()
-        applications = load_applications()
-        app = find_application(applications, username)
-        if not app:
-            self.redirect("/password/reset?access=user_reset_invalid")
-            return
-        if str(app.get("email", "")).strip().lower() != email_value:
-            self.redirect("/password/reset?access=user_reset_invalid")
-            return
-
         salt, pw_hash = hash_password(password)
-        app["salt"] = salt
-        app["hash"] = pw_hash
-        save_json(APPLICATIONS_PATH, applications)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            app = find_application(applications, username)
+            if not app:
+                self.redirect("/password/reset?access=user_reset_invalid")
+                return
+            if str(app.get("email", "")).strip().lower() != email_value:
+                self.redirect("/password/reset?access=user_reset_invalid")
+                return
+
+            app["salt"] = salt
+            app["hash"] = pw_hash
+            save_json(APPLICATIONS_PATH, applications)
         self.redirect("/portal?access=user_reset_done")
 
     def handle_event_add(self) -> None:
@@ -5191,7 +5961,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
         events = load_json(EVENTS_PATH, [])
         events.append(
             {
-                "id": f"evt_{secrets.token_hex(4)}",
+                "id": f"evt_{random_hex_id(4)}",
                 "date": date,
                 "location": location,
                 "title": title,
@@ -5274,7 +6044,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
         videos = load_json(VIDEOS_PATH, [])
         videos.append(
             {
-                "id": f"vid_{secrets.token_hex(4)}",
+                "id": f"vid_{random_hex_id(4)}",
                 "tag": tag,
                 "title": title,
                 "description": description,
@@ -5312,8 +6082,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
             current_file = str(video.get("file", "")).strip()
             if remove_file and current_file:
                 current_path = UPLOAD_DIR / current_file
-                if current_path.exists():
-                    current_path.unlink(missing_ok=True)
+                current_path.unlink(missing_ok=True)
                 video["file"] = ""
                 current_file = ""
             if "video_file" in files:
@@ -5322,8 +6091,7 @@ class AuraHandler(SimpleHTTPRequestHandler):
                     new_file, _ = upload
                     if current_file:
                         old_path = UPLOAD_DIR / current_file
-                        if old_path.exists():
-                            old_path.unlink(missing_ok=True)
+                        old_path.unlink(missing_ok=True)
                     video["file"] = new_file
             updated = True
             break
@@ -5352,70 +6120,44 @@ class AuraHandler(SimpleHTTPRequestHandler):
         data, _ = parse_post_data(self)
         video_id = data.get("id", "").strip()
         videos = load_json(VIDEOS_PATH, [])
-        remaining = []
-        for video in videos:
-            if video.get("id") == video_id:
-                file_name = video.get("file")
-                if file_name:
-                    file_path = UPLOAD_DIR / file_name
-                    if file_path.exists():
-                        file_path.unlink(missing_ok=True)
-                continue
-            remaining.append(video)
-        save_json(VIDEOS_PATH, remaining)
+        target = next((video for video in videos if video.get("id") == video_id), None)
+        if target is not None:
+            file_name = target.get("file")
+            if file_name:
+                file_path = UPLOAD_DIR / file_name
+                file_path.unlink(missing_ok=True)
+            save_json(VIDEOS_PATH, [video for video in videos if video.get("id") != video_id])
         self.admin_redirect("video_deleted")
 
     def handle_content_update(self) -> None:
         data, files = parse_post_data(self)
-        content = load_content()
+        content = clone_json_data(load_content())
+
+        for form_key, (section, field) in CONTENT_FORM_FIELDS.items():
+            content[section][field] = data.get(form_key, "").strip()
 
-        content["hero"]["eyebrow"] = data.get("hero_eyebrow", "").strip()
-        content["hero"]["title"] = data.get("hero_title", "").strip()
-        content["hero"]["subtitle"] = data.get("hero_subtitle", "").strip()
         stats_pairs = parse_pair_lines(data.get("hero_stats", ""))
         if stats_pairs:
             content["stats"] = [{"value": value, "label": label} for value, label in stats_pairs]
-
-        content["bio"]["eyebrow"] = data.get("bio_eyebrow", "").strip()
-        content["bio"]["name"] = data.get("bio_name", "").strip()
         paragraphs = parse_lines(data.get("bio_paragraphs", ""))
         if paragraphs:
             content["bio"]["paragraphs"] = paragraphs
-        content["bio"]["signature"] = data.get("bio_signature", "").strip()
-        content["bio"]["image"] = data.get("bio_image", "").strip()
-        content["bio"]["image_caption"] = data.get("bio_image_caption", "").strip()
-        if "bio_image_file" in files:
-            upload = handle_file_upload(files["bio_image_file"])
-            if upload:
-                stored_file, ext = upload
-                if ext in ALLOWED_IMAGE_EXT:
-                    content["bio"]["image"] = f"/uploads/{stored_file}"
-
-        content["program"]["title"] = data.get("program_title", "").strip()
-        content["program"]["lead"] = data.get("program_lead", "").strip()
-        content["program"]["highlight_title"] = data.get("program_highlight_title", "").strip()
-        content["program"]["highlight_text"] = data.get("program_highlight_text", "").strip()
         bullets = parse_lines(data.get("program_bullets", ""))
         if bullets:
             content["program"]["bullets"] = bullets
-        content["program"]["image"] = data.get("program_image", "").strip()
-        content["program"]["image_caption"] = data.get("program_image_caption", "").strip()
-        if "program_image_file" in files:
-            upload = handle_file_upload(files["program_image_file"])
-            if upload:
-                stored_file, ext = upload
-                if ext in ALLOWED_IMAGE_EXT:
-                    content["program"]["image"] = f"/uploads/{stored_file}"
-
-        content["contact"]["email"] = data.get("contact_email", "").strip()
-        content["contact"]["phone"] = data.get("contact_phone", "").strip()
-        content["contact"]["city"] = data.get("contact_city", "").strip()
-        content["contact"]["instagram"] = data.get("contact_instagram", "").strip()
-
         sponsor_entries = parse_sponsor_lines(data.get("sponsors", ""))
         if sponsor_entries:
             content["sponsors"] = sponsor_entries
 
+        for file_key, section in (("bio_image_file", "bio"), ("program_image_file", "program")):
+            if file_key not in files:
+                continue
+            upload = handle_file_upload(files[file_key])
+            if upload:
+                stored_file, ext = upload
+                if ext in ALLOWED_IMAGE_EXT:
+                    content[section]["image"] = f"/uploads/{stored_file}"
+
         save_json(CONTENT_PATH, content)
         self.admin_redirect("content_saved")
 
@@ -5448,28 +6190,29 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.admin_redirect("error")
             return
 
-        applications = load_applications()
-        if find_application(applications, username):
-            self.admin_redirect("client_exists")
-            return
-
         salt, pw_hash = hash_password(password)
-        application = {
-            "id": f"app_{secrets.token_hex(4)}",
-            "username": username,
-            "email": email,
-            "skill": skill,
-            "level": level,
-            "goal": goal,
-            "concerns": concerns,
-            "salt": salt,
-            "hash": pw_hash,
-            "approved": approved,
-            "plan": copy_default_plan(),
-            "created_at": int(time.time()),
-        }
-        applications.append(application)
-        save_json(APPLICATIONS_PATH, applications)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            if find_application(applications, username):
+                self.admin_redirect("client_exists")
+                return
+
+            application = {
+                "id": f"app_{random_hex_id(4)}",
+                "username": username,
+                "email": email,
+                "skill": skill,
+                "level": level,
+                "goal": goal,
+                "concerns": concerns,
+                "salt": salt,
+                "hash": pw_hash,
+                "approved": approved,
+                "plan": copy_default_plan(),
+                "created_at": int(time.time()),
+            }
+            applications.append(application)
+            save_json(APPLICATIONS_PATH, applications)
         status = "client_added"
         if approved:
             smtp_settings = load_smtp_settings()
@@ -5488,59 +6231,60 @@ class AuraHandler(SimpleHTTPRequestHandler):
         if not source_id:
             self.admin_redirect("error")
             return
-        applications = load_applications()
-        source = None
-        for app in applications:
-            if str(app.get("id", "")).strip() == source_id:
-                source = app
-                break
-        if not source:
-            self.admin_redirect("error")
-            return
-        base_username = str(source.get("username", "")).strip()
-        if not base_username:
-            self.admin_redirect("error")
-            return
-        existing_usernames = {str(app.get("username", "")).strip().lower() for app in applications}
-        duplicate_username = f"{base_username}_copy"
-        suffix = 2
-        while duplicate_username.lower() in existing_usernames:
-            duplicate_username = f"{base_username}_copy{suffix}"
-            suffix += 1
-        existing_emails = {str(app.get("email", "")).strip().lower() for app in applications}
-        duplicate_email = str(source.get("email", "")).strip()
-        if duplicate_email:
-            if "@" in duplicate_email:
-                local, domain = duplicate_email.split("@", 1)
-                counter = 1
-                candidate = f"{local}+copy@{domain}"
-                while candidate.lower() in existing_emails:
-                    counter += 1
-                    candidate = f"{local}+copy{counter}@{domain}"
-                duplicate_email = candidate
-            else:
-                counter = 1
-                candidate = f"{duplicate_email}.copy"
-                while candidate.lower() in existing_emails:
-                    counter += 1
-                    candidate = f"{duplicate_email}.copy{counter}"
-                duplicate_email = candidate
-        duplicated = {
-            "id": f"app_{secrets.token_hex(4)}",
-            "username": duplicate_username,
-            "email": duplicate_email,
-            "skill": source.get("skill", ""),
-            "level": source.get("level", ""),
-            "goal": source.get("goal", ""),
-            "concerns": source.get("concerns", ""),
-            "salt": source.get("salt", ""),
-            "hash": source.get("hash", ""),
-            "approved": bool(source.get("approved")),
-            "plan": normalize_plan(source.get("plan")),
-            "created_at": int(time.time()),
-        }
-        applications.append(duplicated)
-        save_json(APPLICATIONS_PATH, applications)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            source = None
+            for app in applications:
+                if str(app.get("id", "")).strip() == source_id:
+                    source = app
+                    break
+            if not source:
+                self.admin_redirect("error")
+                return
+            base_username = str(source.get("username", "")).strip()
+            if not base_username:
+                self.admin_redirect("error")
+                return
+            existing_usernames = {str(app.get("username", "")).strip().lower() for app in applications}
+            duplicate_username = f"{base_username}_copy"
+            suffix = 2
+            while duplicate_username.lower() in existing_usernames:
+                duplicate_username = f"{base_username}_copy{suffix}"
+                suffix += 1
+            existing_emails = {str(app.get("email", "")).strip().lower() for app in applications}
+            duplicate_email = str(source.get("email", "")).strip()
+            if duplicate_email:
+                if "@" in duplicate_email:
+                    local, domain = duplicate_email.split("@", 1)
+                    counter = 1
+                    candidate = f"{local}+copy@{domain}"
+                    while candidate.lower() in existing_emails:
+                        counter += 1
+                        candidate = f"{local}+copy{counter}@{domain}"
+                    duplicate_email = candidate
+                else:
+                    counter = 1
+                    candidate = f"{duplicate_email}.copy"
+                    while candidate.lower() in existing_emails:
+                        counter += 1
+                        candidate = f"{duplicate_email}.copy{counter}"
+                    duplicate_email = candidate
+            duplicated = {
+                "id": f"app_{random_hex_id(4)}",
+                "username": duplicate_username,
+                "email": duplicate_email,
+                "skill": source.get("skill", ""),
+                "level": source.get("level", ""),
+                "goal": source.get("goal", ""),
+                "concerns": source.get("concerns", ""),
+                "salt": source.get("salt", ""),
+                "hash": source.get("hash", ""),
+                "approved": bool(source.get("approved")),
+                "plan": normalize_plan(source.get("plan")),
+                "created_at": int(time.time()),
+            }
+            applications.append(duplicated)
+            save_json(APPLICATIONS_PATH, applications)
         self.admin_redirect("client_duplicated")
 
     def handle_plan_update(self) -> None:
@@ -5549,45 +6293,48 @@ class AuraHandler(SimpleHTTPRequestHandler):
         if not username:
             self.admin_redirect("error")
             return
-        applications = load_applications()
-        app = find_application(applications, username)
-        if not app:
-            self.admin_redirect("error")
-            return
-        plan = normalize_plan(app.get("plan"))
-        plan_title = data.get("plan_title", "").strip()
-        if plan_title:
-            plan["title"] = plan_title
-        for week_index in range(4):
-            week_title = data.get(f"week{week_index + 1}_title", "").strip()
-            if week_title:
-                plan["weeks"][week_index]["title"] = week_title
-            for day_index in range(7):
-                day_key = f"week{week_index + 1}_day{day_index + 1}"
-                day_title = data.get(f"{day_key}_title", "").strip()
-                rest_flag = f"{day_key}_rest" in data
-                day = plan["weeks"][week_index]["days"][day_index]
-                old_items = day.get("items", []) if isinstance(day.get("items"), list) else []
-                day_text_key = f"{day_key}_text"
-                if day_text_key in data:
-                    items = parse_day_items(data.get(day_text_key, ""))
-                else:
-                    items = parse_plan_items_from_form(data, week_index + 1, day_index + 1)
-                for item_pos, parsed_item in enumerate(items):
-                    if item_pos >= len(old_items):
-                        continue
-                    old_item = old_items[item_pos]
-                    if not isinstance(old_item, dict):
-                        continue
-                    parsed_item["status"] = str(old_item.get("status", "")).strip()
-                    parsed_item["status_note"] = str(old_item.get("status_note", "")).strip()
-                    parsed_item["student_note"] = str(old_item.get("student_note", "")).strip()
-                day["title"] = day_title
-                day["rest"] = rest_flag
-                day["items"] = [] if rest_flag else items
-        app["plan"] = plan
-        save_json(APPLICATIONS_PATH, applications)
-        plan_param = urllib.parse.quote(username)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            app = find_application(applications, username)
+            if not app:
+                self.admin_redirect("error")
+                return
+            plan = normalize_plan(app.get("plan"))
+            plan_title = data.get("plan_title", "").strip()
+            if plan_title:
+                plan["title"] = plan_title
+            for week_index in range(4):
+                week_title = data.get(f"week{week_index + 1}_title", "").strip()
+                if week_title:
+                    plan["weeks"][week_index]["title"] = week_title
+                for day_index in range(7):
+                    day_key = f"week{week_index + 1}_day{day_index + 1}"
+                    day_title = data.get(f"{day_key}_title", "").strip()
+                    rest_flag = f"{day_key}_rest" in data
+                    day = plan["weeks"][week_index]["days"][day_index]
+                    old_items = day.get("items", []) if isinstance(day.get("items"), list) else []
+                    day_text_key = f"{day_key}_text"
+                    if day_text_key in data:
+                        items = parse_day_items(data.get(day_text_key, ""))
+                    else:
+                        items = parse_plan_items_from_form(data, week_index + 1, day_index + 1)
+                    for item_pos, parsed_item in enumerate(items):
+                        if item_pos >= len(old_items):
+                            continue
+                        old_item = old_items[item_pos]
+                        if not isinstance(old_item, dict):
+                            continue
+                        parsed_item["status"] = str(old_item.get("status", "")).strip()
+                        parsed_item["status_note"] = str(old_item.get("status_note", "")).strip()
+                        parsed_item["student_note"] = str(old_item.get("student_note", "")).strip()
+                    day["title"] = day_title
+                    day["rest"] = rest_flag
+                    day["items"] = [] if rest_flag else items
+            # Reenviar el formulario sin cambios no reescribe todo applications.json.
+            if plan != app.get("plan"):
+                app["plan"] = plan
+                save_json(APPLICATIONS_PATH, applications)
+        plan_param = quote_username(username)
         self.redirect(
             f"/admin?admin_section=portal&status=plan_saved&plan_user={plan_param}#plan"
         )
@@ -5612,21 +6359,22 @@ class AuraHandler(SimpleHTTPRequestHandler):
         status_note = data.get("status_note", "").strip()
         feedback = data.get("feedback", "").strip()
 
-        applications = load_applications()
-        app = find_application(applications, portal_user)
-        if not app:
-            self.redirect("/portal")
-            return
-        plan = normalize_plan(app.get("plan"))
-        day = plan["weeks"][week_index]["days"][day_index]
-        if status in {"done", "partial", "missed"}:
-            day["status"] = status
-        if "status_note" in data:
-            day["status_note"] = status_note
-        if "feedback" in data:
-            day["feedback"] = feedback
-        app["plan"] = plan
-        save_json(APPLICATIONS_PATH, applications)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            app = find_application(applications, portal_user)
+            if not app:
+                self.redirect("/portal")
+                return
+            plan = normalize_plan(app.get("plan"))
+            day = plan["weeks"][week_index]["days"][day_index]
+            if status in {"done", "partial", "missed"}:
+                day["status"] = status
+            if "status_note" in data:
+                day["status_note"] = status_note
+            if "feedback" in data:
+                day["feedback"] = feedback
+            app["plan"] = plan
+            save_json(APPLICATIONS_PATH, applications)
         self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
 
     def handle_item_update(self) -> None:
@@ -5650,27 +6398,28 @@ class AuraHandler(SimpleHTTPRequestHandler):
         status_note = data.get("status_note", "").strip()
         student_note = data.get("student_note", "").strip()
 
-        applications = load_applications()
-        app = find_application(applications, portal_user)
-        if not app:
-            self.redirect("/portal")
-            return
-        plan = normalize_plan(app.get("plan"))
-        day = plan["weeks"][week_index]["days"][day_index]
-        items = day.get("items", [])
-        if item_index >= len(items):
-            self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
-            return
-        item = items[item_index]
-        if not isinstance(item, dict):
-            self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
-            return
-        if status in {"done", "missed"}:
-            item["status"] = status
-        item["status_note"] = status_note
-        item["student_note"] = student_note
-        app["plan"] = plan
-        save_json(APPLICATIONS_PATH, applications)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            app = find_application(applications, portal_user)
+            if not app:
+                self.redirect("/portal")
+                return
+            plan = normalize_plan(app.get("plan"))
+            day = plan["weeks"][week_index]["days"][day_index]
+            items = day.get("items", [])
+            if item_index >= len(items):
+                self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
+                return
+            item = items[item_index]
+            if not isinstance(item, dict):
+                self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
+                return
+            if status in {"done", "missed"}:
+                item["status"] = status
+            item["status_note"] = status_note
+            item["student_note"] = student_note
+            app["plan"] = plan
+            save_json(APPLICATIONS_PATH, applications)
         self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
 
     def handle_week_update(self) -> None:
@@ -5689,15 +6438,16 @@ class AuraHandler(SimpleHTTPRequestHandler):
             self.redirect("/portal")
             return
         summary = data.get("summary", "").strip()
-        applications = load_applications()
-        app = find_application(applications, portal_user)
-        if not app:
-            self.redirect("/portal")
-            return
-        plan = normalize_plan(app.get("plan"))
-        plan["weeks"][week_index]["summary"] = summary
-        app["plan"] = plan
-        save_json(APPLICATIONS_PATH, applications)
+        with json_path_lock(APPLICATIONS_PATH):
+            applications = load_applications()
+            app = find_application(applications, portal_user)
+            if not app:
+                self.redirect("/portal")
+                return
+            plan = normalize_plan(app.get("plan"))
+            plan["weeks"][week_index]["summary"] = summary
+            app["plan"] = plan
+            save_json(APPLICATIONS_PATH, applications)
         self.redirect(f"/portal?week={week_index + 1}#week{week_index + 1}")
 
     def handle_portal_chat_send(self) -> None:
@@ -5711,19 +6461,16 @@ class AuraHandler(SimpleHTTPRequestHandler):
         if not text:
             self.redirect("/portal")
             return
-        chats = load_json(CHATS_PATH, [])
-        if not isinstance(chats, list):
-            chats = []
-        chats.append(
+        append_json_record(
+            CHATS_PATH,
             {
-                "id": f"chat_{secrets.token_hex(4)}",
+                "id": f"chat_{random_hex_id(4)}",
                 "username": portal_user,
                 "author": "user",
                 "text": text,
                 "created_at": int(time.time()),
-            }
+            },
         )
-        save_json(CHATS_PATH, chats)
         self.redirect("/portal")
 
     def handle_admin_chat_send(self) -> None:
@@ -5733,25 +6480,21 @@ class AuraHandler(SimpleHTTPRequestHandler):
         if not username or not text:
             self.admin_redirect("error")
             return
-        applications = load_applications()
-        app = find_application(applications, username)
+        app = lookup_application(username)
         if not app:
             self.admin_redirect("error")
             return
-        chats = load_json(CHATS_PATH, [])
-        if not isinstance(chats, list):
-            chats = []
-        chats.append(
+        append_json_record(
+            CHATS_PATH,
             {
-                "id": f"chat_{secrets.token_hex(4)}",
+                "id": f"chat_{random_hex_id(4)}",
                 "username": app.get("username", username),
                 "author": "coach",
                 "text": text,
                 "created_at": int(time.time()),
-            }
+            },
         )
-        save_json(CHATS_PATH, chats)
-        plan_param = urllib.parse.quote(app.get("username", username))
+        plan_param = quote_username(app.get("username", username))
         self.redirect(f"/admin?admin_section=portal&plan_user={plan_param}#plan")
 
     def handle_submission_add(self) -> None:
@@ -5764,89 +6507,205 @@ class AuraHandler(SimpleHTTPRequestHandler):
         if not sub_id or not comment:
             self.admin_redirect("error")
             return
-        submissions = load_submissions()
-        updated = False
-        for sub in submissions:
-            if sub.get("id") == sub_id:
-                sub.setdefault("comments", []).append(
-                    {"text": comment, "created_at": int(time.time())}
-                )
-                updated = True
-                break
-        if updated:
-            save_json(SUBMISSIONS_PATH, submissions)
-            self.admin_redirect("comment_added")
-        else:
+        if sub_id not in load_submissions_snapshot()[1]:
             self.admin_redirect("error")
+            return
+        # Solo se reescribe el fichero de comentarios; submissions.json no cambia.
+        with mutate_json(SUBMISSION_COMMENTS_PATH, {}, loader=load_submission_comments) as comments:
+            comments.setdefault(sub_id, []).append(
+                {"text": comment, "created_at": int(time.time())}
+            )
+        self.admin_redirect("comment_added")
 
     def handle_submission_delete(self) -> None:
         data, _ = parse_post_data(self)
         sub_id = data.get("id", "").strip()
-        submissions = load_submissions()
-        remaining = []
-        for sub in submissions:
-            if sub.get("id") == sub_id:
-                file_name = sub.get("file")
-                if file_name:
-                    file_path = UPLOAD_DIR / file_name
-                    if file_path.exists():
-                        file_path.unlink(missing_ok=True)
-                continue
-            remaining.append(sub)
-        save_json(SUBMISSIONS_PATH, remaining)
+        if not sub_id:
+            self.admin_redirect("error")
+            return
+        with json_path_lock(SUBMISSIONS_PATH):
+            sub = load_submissions_snapshot()[1].get(sub_id)
+            if sub is not None:
+                # Se guarda la lista tal cual estaba en disco, sin los campos anadidos al normalizar.
+                # El id se compara igual que al normalizar: sin clave cuenta como "".
+                raw_submissions = load_json_entry(SUBMISSIONS_PATH, [])[1]
+                save_json(
+                    SUBMISSIONS_PATH,
+                    [
+                        item
+                        for item in raw_submissions
+                        if not isinstance(item, dict) or item.get("id", "") != sub["id"]
+                    ],
+                )
+        if sub is not None:
+            file_name = sub["file"]
+            if file_name:
+                file_path = UPLOAD_DIR / file_name
+                file_path.unlink(missing_ok=True)
+            with json_path_lock(SUBMISSION_COMMENTS_PATH):
+                comments = load_submission_comments()
+                if comments.pop(sub_id, None) is not None:
+                    save_json(SUBMISSION_COMMENTS_PATH, comments)
         self.admin_redirect("submission_deleted")
 
     def handle_application_approve(self) -> None:
         data, _ = parse_post_data(self)
-        app_id = data.get("id", "").strip()
-        applications = load_applications()
-        updated = False
-        target_app = None
-        for app in applications:
-            if app.get("id") == app_id:
+        app_ids = set(parse_id_list(data))
+        if not app_ids:
+            self.admin_redirect("error")
+            return
+        with mutate_json(APPLICATIONS_PATH, [], loader=load_applications) as applications:
+            targets = [app for app in applications if app.get("id") in app_ids]
+            if not targets:
+                raise SkipJsonSave
+            for app in targets:
                 app["approved"] = True
-                updated = True
-                target_app = app
-                break
-        if updated:
-            save_json(APPLICATIONS_PATH, applications)
-            smtp_settings = load_smtp_settings()
+        if not targets:
+            self.admin_redirect("error")
+            return
+        smtp_settings = load_smtp_settings()
+        public_base_url = self.get_public_base_url()
+        queued = True
+        for app in targets:
             queued = notify_application_decision_async(
-                target_app or {},
+                app,
                 "approved",
                 smtp_settings,
-                public_base_url=self.get_public_base_url(),
-            )
-            self.admin_redirect("app_approved_mail_queued" if queued else "app_approved_mail_fail")
-        else:
-            self.admin_redirect("error")
+                public_base_url=public_base_url,
+            ) and queued
+        self.admin_redirect("app_approved_mail_queued" if queued else "app_approved_mail_fail")
 
     def handle_application_delete(self) -> None:
         data, _ = parse_post_data(self)
-        app_id = data.get("id", "").strip()
-        applications = load_applications()
-        target_app = None
-        remaining = []
-        for app in applications:
-            if app.get("id") == app_id and target_app is None:
-                target_app = app
-                continue
-            remaining.append(app)
-        if not target_app:
+        pending_ids = set(parse_id_list(data))
+        if not pending_ids:
+            self.admin_redirect("error")
+            return
+        removed = []
+        with mutate_json(APPLICATIONS_PATH, [], loader=load_applications) as applications:
+            remaining = []
+            for app in applications:
+                app_id = app.get("id")
+                if app_id in pending_ids:
+                    pending_ids.discard(app_id)
+                    removed.append(app)
+                    continue
+                remaining.append(app)
+            if not removed:
+                raise SkipJsonSave
+            applications[:] = remaining
+        if not removed:
             self.admin_redirect("error")
             return
-        applications = remaining
-        save_json(APPLICATIONS_PATH, applications)
         smtp_settings = load_smtp_settings()
-        queued = notify_application_decision_async(
-            target_app,
-            "rejected",
-            smtp_settings,
-            public_base_url=self.get_public_base_url(),
-        )
+        public_base_url = self.get_public_base_url()
+        queued = True
+        for app in removed:
+            queued = notify_application_decision_async(
+                app,
+                "rejected",
+                smtp_settings,
+                public_base_url=public_base_url,
+            ) and queued
         self.admin_redirect("app_deleted_mail_queued" if queued else "app_deleted_mail_fail")
 
 
+class PooledHTTPServer(ThreadingHTTPServer):
+    # Atiende cada conexion en un pool fijo de hilos reutilizables en lugar de crear un hilo por peticion.
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        threads: int,
+        request_timeout: float | None = HTTP_POOL_TIMEOUT_SECONDS,
+    ) -> None:
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="aura-http")
+        self.request_timeout = request_timeout
+
+    def process_request(self, request, client_address) -> None:
+        # Con hilos fijos, un cliente lento o inactivo no puede retener un hilo mas de request_timeout por lectura.
+        if self.request_timeout:
+            request.settimeout(self.request_timeout)
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+WSGI_SKIPPED_HEADERS = {"connection", "keep-alive", "transfer-encoding", "date", "server"}
+WSGI_FILE_BLOCK_SIZE = 64 * 1024
+
+
+def iter_file_blocks(file_obj: IO[bytes]):
+    try:
+        while block := file_obj.read(WSGI_FILE_BLOCK_SIZE):
+            yield block
+    finally:
+        file_obj.close()
+
+
+def wsgi_app(environ, start_response):
+    # Adaptador WSGI: ejecuta AuraHandler sin socket y devuelve la respuesta capturada.
+    # Las paginas HTML se acumulan enteras en memoria; los ficheros estaticos y /uploads salen del disco por bloques.
+    method = str(environ.get("REQUEST_METHOD", "GET")).upper()
+    request_uri = environ.get("REQUEST_URI") or environ.get("RAW_URI")
+    if not request_uri:
+        raw_path = f"{environ.get('SCRIPT_NAME', '')}{environ.get('PATH_INFO', '')}" or "/"
+        request_uri = urllib.parse.quote(raw_path.encode("latin-1"))
+        if environ.get("QUERY_STRING"):
+            request_uri = f"{request_uri}?{environ['QUERY_STRING']}"
+    headers = HTTPMessage()
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            headers[key[5:].replace("_", "-").title()] = value
+    if environ.get("CONTENT_TYPE"):
+        headers["Content-Type"] = environ["CONTENT_TYPE"]
+    if environ.get("CONTENT_LENGTH"):
+        headers["Content-Length"] = environ["CONTENT_LENGTH"]
+
+    handler = AuraHandler.__new__(AuraHandler)
+    handler.directory = str(BASE_DIR)
+    handler.server = None
+    handler.client_address = (environ.get("REMOTE_ADDR", ""), int(environ.get("REMOTE_PORT") or 0))
+    handler.rfile = environ["wsgi.input"]
+    handler.wfile = BytesIO()
+    handler.command = method
+    handler.path = request_uri
+    handler.request_version = environ.get("SERVER_PROTOCOL", "HTTP/1.1")
+    handler.requestline = f"{method} {request_uri} {handler.request_version}"
+    handler.headers = headers
+    handler.close_connection = True
+    handler.defer_file_body = True
+    method_handler = getattr(handler, f"do_{method}", None)
+    if method_handler is None:
+        handler.send_error(HTTPStatus.NOT_IMPLEMENTED, f"Unsupported method ({method!r})")
+    else:
+        method_handler()
+
+    head, _, body = handler.wfile.getvalue().partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = lines[0].split(" ", 1)[1] if " " in lines[0] else "500 Internal Server Error"
+    response_headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name and name.lower() not in WSGI_SKIPPED_HEADERS:
+            response_headers.append((name, value.strip()))
+    start_response(status, response_headers)
+    file_obj = handler.deferred_file
+    if file_obj is not None:
+        file_wrapper = environ.get("wsgi.file_wrapper")
+        if file_wrapper is not None:
+            return file_wrapper(file_obj, WSGI_FILE_BLOCK_SIZE)
+        return iter_file_blocks(file_obj)
+    return [body]
+
+
+# Frontal ASGI: uvicorn atiende las conexiones en su bucle de eventos y ejecuta wsgi_app en un pool de hilos.
+asgi_app = WsgiToAsgi(wsgi_app) if WsgiToAsgi is not None else None
+
+
 def run_server(port: int | None = None, host: str | None = None) -> None:
     try:
         ensure_data_files()
@@ -5857,8 +6716,6 @@ def run_server(port: int | None = None, host: str | None = None) -> None:
         port = int(os.environ.get("PORT", "8000"))
     if host is None:
         host = os.environ.get("HOST", "0.0.0.0")
-    server_address = (host, port)
-    httpd = ThreadingHTTPServer(server_address, AuraHandler)
     if REQUIRE_DB_STORAGE:
         print("Modo persistente estricto activo: NEON obligatorio (sin fallback a JSON local).")
     if db_enabled():
@@ -5871,7 +6728,32 @@ def run_server(port: int | None = None, host: str | None = None) -> None:
             print(f"Advertencia DB: {DB_LAST_ERROR}")
     else:
         print("Database URL no detectada. Modo JSON local temporal.")
-    print(f"Serving on http://{host}:{port}")
+    server_kind = os.environ.get("AURA_SERVER", "").strip().lower()
+    if server_kind == "waitress":
+        if waitress is not None:
+            threads = max(int(os.environ.get("AURA_WSGI_THREADS", "8")), 1)
+            print(f"Serving (waitress, {threads} hilos) on http://{host}:{port}")
+            waitress.serve(wsgi_app, host=host, port=port, threads=threads)
+            return
+        print("AURA_SERVER=waitress pero waitress no está instalado. Usando el servidor integrado.")
+    elif server_kind == "uvicorn":
+        if uvicorn is not None and asgi_app is not None:
+            # Un solo proceso: los locks de los JSON locales y la cache son de proceso.
+            print(f"Serving (uvicorn) on http://{host}:{port}")
+            uvicorn.run(asgi_app, host=host, port=port, log_level="warning")
+            return
+        print("AURA_SERVER=uvicorn pero uvicorn/asgiref no están instalados. Usando el servidor integrado.")
+    server_address = (host, port)
+    try:
+        http_threads = max(int(os.environ.get("AURA_HTTP_THREADS", "0")), 0)
+    except ValueError:
+        http_threads = 0
+    if http_threads:
+        httpd = PooledHTTPServer(server_address, AuraHandler, http_threads)
+        print(f"Serving ({http_threads} hilos) on http://{host}:{port}")
+    else:
+        httpd = ThreadingHTTPServer(server_address, AuraHandler)
+        print(f"Serving on http://{host}:{port}")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt: